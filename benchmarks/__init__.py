@@ -0,0 +1 @@
+"""Benchmarks for the 12 Days of Christmas agents. Run each with `python -m benchmarks.<name>`."""
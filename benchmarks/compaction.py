@@ -0,0 +1,72 @@
+"""
+Input tokens with and without compaction between model turns.
+
+A scripted model sings the whole song one sing_verse call per turn - the
+worst case, where every turn re-sends all earlier tool calls and results.
+The run is repeated with compaction off and at a few token budgets, and the
+input tokens the model was sent are added up (the scripted model estimates
+~4 characters per token; the compactor's own counts use tiktoken when it's
+installed).
+
+    uv run python -m benchmarks.compaction --budgets 1000,600,400
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from agents import Agent, RunConfig, Runner, set_tracing_disabled
+
+from durable_temporal.workflow import INSTRUCTIONS
+from twelve_days.compaction import Compactor, local_token_counter
+from twelve_days.scripted_model import SCENARIOS, ScriptedModelProvider, scenario_script
+
+# The non-temporal tools live in a directory that isn't a package
+sys.path.insert(0, str(Path(__file__).parent.parent / "non-temporal"))
+
+
+async def run_song(tools, compactor, think_time: float):
+    agent = Agent(name="twelve-days-teacher", instructions=INSTRUCTIONS, tools=tools)
+    run_config = RunConfig(
+        model_provider=ScriptedModelProvider(scenario_script, think_time),
+        call_model_input_filter=compactor,
+    )
+    start = time.perf_counter()
+    result = await Runner.run(
+        agent, SCENARIOS["song_by_verse"].prompt, run_config=run_config, max_turns=20
+    )
+    return result.context_wrapper.usage, time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--budgets", default="1000,600,400", help="Comma-separated token budgets to try")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Simulated seconds per model call")
+    args = parser.parse_args()
+
+    import tools
+    tools.SIMULATED_LATENCY = 0
+    set_tracing_disabled(True)
+    agent_tools = tools.build_tools("async")
+
+    rows = [("off", *await run_song(agent_tools, None, args.think_time), None)]
+    for budget in (int(value) for value in args.budgets.split(",") if value.strip()):
+        compactor = Compactor(budget, count_tokens=local_token_counter())
+        rows.append((str(budget), *await run_song(agent_tools, compactor, args.think_time), compactor))
+
+    baseline = rows[0][1].input_tokens
+    print(f"\n{'='*60}")
+    print(f"🗜️ Whole song, one sing_verse per turn ({rows[0][1].requests} model calls)")
+    print(f"{'='*60}")
+    for budget, usage, elapsed, compactor in rows:
+        saved = 1 - usage.input_tokens / baseline if baseline else 0
+        print(f"Budget {budget:>5}: {usage.input_tokens:7,} input tokens ({saved:5.1%} fewer), {elapsed:.2f}s")
+        if compactor:
+            print(f"              {compactor.stats}")
+    print(f"{'='*60}\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
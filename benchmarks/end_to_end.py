@@ -0,0 +1,204 @@
+"""
+End-to-end throughput and latency, with and without Temporal.
+
+Fires N concurrent requests for each scripted scenario (full song, a range
+of days, a gift lookup) at TwelveDaysWorkflow and reports throughput,
+p50/p95/p99 latency, and the activities and history each run produced.
+The same scenarios then go through the non-temporal Runner.run path, so the
+cost of durability is measured rather than guessed.
+
+The model is the scripted stand-in from twelve_days/scripted_model.py, with
+a configurable think time, and the tools' simulated latency can be turned
+down. A local Temporal dev server (or the time-skipping test server) and
+the worker are started in-process, so nothing else needs to be running:
+
+    uv run python -m benchmarks.end_to_end --runs 20 --think-time 0.5 --tool-latency 0.5
+
+--report-progress runs the workflows with AgentOptions.report_progress, so
+the history cost of the activities' per-verse progress signals shows up in
+the history stats (signals are counted separately).
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+
+from agents import Agent, ModelSettings, RunConfig, Runner, set_tracing_disabled
+from temporalio.client import Client, WorkflowHandle
+from temporalio.contrib.openai_agents import ModelActivityParameters, OpenAIAgentsPlugin
+from temporalio.testing import WorkflowEnvironment
+from temporalio.worker import Worker
+
+from durable_temporal import activities
+from durable_temporal.progress import ProgressInterceptor
+from durable_temporal.workflow import AgentOptions, TwelveDaysWorkflow
+from twelve_days.scripted_model import SCENARIOS, Scenario, ScriptedModelProvider, scenario_script
+from twelve_days.stats import LatencySummary
+
+# The non-temporal tools live in a directory that isn't a package
+sys.path.insert(0, str(Path(__file__).parent.parent / "non-temporal"))
+
+TASK_QUEUE = "benchmark-end-to-end"
+
+# Activity type the OpenAI Agents plugin uses for model calls
+MODEL_ACTIVITY = "invoke_model_activity"
+
+
+@dataclass
+class HistoryStats:
+    """Average per-run activity counts and history size of a batch of workflows."""
+
+    model_activities: float
+    tool_activities: float
+    events: float
+    size_bytes: float
+    signals: float = 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.model_activities:.1f} model + {self.tool_activities:.1f} tool activities, "
+            f"{self.signals:.1f} signals, {self.events:.0f} events, {self.size_bytes / 1024:.1f} KB history per run"
+        )
+
+
+async def timed(coro) -> float:
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+
+async def run_batch(runs: list) -> LatencySummary:
+    """Runs the coroutines concurrently and summarizes their latencies."""
+    start = time.perf_counter()
+    results = await asyncio.gather(*(timed(run) for run in runs), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+
+    latencies = [result for result in results if not isinstance(result, BaseException)]
+    return LatencySummary.from_latencies(latencies, elapsed, errors=len(results) - len(latencies))
+
+
+async def history_stats(handles: list[WorkflowHandle]) -> HistoryStats:
+    model = tool = signals = events = size = 0
+    for handle in handles:
+        history = await handle.fetch_history()
+        events += len(history.events)
+        size += sum(event.ByteSize() for event in history.events)
+        for event in history.events:
+            signals += event.HasField("workflow_execution_signaled_event_attributes")
+            if event.HasField("activity_task_scheduled_event_attributes"):
+                if event.activity_task_scheduled_event_attributes.activity_type.name == MODEL_ACTIVITY:
+                    model += 1
+                else:
+                    tool += 1
+    count = len(handles) or 1
+    return HistoryStats(model / count, tool / count, events / count, size / count, signals / count)
+
+
+async def run_temporal(
+    client: Client, name: str, scenario: Scenario, runs: int, report_progress: bool = False
+) -> tuple[LatencySummary, HistoryStats]:
+    handles = []
+
+    async def run_workflow() -> None:
+        handle = await client.start_workflow(
+            TwelveDaysWorkflow.run,
+            args=[scenario.prompt, AgentOptions(fast_path=False, report_progress=report_progress)],
+            id=f"benchmark-{name}-{uuid.uuid4().hex[:12]}",
+            task_queue=TASK_QUEUE,
+        )
+        handles.append(handle)
+        await handle.result()
+
+    summary = await run_batch([run_workflow() for _ in range(runs)])
+    return summary, await history_stats(handles)
+
+
+async def run_non_temporal(scenario: Scenario, runs: int, think_time: float) -> LatencySummary:
+    import tools
+
+    agent = Agent(
+        name="twelve-days-teacher",
+        instructions="Answer questions about the 12 Days of Christmas.",
+        model_settings=ModelSettings(parallel_tool_calls=True),
+        tools=tools.build_tools("async"),
+    )
+    run_config = RunConfig(model_provider=ScriptedModelProvider(scenario_script, think_time))
+    return await run_batch([Runner.run(agent, scenario.prompt, run_config=run_config) for _ in range(runs)])
+
+
+async def start_environment(kind: str) -> WorkflowEnvironment:
+    if kind == "time-skipping":
+        return await WorkflowEnvironment.start_time_skipping()
+    return await WorkflowEnvironment.start_local()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=10, help="Concurrent requests per scenario")
+    parser.add_argument(
+        "--scenarios", default=",".join(SCENARIOS),
+        help=f"Comma-separated scenarios to run (default: {','.join(SCENARIOS)})",
+    )
+    parser.add_argument("--think-time", type=float, default=0.5, help="Simulated seconds per model call")
+    parser.add_argument("--tool-latency", type=float, default=0.5, help="Simulated seconds per verse or gift lookup")
+    parser.add_argument("--report-progress", action="store_true",
+                        help="Have the activities signal every verse back to the workflow (AgentOptions.report_progress)")
+    parser.add_argument("--env", choices=["local", "time-skipping"], default="local", help="Temporal test server to start")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    # Same tool latency on both paths, and no deliberate day-5 failures skewing the numbers
+    import tools
+    tools.SIMULATED_LATENCY = args.tool_latency
+    activities.SIMULATED_LATENCY = args.tool_latency
+    activities.SIMULATE_FAILURES = False
+    set_tracing_disabled(True)
+
+    results = {}
+    async with await start_environment(args.env) as env:
+        plugin = OpenAIAgentsPlugin(
+            model_params=ModelActivityParameters(start_to_close_timeout=timedelta(seconds=30)),
+            model_provider=ScriptedModelProvider(scenario_script, args.think_time),
+        )
+        client = Client(**{**env.client.config(), "plugins": [plugin]})
+
+        async with Worker(
+            client,
+            task_queue=TASK_QUEUE,
+            workflows=[TwelveDaysWorkflow],
+            activities=[activities.sing_verse, activities.sing_verses, activities.get_gift_info],
+            interceptors=[ProgressInterceptor()],
+        ):
+            for name in names:
+                print(f"⏱️  Temporal: {args.runs} x {name}...")
+                results[name] = await run_temporal(client, name, SCENARIOS[name], args.runs, args.report_progress)
+
+    for name in names:
+        print(f"⏱️  Non-temporal: {args.runs} x {name}...")
+        results[name] += (await run_non_temporal(SCENARIOS[name], args.runs, args.think_time),)
+
+    print(f"\n{'='*60}")
+    print(f"🎄 {args.runs} concurrent runs per scenario ({args.env} server)")
+    print(f"   think time {args.think_time}s, tool latency {args.tool_latency}s, "
+          f"activity progress signals {'on' if args.report_progress else 'off'}")
+    print(f"{'='*60}")
+    for name, (durable, history, plain) in results.items():
+        print(f"\n🎵 {name}: {SCENARIOS[name].prompt}")
+        print(f"   Temporal:     {durable}")
+        print(f"                 {history}")
+        print(f"   Non-temporal: {plain}")
+        print(f"   Durability overhead: {durable.p50 - plain.p50:+.2f}s at p50")
+    print(f"\n{'='*60}\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+"""
+What logging the verses costs the activities.
+
+Runs a few thousand sing_verse and get_gift_info activities concurrently in
+Temporal's ActivityEnvironment (no simulated latency, no forgotten day 5),
+so the time is mostly the activities' own work - of which logging is a big
+part - and compares:
+
+- off: LOG_LEVEL=WARNING, the verse records are dropped at the logger
+- queued text / queued json: configure_logging, the worker's setup - the
+  activities only put records on a queue, one thread writes them
+- direct: a plain StreamHandler that formats and writes in the activity
+
+Records go to a temporary file unless --output says otherwise, and each
+mode's fastest of a few rounds is reported. "done" is when the last
+activity returned, "drained" when the last record was written; for the
+direct handler they're the same.
+
+    uv run python -m benchmarks.logging_overhead --activities 5000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+from temporalio.testing import ActivityEnvironment
+
+from durable_temporal import activities
+from twelve_days.logs import configure_logging, stop_logging
+
+MODES = ["off", "queued text", "queued json", "direct"]
+
+
+async def run_activities(count: int) -> None:
+    env = ActivityEnvironment()
+    await asyncio.gather(*(
+        env.run(activities.sing_verse, index % 12 + 1) if index % 2 == 0
+        else env.run(activities.get_gift_info, index % 12 + 1)
+        for index in range(count)
+    ))
+
+
+def setup(mode: str, stream) -> None:
+    if mode != "direct":
+        configure_logging("WARNING" if mode == "off" else "INFO", "json" if mode == "queued json" else "text", stream)
+        return
+    # What a plain logging.basicConfig would do: format and write in the caller
+    stop_logging()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logging.getLogger().handlers[:] = [handler]
+    logging.getLogger().setLevel(logging.INFO)
+
+
+async def measure(mode: str, count: int, path: str) -> tuple[float, float, int]:
+    """Seconds until the activities are done and until the log is drained, and bytes written."""
+    with open(path, "w", encoding="utf-8") as stream:
+        setup(mode, stream)
+        start = time.perf_counter()
+        await run_activities(count)
+        done = time.perf_counter() - start
+        stop_logging()
+        drained = time.perf_counter() - start
+    return done, drained, os.path.getsize(path)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--activities", type=int, default=5000, help="Activities per mode, half verses and half gift lookups")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds per mode; the fastest is reported")
+    parser.add_argument("--output", help="Write the records here instead of a temporary file")
+    args = parser.parse_args()
+
+    activities.SIMULATED_LATENCY = 0
+    activities.SIMULATE_FAILURES = False
+    path = args.output or os.path.join(tempfile.mkdtemp(), "logging_overhead.log")
+
+    # Warm-up, so imports and the first formatting aren't counted
+    with open(os.devnull, "w") as devnull:
+        configure_logging("INFO", "text", devnull)
+        await run_activities(100)
+        stop_logging()
+
+    # Modes take turns each round, so drift (GC, the page cache) hits them all alike
+    rounds: dict[str, list] = {mode: [] for mode in MODES}
+    for _ in range(args.rounds):
+        for mode in MODES:
+            rounds[mode].append(await measure(mode, args.activities, path))
+    results = {mode: min(runs) for mode, runs in rounds.items()}
+
+    print(f"\n{'='*60}")
+    print(f"📝 Logging overhead ({args.activities} activities per mode, best of {args.rounds}, records to {path})")
+    print(f"{'='*60}")
+    baseline = results["off"][0]
+    for mode, (done, drained, size) in results.items():
+        print(f"{mode:12} done {done:6.2f}s ({args.activities / done:7.0f} activities/s, "
+              f"{done / baseline - 1:+.0%} vs off)  drained {drained:6.2f}s  {size / 1024:7.0f}KB")
+    print(f"{'='*60}\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+"""
+Scrape check for the worker's Prometheus metrics.
+
+Starts a local Temporal dev server and an in-process worker with the
+metrics runtime and MetricsInterceptor (and the model router), runs a gift lookup and days 1-5
+through TwelveDaysWorkflow with the scripted model (day 5 fails on its
+first attempts, so retries get counted - this takes ~30s), then scrapes
+/metrics and checks that Temporal's runtime metrics and every
+twelve_days_* metric are there. Exits non-zero if any are missing.
+
+    uv run python -m benchmarks.metrics_scrape
+"""
+
+import argparse
+import asyncio
+import sys
+import urllib.request
+import uuid
+from datetime import timedelta
+
+from agents import set_tracing_disabled
+from temporalio.client import Client
+from temporalio.contrib.openai_agents import ModelActivityParameters, OpenAIAgentsPlugin
+from temporalio.testing import WorkflowEnvironment
+from temporalio.worker import Worker
+
+from durable_temporal import activities
+from durable_temporal.metrics import METRIC_NAMES, MetricsInterceptor, prometheus_runtime
+from durable_temporal.workflow import AgentOptions, TwelveDaysWorkflow
+from twelve_days.model_routing import RoutingModelProvider
+from twelve_days.scripted_model import SCENARIOS, ScriptedModelProvider, scenario_script
+
+TASK_QUEUE = "benchmark-metrics"
+
+
+def scrape(address: str) -> str:
+    with urllib.request.urlopen(f"http://{address}/metrics", timeout=5) as response:
+        return response.read().decode("utf-8")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--metrics-address", default="127.0.0.1:9464", help="Where to serve /metrics")
+    args = parser.parse_args()
+
+    activities.SIMULATED_LATENCY = 0.1
+    set_tracing_disabled(True)
+
+    async with await WorkflowEnvironment.start_local() as env:
+        client = await Client.connect(
+            env.client.service_client.config.target_host,
+            namespace=env.client.namespace,
+            runtime=prometheus_runtime(args.metrics_address),
+            plugins=[OpenAIAgentsPlugin(
+                model_params=ModelActivityParameters(start_to_close_timeout=timedelta(seconds=30)),
+                model_provider=RoutingModelProvider(provider=ScriptedModelProvider(scenario_script)),
+            )],
+        )
+        async with Worker(
+            client,
+            task_queue=TASK_QUEUE,
+            workflows=[TwelveDaysWorkflow],
+            activities=[activities.sing_verse, activities.sing_verses, activities.get_gift_info],
+            interceptors=[MetricsInterceptor()],
+        ):
+            for name in ("gift", "range"):
+                print(f"▶️  Running the {name} scenario...")
+                await client.execute_workflow(
+                    TwelveDaysWorkflow.run,
+                    args=[SCENARIOS[name].prompt, AgentOptions(fast_path=False)],
+                    id=f"benchmark-metrics-{uuid.uuid4().hex[:12]}",
+                    task_queue=TASK_QUEUE,
+                )
+
+            # Metrics are exported on an interval - give the last ones a moment
+            await asyncio.sleep(2)
+            text = scrape(args.metrics_address)
+
+    names = {line.split("{")[0].split(" ")[0] for line in text.splitlines() if line and not line.startswith("#")}
+    expected = {name: any(found.startswith(name) for found in names) for name in METRIC_NAMES}
+    expected["temporal_* runtime metrics"] = any(found.startswith("temporal_") for found in names)
+
+    print(f"\n{'='*60}")
+    print(f"📈 Scraped http://{args.metrics_address}/metrics ({len(names)} series names)")
+    print(f"{'='*60}")
+    for name, found in expected.items():
+        print(f"{'✅' if found else '❌'} {name}")
+    print(f"{'='*60}\n")
+    sys.exit(0 if all(expected.values()) else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,124 @@
+"""
+Latency with every turn on gpt-4o vs routed to the cheapest capable model.
+
+The scripted model stands in for both models, with a simulated think time
+per model name (gpt-4o slower than gpt-4o-mini). Each scenario runs through
+Runner.run with the agent's instructions and tools, once with every turn on
+the large model and once through RoutingModelProvider, and the per-request
+latency and the router's per-route stats are reported. A fraction of the
+small model's tool calls can be corrupted (--invalid-rate) to exercise the
+escalation to the large model.
+
+    uv run python -m benchmarks.model_routing --runs 5 --large-think 1.0 --small-think 0.3
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+from agents import Agent, ModelSettings, RunConfig, Runner, set_tracing_disabled
+from openai.types.responses import ResponseFunctionToolCall
+
+from durable_temporal.workflow import INSTRUCTIONS
+from twelve_days.model_routing import DEFAULT_ROUTES, RoutingModelProvider
+from twelve_days.scripted_model import SCENARIOS, ScriptedModel, ScriptedModelProvider, scenario_script
+from twelve_days.stats import LatencySummary
+
+# The non-temporal tools live in a directory that isn't a package
+sys.path.insert(0, str(Path(__file__).parent.parent / "non-temporal"))
+
+LARGE_MODEL = DEFAULT_ROUTES["long_answer"]
+SMALL_MODEL = DEFAULT_ROUTES["dispatch"]
+
+
+class FlakyModel(ScriptedModel):
+    """A scripted model that sometimes calls a tool that doesn't exist."""
+
+    def __init__(self, model: ScriptedModel, invalid_rate: float, rng: random.Random) -> None:
+        super().__init__(model.script, model.think_time, model.name)
+        self.invalid_rate = invalid_rate
+        self.rng = rng
+
+    async def get_response(self, *args, **kwargs):
+        response = await super().get_response(*args, **kwargs)
+        if self.rng.random() < self.invalid_rate:
+            response.output = [
+                item.model_copy(update={"name": item.name + "_typo"}) if isinstance(item, ResponseFunctionToolCall) else item
+                for item in response.output
+            ]
+        return response
+
+
+class FlakyProvider(ScriptedModelProvider):
+    """The scripted models, with the small one occasionally getting a tool name wrong."""
+
+    flaky = None
+
+    def get_model(self, model_name):
+        if model_name == SMALL_MODEL and self.flaky is not None:
+            return self.flaky
+        return super().get_model(model_name)
+
+
+async def run_scenario(agent: Agent, prompt: str, provider, runs: int) -> LatencySummary:
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(runs):
+        began = time.perf_counter()
+        await Runner.run(agent, prompt, run_config=RunConfig(model_provider=provider), max_turns=20)
+        latencies.append(time.perf_counter() - began)
+    return LatencySummary.from_latencies(latencies, time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5, help="Runs per scenario and setting")
+    parser.add_argument("--large-think", type=float, default=1.0, help=f"Simulated seconds per {LARGE_MODEL} call")
+    parser.add_argument("--small-think", type=float, default=0.3, help=f"Simulated seconds per {SMALL_MODEL} call")
+    parser.add_argument("--invalid-rate", type=float, default=0.1, help="Fraction of small-model responses with a bad tool call")
+    args = parser.parse_args()
+
+    import tools
+    tools.SIMULATED_LATENCY = 0
+    set_tracing_disabled(True)
+
+    agent = Agent(
+        name="twelve-days-teacher",
+        model=LARGE_MODEL,
+        instructions=INSTRUCTIONS,
+        model_settings=ModelSettings(parallel_tool_calls=True),
+        tools=tools.build_tools("async"),
+    )
+    scripted = FlakyProvider(
+        scenario_script, think_times={LARGE_MODEL: args.large_think, SMALL_MODEL: args.small_think}
+    )
+    scripted.flaky = FlakyModel(scripted.get_model(SMALL_MODEL), args.invalid_rate, random.Random(12))
+
+    names = ["gift", "gifts", "range", "song"]
+    results = {}
+    for name in names:
+        router = RoutingModelProvider(provider=scripted)
+        results[name] = (
+            await run_scenario(agent, SCENARIOS[name].prompt, scripted, args.runs),
+            await run_scenario(agent, SCENARIOS[name].prompt, router, args.runs),
+            router.stats,
+        )
+
+    print(f"\n{'='*60}")
+    print(f"🔀 Model routing ({args.runs} runs each; {LARGE_MODEL} {args.large_think}s, "
+          f"{SMALL_MODEL} {args.small_think}s per call)")
+    print(f"{'='*60}")
+    for name in names:
+        large, routed, stats = results[name]
+        print(f"\n🎵 {name}: {SCENARIOS[name].prompt}")
+        print(f"  all {LARGE_MODEL}: p50 {large.p50:.2f}s p95 {large.p95:.2f}s")
+        print(f"  routed:     p50 {routed.p50:.2f}s p95 {routed.p95:.2f}s ({1 - routed.mean / large.mean:.0%} faster)")
+        print(f"  {stats}")
+    print(f"\n{'='*60}\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
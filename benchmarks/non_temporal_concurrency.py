@@ -0,0 +1,79 @@
+"""
+Concurrency of the non-temporal agent's tools.
+
+Fires N simultaneous Runner.run calls; a scripted model makes each one call
+get_gift_info for three days in a single turn. With non-blocking tools
+("async", or "thread" offloading) the tool waits of every run overlap and
+the batch takes about one tool latency. With "blocking" tools they run one
+after another on the event loop.
+
+Exits non-zero if "async" or "thread" takes more than --max-ratio of the
+"blocking" time, i.e. if a change made the tools block the loop again:
+
+    uv run python -m benchmarks.non_temporal_concurrency --requests 8 --latency 1 --max-ratio 0.25
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+from agents import Agent, RunConfig, Runner, set_tracing_disabled
+
+from twelve_days.scripted_model import ScriptedModelProvider, ToolCall
+
+# The non-temporal tools live in a directory that isn't a package
+sys.path.insert(0, str(Path(__file__).parent.parent / "non-temporal"))
+
+SCRIPT = [
+    [ToolCall("get_gift_info", {"day": day}) for day in (3, 7, 11)],
+    "🎁 Those are the gifts on days 3, 7 and 11!",
+]
+
+
+async def time_batch(tools, requests: int) -> float:
+    agent = Agent(name="twelve-days-teacher", instructions="Answer questions about the song.", tools=tools)
+    run_config = RunConfig(model_provider=ScriptedModelProvider(SCRIPT))
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        Runner.run(agent, "What gifts come on days 3, 7 and 11?", run_config=run_config)
+        for _ in range(requests)
+    ))
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=8, help="Simultaneous Runner.run calls")
+    parser.add_argument("--latency", type=float, default=1.0, help="Simulated seconds per tool call")
+    parser.add_argument("--max-ratio", type=float, default=0.25,
+                        help="Fail if async or thread takes more than this fraction of blocking's time (default: 0.25)")
+    args = parser.parse_args()
+
+    # The tools read their simulated latency at import
+    os.environ["TOOL_LATENCY_SECONDS"] = str(args.latency)
+    import tools
+    set_tracing_disabled(True)
+
+    results = {mode: await time_batch(tools.build_tools(mode), args.requests) for mode in ("async", "thread", "blocking")}
+
+    print(f"\n{'='*60}")
+    print(f"🎁 {args.requests} concurrent runs x 3 tool calls, {args.latency}s per call")
+    print(f"{'='*60}")
+    failures = []
+    for mode, elapsed in results.items():
+        ratio = elapsed / results["blocking"]
+        slow = mode != "blocking" and ratio > args.max_ratio
+        if slow:
+            failures.append(mode)
+        print(f"{mode:>9}: {elapsed:6.2f}s ({ratio:.0%} of blocking){' ❌' if slow else ''}")
+    for mode in failures:
+        print(f"❌ {mode} took more than {args.max_ratio:.0%} of the blocking time - its tool calls aren't overlapping")
+    print(f"{'='*60}\n")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+"""
+Parallel tool calls in TwelveDaysWorkflow.
+
+A scripted model asks for get_gift_info on all 12 days in a single turn.
+With the tool calls fanned out as concurrent activities the turn should take
+about as long as one activity (~3s); with the limit at 1 it takes ~12x that.
+get_gift_info is forced to run as a regular activity here (it runs inline by
+default - see benchmarks/tool_modes.py).
+
+Starts a local Temporal dev server and an in-process worker, so no OpenAI
+key or separate worker is needed. Exits non-zero if the parallel run isn't
+at least --min-speedup times faster than the sequential one, so it can gate
+a change to the fan-out:
+
+    uv run python -m benchmarks.parallel_tools --min-speedup 4
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from datetime import timedelta
+
+from temporalio.client import Client
+from temporalio.contrib.openai_agents import ModelActivityParameters, OpenAIAgentsPlugin
+from temporalio.testing import WorkflowEnvironment
+from temporalio.worker import Worker
+
+from durable_temporal.activities import get_gift_info, sing_verse, sing_verses
+from durable_temporal.workflow import AgentOptions, TwelveDaysWorkflow
+from twelve_days.scripted_model import ScriptedModelProvider, ToolCall
+
+TASK_QUEUE = "benchmark-parallel-tools"
+
+# One turn with 12 parallel gift lookups, then the answer
+SCRIPT = [
+    [ToolCall("get_gift_info", {"day": day}) for day in range(1, 13)],
+    "🎁 Those are all 12 gifts!",
+]
+
+
+async def time_run(client: Client, limit: int) -> float:
+    start = time.perf_counter()
+    await client.execute_workflow(
+        TwelveDaysWorkflow.run,
+        args=["What are the gifts on every day?", AgentOptions(
+            fast_path=False, max_parallel_tools=limit, tool_modes={"get_gift_info": "activity"},
+        )],
+        id=f"benchmark-parallel-{uuid.uuid4()}",
+        task_queue=TASK_QUEUE,
+    )
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--min-speedup", type=float, default=4.0,
+                        help="Fail unless parallel is at least this many times faster than sequential (default: 4)")
+    args = parser.parse_args()
+
+    async with await WorkflowEnvironment.start_local() as env:
+        plugin = OpenAIAgentsPlugin(
+            model_params=ModelActivityParameters(start_to_close_timeout=timedelta(seconds=30)),
+            model_provider=ScriptedModelProvider(SCRIPT),
+        )
+        client = Client(**{**env.client.config(), "plugins": [plugin]})
+
+        async with Worker(
+            client,
+            task_queue=TASK_QUEUE,
+            workflows=[TwelveDaysWorkflow],
+            activities=[sing_verse, sing_verses, get_gift_info],
+        ):
+            parallel = await time_run(client, limit=12)
+            sequential = await time_run(client, limit=1)
+
+    print(f"\n{'='*60}")
+    print("🎁 12 get_gift_info calls in one model turn")
+    print(f"{'='*60}")
+    print(f"⚡ Parallel (limit 12):  {parallel:6.1f}s")
+    print(f"🐢 Sequential (limit 1): {sequential:6.1f}s")
+    speedup = sequential / parallel
+    print(f"🚀 Speedup: {speedup:.1f}x")
+    if speedup < args.min_speedup:
+        print(f"❌ Expected at least {args.min_speedup:g}x - the tool calls aren't running in parallel")
+    print(f"{'='*60}\n")
+    sys.exit(0 if speedup >= args.min_speedup else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,126 @@
+"""
+History and payload bytes per workflow, with and without compression.
+
+Runs the full-song scenarios through TwelveDaysWorkflow (agent loop, scripted
+model) once without a payload codec and once per compression algorithm, and
+reports per workflow:
+
+- history: the size of the finished workflow's event history
+- wire: payload bytes the client and worker sent to and received from
+  Temporal (counted at the codec, so gRPC framing isn't included)
+
+Starts a local Temporal dev server and an in-process worker per setting:
+
+    uv run python -m benchmarks.payload_codec --runs 3
+"""
+
+import argparse
+import asyncio
+import uuid
+from datetime import timedelta
+from typing import Optional, Sequence
+
+from agents import set_tracing_disabled
+from temporalio.api.common.v1 import Payload
+from temporalio.client import Client
+from temporalio.contrib.openai_agents import ModelActivityParameters, OpenAIAgentsPlugin
+from temporalio.converter import DataConverter, PayloadCodec
+from temporalio.testing import WorkflowEnvironment
+from temporalio.worker import Worker
+
+from durable_temporal import activities
+from durable_temporal.codec import CompressionCodec, zstd_available
+from durable_temporal.workflow import AgentOptions, TwelveDaysWorkflow
+from twelve_days.scripted_model import SCENARIOS, ScriptedModelProvider, scenario_script
+
+
+class CountingCodec(PayloadCodec):
+    """Wraps a codec (or none) and counts the bytes of the payloads on the wire."""
+
+    def __init__(self, inner: Optional[PayloadCodec]) -> None:
+        self.inner = inner
+        self.bytes = 0
+
+    async def encode(self, payloads: Sequence[Payload]) -> list[Payload]:
+        encoded = await self.inner.encode(payloads) if self.inner else list(payloads)
+        self.bytes += sum(payload.ByteSize() for payload in encoded)
+        return encoded
+
+    async def decode(self, payloads: Sequence[Payload]) -> list[Payload]:
+        self.bytes += sum(payload.ByteSize() for payload in payloads)
+        return await self.inner.decode(payloads) if self.inner else list(payloads)
+
+
+async def measure(env: WorkflowEnvironment, codec: Optional[PayloadCodec], scenario: str, runs: int) -> dict:
+    counter = CountingCodec(codec)
+    client = await Client.connect(
+        env.client.service_client.config.target_host,
+        namespace=env.client.namespace,
+        data_converter=DataConverter(payload_codec=counter),
+        plugins=[OpenAIAgentsPlugin(
+            model_params=ModelActivityParameters(start_to_close_timeout=timedelta(seconds=30)),
+            model_provider=ScriptedModelProvider(scenario_script),
+        )],
+    )
+    task_queue = f"benchmark-codec-{uuid.uuid4().hex[:8]}"
+    history_bytes = events = 0
+    async with Worker(
+        client,
+        task_queue=task_queue,
+        workflows=[TwelveDaysWorkflow],
+        activities=[activities.sing_verse, activities.sing_verses, activities.get_gift_info],
+    ):
+        for _ in range(runs):
+            handle = await client.start_workflow(
+                TwelveDaysWorkflow.run,
+                args=[SCENARIOS[scenario].prompt, AgentOptions(fast_path=False)],
+                id=f"benchmark-codec-{uuid.uuid4().hex[:12]}",
+                task_queue=task_queue,
+            )
+            await handle.result()
+            history = await handle.fetch_history()
+            history_bytes += sum(event.ByteSize() for event in history.events)
+            events += len(history.events)
+
+    return {"history": history_bytes / runs, "wire": counter.bytes / runs, "events": events / runs}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=3, help="Workflow runs per scenario and setting")
+    parser.add_argument("--threshold", type=int, default=256, help="Compress payloads of at least this many bytes")
+    args = parser.parse_args()
+
+    activities.SIMULATED_LATENCY = 0
+    activities.SIMULATE_FAILURES = False
+    set_tracing_disabled(True)
+
+    settings = {"none": None, "zlib": CompressionCodec("zlib", args.threshold)}
+    if zstd_available():
+        settings["zstd"] = CompressionCodec("zstd", args.threshold)
+
+    results = {}
+    async with await WorkflowEnvironment.start_local() as env:
+        for scenario in ("song", "song_by_verse"):
+            for name, codec in settings.items():
+                results[scenario, name] = await measure(env, codec, scenario, args.runs)
+
+    print(f"\n{'='*60}")
+    print(f"🗜️ Payload compression ({args.runs} runs each, threshold {args.threshold} bytes)")
+    print(f"{'='*60}")
+    for scenario in ("song", "song_by_verse"):
+        print(f"\n🎵 {scenario}: {SCENARIOS[scenario].prompt}")
+        baseline = results[scenario, "none"]
+        for name in settings:
+            result = results[scenario, name]
+            print(
+                f"  {name:5} history {result['history'] / 1024:7.1f} KB "
+                f"({result['history'] / baseline['history']:4.0%}), "
+                f"wire {result['wire'] / 1024:7.1f} KB ({result['wire'] / baseline['wire']:4.0%}), "
+                f"{result['events']:.0f} events"
+            )
+    print(f"\n{'='*60}\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
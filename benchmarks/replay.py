@@ -0,0 +1,209 @@
+"""
+Replay cost of TwelveDaysWorkflow histories, and a nondeterminism check.
+
+A worker cache miss or restart - the crash-resume the demo is about -
+replays the workflow's whole history through the Agents SDK inside the
+sandbox. This measures what that costs.
+
+`capture` runs the gift lookup, a range of days, the full song and the song
+sung verse by verse through the agent loop (scripted model, local dev
+server, with day 5 forgotten so the retry path is in there) and saves each
+history as JSON, along with the git revision it was captured from:
+
+    uv run python -m benchmarks.replay capture
+
+The histories belong in benchmarks/histories, captured from a known-good
+revision and committed, so replaying them catches changes that break
+running workflows. Refresh them only on purpose (see
+benchmarks/histories/README.md). Until the first capture is committed the
+check is on hold: `run` says so and exits 0, unless --require-histories
+is passed.
+
+`run` (the default) replays every saved history through Temporal's
+Replayer, set up like the worker, and reports wall time, CPU time and peak
+Python memory per replay, and per history event. It exits non-zero if a
+history no longer replays (nondeterminism) or, with --budget-us-per-event,
+if replaying got slower than that:
+
+    uv run python -m benchmarks.replay --iterations 20 --budget-us-per-event 500
+"""
+
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+
+from agents import set_tracing_disabled
+from temporalio.client import Client, WorkflowHistory
+from temporalio.contrib.openai_agents import ModelActivityParameters, OpenAIAgentsPlugin
+from temporalio.converter import DataConverter
+from temporalio.testing import WorkflowEnvironment
+from temporalio.worker import Replayer, Worker
+
+from durable_temporal import activities
+from durable_temporal.codec import CompressionCodec, codec_from_env
+from durable_temporal.metrics import MetricsInterceptor
+from durable_temporal.progress import ProgressInterceptor
+from durable_temporal.worker import workflow_runner
+from durable_temporal.workflow import AgentOptions, TwelveDaysWorkflow
+from twelve_days.scripted_model import SCENARIOS, ScriptedModelProvider, scenario_script
+
+HISTORY_DIR = Path(__file__).parent / "histories"
+# Which commit the saved histories were captured from
+REVISION_FILE = "REVISION"
+
+# The scenarios captured; range and the songs go through the day-5 retries
+CAPTURED = ["gift", "range", "song", "song_by_verse"]
+
+
+def plugin() -> OpenAIAgentsPlugin:
+    return OpenAIAgentsPlugin(
+        model_params=ModelActivityParameters(start_to_close_timeout=timedelta(seconds=30)),
+        model_provider=ScriptedModelProvider(scenario_script),
+    )
+
+
+def git_revision() -> str:
+    """The current commit, marked dirty if the tree has changes, or "unknown" outside git."""
+    try:
+        revision = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{revision}-dirty" if dirty.strip() else revision
+
+
+async def capture(directory: Path) -> None:
+    revision = git_revision()
+    if revision.endswith("-dirty") or revision == "unknown":
+        print(f"⚠️  Capturing from {revision} - the committed histories should come from a clean, known-good commit")
+    activities.SIMULATED_LATENCY = 0.1
+    activities.SIMULATE_FAILURES = True
+    set_tracing_disabled(True)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    async with await WorkflowEnvironment.start_local() as env:
+        # Captured with the same payload codec the worker would use
+        client = await Client.connect(
+            env.client.service_client.config.target_host,
+            namespace=env.client.namespace,
+            data_converter=DataConverter(payload_codec=codec_from_env()),
+            plugins=[plugin()],
+        )
+        task_queue = f"benchmark-replay-{uuid.uuid4().hex[:8]}"
+        async with Worker(
+            client,
+            task_queue=task_queue,
+            workflows=[TwelveDaysWorkflow],
+            activities=[activities.sing_verse, activities.sing_verses, activities.get_gift_info],
+            workflow_runner=workflow_runner(),
+        ):
+            for name in CAPTURED:
+                print(f"▶️  Capturing {name}: {SCENARIOS[name].prompt}")
+                handle = await client.start_workflow(
+                    TwelveDaysWorkflow.run,
+                    args=[SCENARIOS[name].prompt, AgentOptions(fast_path=False)],
+                    id=f"benchmark-replay-{name}",
+                    task_queue=task_queue,
+                )
+                await handle.result()
+                history = await handle.fetch_history()
+                (directory / f"{name}.json").write_text(history.to_json(), encoding="utf-8")
+                print(f"💾 {name}: {len(history.events)} events -> {directory / f'{name}.json'}")
+    (directory / REVISION_FILE).write_text(revision + "\n", encoding="utf-8")
+
+
+@dataclass
+class ReplayCost:
+    events: int
+    wall: float
+    cpu: float
+    peak_bytes: int
+
+
+def replayer() -> Replayer:
+    # Set up like the worker; the codec decodes compressed and plain payloads alike
+    return Replayer(
+        workflows=[TwelveDaysWorkflow],
+        workflow_runner=workflow_runner(),
+        data_converter=DataConverter(payload_codec=CompressionCodec()),
+        interceptors=[MetricsInterceptor(), ProgressInterceptor()],
+        plugins=[plugin()],
+    )
+
+
+async def measure(history: WorkflowHistory, iterations: int) -> ReplayCost:
+    """Replays the history `iterations` times in one replayer; the cost is per replay."""
+    # One warm-up replay, so imports and the sandbox's first setup aren't counted
+    await replayer().replay_workflow(history)
+
+    tracemalloc.start()
+    wall, cpu = time.perf_counter(), time.process_time()
+    await replayer().replay_workflows([history] * iterations)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return ReplayCost(len(history.events), wall / iterations, cpu / iterations, peak)
+
+
+async def run(directory: Path, iterations: int, budget_us_per_event: float, require_histories: bool = False) -> int:
+    files = sorted(directory.glob("*.json"))
+    if not files:
+        if require_histories:
+            print(f"❌ No histories in {directory} - see {directory / 'README.md'} to capture them")
+            return 1
+        print(f"⏸️  No histories in {directory} yet, so there's nothing to replay - "
+              f"the check is on hold until they're captured (see {directory / 'README.md'})")
+        return 0
+
+    results, failures = {}, []
+    for path in files:
+        history = WorkflowHistory.from_json(path.stem, path.read_text(encoding="utf-8"))
+        try:
+            results[path.stem] = await measure(history, iterations)
+        except Exception as error:
+            # Nondeterminism (or any other replay failure) is a regression
+            failures.append(f"{path.stem}: {error}")
+
+    print(f"\n{'='*60}")
+    revision_file = directory / REVISION_FILE
+    revision = revision_file.read_text(encoding="utf-8").strip() if revision_file.exists() else "an unknown revision"
+    print(f"⏪ Replaying {len(files)} histories captured from {revision} ({iterations} replays each)")
+    print(f"{'='*60}")
+    print(f"{'':14} {'events':>6} {'wall':>9} {'cpu':>9} {'peak mem':>9} {'us/event':>9}")
+    for name, cost in results.items():
+        per_event = cost.wall / cost.events * 1e6
+        over = budget_us_per_event and per_event > budget_us_per_event
+        if over:
+            failures.append(f"{name}: {per_event:.0f}us per event is over the {budget_us_per_event:.0f}us budget")
+        print(f"{name:14} {cost.events:6} {cost.wall * 1000:7.1f}ms {cost.cpu * 1000:7.1f}ms "
+              f"{cost.peak_bytes / 1024 / 1024:7.1f}MB {per_event:9.0f}{' ❌' if over else ''}")
+    for failure in failures:
+        print(f"❌ {failure}")
+    print(f"{'='*60}\n")
+    return 1 if failures else 0
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("command", nargs="?", choices=["run", "capture"], default="run")
+    parser.add_argument("--dir", type=Path, default=HISTORY_DIR, help="Where histories are saved and read from")
+    parser.add_argument("--iterations", type=int, default=10, help="Replays per history")
+    parser.add_argument("--budget-us-per-event", type=float, default=0, help="Fail if replay is slower than this (0: no budget)")
+    parser.add_argument("--require-histories", action="store_true", help="Fail if there are no histories to replay")
+    args = parser.parse_args()
+
+    if args.command == "capture":
+        await capture(args.dir)
+        return
+    sys.exit(await run(args.dir, args.iterations, args.budget_us_per_event, args.require_histories))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+"""
+Gift lookups as activities, local activities and inline workflow code.
+
+The scripted model asks for get_gift_info on all 12 days in one turn (the
+"gifts" scenario), and the workflow is run with get_gift_info in each tool
+mode. For every mode it reports the latency of a run and the history it
+leaves behind: total events, scheduled activities and local-activity
+markers.
+
+The lookup's simulated I/O defaults to 0 here, since a real dictionary
+lookup takes no time - what's left is what each mode costs on its own.
+Starts a local Temporal dev server and an in-process worker:
+
+    uv run python -m benchmarks.tool_modes --runs 10
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import timedelta
+
+from agents import set_tracing_disabled
+from temporalio.api.enums.v1 import EventType
+from temporalio.client import Client
+from temporalio.contrib.openai_agents import ModelActivityParameters, OpenAIAgentsPlugin
+from temporalio.testing import WorkflowEnvironment
+from temporalio.worker import Worker
+
+from durable_temporal import activities
+from durable_temporal.workflow import TOOL_MODES, AgentOptions, TwelveDaysWorkflow
+from twelve_days.scripted_model import SCENARIOS, ScriptedModelProvider, scenario_script
+from twelve_days.stats import percentile
+
+TASK_QUEUE = "benchmark-tool-modes"
+
+
+async def run_mode(client: Client, mode: str, runs: int) -> dict:
+    """Runs the gifts scenario `runs` times with get_gift_info in `mode`."""
+    options = AgentOptions(fast_path=False, tool_modes={"get_gift_info": mode})
+    latencies, events, scheduled, markers = [], 0, 0, 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        handle = await client.start_workflow(
+            TwelveDaysWorkflow.run,
+            args=[SCENARIOS["gifts"].prompt, options],
+            id=f"benchmark-tool-modes-{uuid.uuid4().hex[:12]}",
+            task_queue=TASK_QUEUE,
+        )
+        await handle.result()
+        latencies.append(time.perf_counter() - start)
+
+        history = await handle.fetch_history()
+        events += len(history.events)
+        scheduled += sum(event.event_type == EventType.EVENT_TYPE_ACTIVITY_TASK_SCHEDULED for event in history.events)
+        markers += sum(event.event_type == EventType.EVENT_TYPE_MARKER_RECORDED for event in history.events)
+
+    return {
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        # Scheduled activities include the model turns, which run as activities in every mode
+        "events": events / runs,
+        "activities": scheduled / runs,
+        "markers": markers / runs,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=10, help="Workflow runs per mode")
+    parser.add_argument("--tool-latency", type=float, default=0.0, help="Simulated seconds per gift lookup")
+    args = parser.parse_args()
+
+    activities.SIMULATED_LATENCY = args.tool_latency
+    set_tracing_disabled(True)
+
+    async with await WorkflowEnvironment.start_local() as env:
+        plugin = OpenAIAgentsPlugin(
+            model_params=ModelActivityParameters(start_to_close_timeout=timedelta(seconds=30)),
+            model_provider=ScriptedModelProvider(scenario_script),
+        )
+        client = Client(**{**env.client.config(), "plugins": [plugin]})
+
+        async with Worker(
+            client,
+            task_queue=TASK_QUEUE,
+            workflows=[TwelveDaysWorkflow],
+            activities=[activities.sing_verse, activities.sing_verses, activities.get_gift_info],
+        ):
+            results = {mode: await run_mode(client, mode, args.runs) for mode in TOOL_MODES}
+
+    print(f"\n{'='*60}")
+    print(f"🎁 12 get_gift_info calls in one model turn ({args.runs} runs per mode)")
+    print(f"{'='*60}")
+    print(f"{'':10} {'p50':>8} {'p95':>8} {'events':>7} {'activities':>11} {'markers':>8}")
+    for mode, result in results.items():
+        print(f"{mode:10} {result['p50']:7.3f}s {result['p95']:7.3f}s {result['events']:7.0f} "
+              f"{result['activities']:11.0f} {result['markers']:8.0f}")
+    print(f"{'='*60}\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
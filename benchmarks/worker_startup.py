@@ -0,0 +1,137 @@
+"""
+Worker startup and cache-miss cost, with and without sandbox passthrough.
+
+For each setting a fresh worker process is started (so imports are part of
+the measurement) against one local Temporal dev server, and it reports:
+
+- boot: process start to the worker polling
+- first workflow task: starting a workflow until its first task has run
+  (measured with a wait_for_progress update, answered in that task)
+- cache-miss task: queries against a finished workflow with the sticky cache
+  turned off, so each one builds a new sandbox and replays the history
+
+The workflow goes through the agent (fast path off) with a scripted model,
+so the history replayed includes the model and tool activities.
+
+    uv run python -m benchmarks.worker_startup --queries 20
+"""
+
+import time
+
+# Taken before anything heavy is imported, so boot time includes the imports
+_PROCESS_START = time.perf_counter()
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import uuid
+
+
+async def measure(target: str, namespace: str, passthrough: bool, queries: int) -> dict:
+    """Runs in the child process: boots a worker and times its workflow tasks."""
+    from datetime import timedelta
+
+    from temporalio.client import Client
+    from temporalio.contrib.openai_agents import ModelActivityParameters, OpenAIAgentsPlugin
+    from temporalio.worker import Worker
+
+    from durable_temporal.activities import get_gift_info, sing_verse, sing_verses
+    from durable_temporal.progress import Progress
+    from durable_temporal.worker import workflow_runner
+    from durable_temporal.workflow import AgentOptions, TwelveDaysWorkflow
+    from twelve_days.scripted_model import SCENARIOS, ScriptedModelProvider, scenario_script
+    from twelve_days.stats import percentile
+
+    task_queue = f"benchmark-startup-{uuid.uuid4().hex[:8]}"
+    client = await Client.connect(target, namespace=namespace, plugins=[OpenAIAgentsPlugin(
+        model_params=ModelActivityParameters(start_to_close_timeout=timedelta(seconds=30)),
+        model_provider=ScriptedModelProvider(scenario_script),
+    )])
+    worker = Worker(
+        client,
+        task_queue=task_queue,
+        workflows=[TwelveDaysWorkflow],
+        activities=[sing_verse, sing_verses, get_gift_info],
+        workflow_runner=workflow_runner(passthrough),
+        # Every workflow task is a cache miss: a fresh sandbox and a full replay
+        max_cached_workflows=0,
+    )
+    async with worker:
+        boot = time.perf_counter() - _PROCESS_START
+
+        start = time.perf_counter()
+        # The fast path would answer this without the agent; the scripted model keeps it cheap instead
+        handle = await client.start_workflow(
+            TwelveDaysWorkflow.run,
+            args=[SCENARIOS["gift"].prompt, AgentOptions(fast_path=False)],
+            id=f"benchmark-startup-{uuid.uuid4().hex[:12]}",
+            task_queue=task_queue,
+        )
+        await handle.execute_update(TwelveDaysWorkflow.wait_for_progress, -1)
+        first_task = time.perf_counter() - start
+        await handle.result()
+
+        latencies = []
+        for _ in range(queries):
+            start = time.perf_counter()
+            await handle.query(TwelveDaysWorkflow.progress, result_type=Progress)
+            latencies.append(time.perf_counter() - start)
+
+    return {
+        "boot": boot,
+        "first_task": first_task,
+        "cache_miss_p50": percentile(latencies, 50),
+        "cache_miss_p95": percentile(latencies, 95),
+    }
+
+
+async def run_child(target: str, namespace: str, passthrough: bool, queries: int) -> dict:
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "benchmarks.worker_startup",
+        "--child", "--target", target, "--namespace", namespace,
+        "--queries", str(queries), *([] if passthrough else ["--no-passthrough"]),
+        stdout=asyncio.subprocess.PIPE,
+        env={**os.environ, "TOOL_LATENCY_SECONDS": "0", "SIMULATE_FAILURES": "0"},
+    )
+    stdout, _ = await process.communicate()
+    # The last line is the JSON result; anything before it is worker output
+    return json.loads(stdout.decode().strip().splitlines()[-1])
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--queries", type=int, default=20, help="Cache-miss queries per setting")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--target", help=argparse.SUPPRESS)
+    parser.add_argument("--namespace", default="default", help=argparse.SUPPRESS)
+    parser.add_argument("--no-passthrough", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = await measure(args.target, args.namespace, not args.no_passthrough, args.queries)
+        print(json.dumps(result))
+        return
+
+    from temporalio.testing import WorkflowEnvironment
+
+    async with await WorkflowEnvironment.start_local() as env:
+        target = env.client.service_client.config.target_host
+        results = {
+            "passthrough": await run_child(target, env.client.namespace, True, args.queries),
+            "SDK defaults": await run_child(target, env.client.namespace, False, args.queries),
+        }
+
+    print(f"\n{'='*60}")
+    print(f"🚀 Worker startup and cache-miss workflow tasks ({args.queries} queries)")
+    print(f"{'='*60}")
+    print(f"{'':14} {'boot':>8} {'1st task':>9} {'miss p50':>9} {'miss p95':>9}")
+    for name, result in results.items():
+        print(f"{name:14} {result['boot']:7.2f}s {result['first_task']:8.3f}s "
+              f"{result['cache_miss_p50']:8.3f}s {result['cache_miss_p95']:8.3f}s")
+    print(f"{'='*60}\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
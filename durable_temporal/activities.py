@@ -3,75 +3,155 @@ Tool implementations for the 12 Days of Christmas AI Agent.
 
 These are Temporal activities that will be exposed to the OpenAI agent
 as tools using the activity_as_tool helper function.
+
+Failures are classified by errors.classify_errors, so only the ones worth
+retrying are retried (with the per-tool policies in workflow.TOOL_OPTIONS).
+Activities with a heartbeat timeout heartbeat in the background while they
+run, so a stuck or dead worker is noticed within that timeout rather than
+the much longer start-to-close timeout.
 """
 
 import asyncio
+import contextlib
+import os
+from typing import AsyncIterator, Callable, Optional
 from temporalio import activity
+from temporalio.service import RPCError
+
+from twelve_days.verses import gift_info, is_valid_day, log_verse, verse_result
+from .errors import classify_errors, forgot_verse
+from .progress import PROGRESS_SIGNAL, ToolProgress, reporting
 
-# The complete gift dictionary with emojis
-GIFTS = {
-    1: "🐦 A partridge in a pear tree",
-    2: "🕊️ Two turtle doves",
-    3: "🐔 Three French hens",
-    4: "🐦 Four calling birds",
-    5: "💍 FIVE GOLDEN RINGS",
-    6: "🪿 Six geese a-laying",
-    7: "🦢 Seven swans a-swimming",
-    8: "🥛 Eight maids a-milking",
-    9: "💃 Nine ladies dancing",
-    10: "🤴 Ten lords a-leaping",
-    11: "🎺 Eleven pipers piping",
-    12: "🥁 Twelve drummers drumming"
-}
+# Seconds each verse or gift lookup pretends to take
+SIMULATED_LATENCY = float(os.environ.get("TOOL_LATENCY_SECONDS", 3))
+
+# Whether day 5 is "forgotten" on the first attempts to show off retries
+SIMULATE_FAILURES = os.environ.get("SIMULATE_FAILURES", "1") != "0"
 
 
 @activity.defn
+@classify_errors
 async def sing_verse(day: int) -> str:
-    await asyncio.sleep(3)
     """Sings one verse of the 12 Days of Christmas song."""
-    if day < 1 or day > 12:
+    await _report_retry()
+    await asyncio.sleep(SIMULATED_LATENCY)
+    if not is_valid_day(day):
         return f"Invalid day: {day}. Must be between 1 and 12."
     
-    # Print the verse header
-    print(f"\n🎵 On the {'first' if day == 1 else 'second' if day == 2 else 'third' if day == 3 else str(day) + 'th'} day of Christmas,")
-    print(f"   my true love gave to me:")
-    
-    # Print the current day's gift
-    print(f"   {GIFTS[day]}")
-    
-    # Print previous gifts in reverse order
-    for prev_day in range(day - 1, 0, -1):
-        gift = GIFTS[prev_day]
-        # Add "and" before the partridge on multi-verse days
-        if prev_day == 1 and day > 1:
-            gift = "   And " + gift.lstrip("🐦 A").lstrip()
-            print(f"   🐦 {gift}")
-        else:
-            print(f"   {gift}")
-    
-    #Simulate an error
-    if day == 5:
-        attempt = activity.info().attempt
-        if attempt == 1:
-            raise ApplicationError("I'm sorry, I forgot what the 5th day of Christmas is...let me try again!")
-        elif attempt <= 3:
-            await asyncio.sleep(10)
-            raise ApplicationError("I'm sorry, I forgot what the 5th day of Christmas is...let me try again!")
+    # The full cumulative verse is precomputed - logged as one record
+    log_verse(activity.logger, day)
+    await _maybe_forget(day)
+    await _report_progress(day, finished=activity.info().attempt > 1)
     
     # Return statements reflect in the Temporal UI for tracking activity output
-    return f"✓ Completed verse {day}: {GIFTS[day]}"
+    return verse_result(day)
+
+
+@activity.defn
+@classify_errors
+async def sing_verses(start_day: int, end_day: int) -> str:
+    """Sings a range of verses (start_day through end_day) in a single activity.
+
+    Progress is heartbeated after every verse, so if the batch fails partway
+    through, the retry resumes from the last finished verse instead of
+    starting over.
+    """
+    if start_day < 1 or end_day > 12 or start_day > end_day:
+        return f"Invalid range: {start_day}-{end_day}. Days must be between 1 and 12, in order."
+
+    await _report_retry()
+
+    # Pick up where the previous attempt left off, if there was one
+    details = activity.info().heartbeat_details
+    completed = list(details[0]) if details else []
+
+    # Keeps heartbeating the finished verses while a verse is being sung
+    async with _keep_alive(lambda: (completed,)):
+        for day in range(start_day + len(completed), end_day + 1):
+            await asyncio.sleep(SIMULATED_LATENCY)
+            log_verse(activity.logger, day)
+            await _maybe_forget(day)
+            completed.append(verse_result(day))
+            # Checkpoint the finished verses so a retry doesn't re-sing them
+            activity.heartbeat(completed)
+            await _report_progress(day)
+
+    await _report_retry(finished=True)
+
+    # One line per day, so the agent and the Temporal UI see per-verse results
+    return "\n".join(completed)
 
 
 @activity.defn
+@classify_errors
 async def get_gift_info(day: int) -> str:
-    await asyncio.sleep(3)
     """Returns information about what gift comes on a specific day."""
-    if day < 1 or day > 12:
+    await _report_retry()
+    await asyncio.sleep(SIMULATED_LATENCY)
+    if not is_valid_day(day):
         return f"Invalid day: {day}. Must be between 1 and 12."
     
-    gift = GIFTS[day]
-    print(f"On day {day}, the gift is: {gift}")
+    info = lookup_gift(day)
+    activity.logger.info(info, extra={"day": day})
+    await _report_retry(finished=True)
     
     # Return statements reflect in the Temporal UI
-    return f"On day {day}, the gift is: {gift}"
+    return info
+
+
+def lookup_gift(day: int) -> str:
+    """Returns information about what gift comes on a specific day."""
+    # A pure lookup - the workflow can run this inline instead of as an activity
+    if not is_valid_day(day):
+        return f"Invalid day: {day}. Must be between 1 and 12."
+    return gift_info(day)
+
+
+async def _report_progress(day: Optional[int] = None, finished: bool = False) -> None:
+    """Tells the workflow about a finished verse or a retry, if its run asked for that (AgentOptions.report_progress)."""
+    if not reporting():
+        return
+    info = activity.info()
+    try:
+        handle = activity.client().get_workflow_handle(info.workflow_id, run_id=info.workflow_run_id)
+        await handle.signal(PROGRESS_SIGNAL, ToolProgress(info.activity_id, info.activity_type, info.attempt, day, finished))
+    except (RuntimeError, RPCError):
+        # No client (e.g. in tests) or the workflow is gone - progress is best effort
+        pass
+
+
+async def _report_retry(finished: bool = False) -> None:
+    """Reports a retry starting, or a retried activity succeeding."""
+    if activity.info().attempt > 1:
+        await _report_progress(finished=finished)
+
+
+@contextlib.asynccontextmanager
+async def _keep_alive(details: Callable[[], tuple] = tuple) -> AsyncIterator[None]:
+    """
+    Heartbeats in the background while the block runs, a few times per
+    heartbeat timeout. `details` gives the checkpoint to send each time, so
+    background heartbeats don't wipe out the activity's own.
+    """
+    timeout = activity.info().heartbeat_timeout
+    if not timeout:
+        yield
+        return
+
+    async def beat() -> None:
+        while True:
+            await asyncio.sleep(timeout.total_seconds() / 3)
+            activity.heartbeat(*details())
+
+    task = asyncio.create_task(beat())
+    try:
+        yield
+    finally:
+        task.cancel()
+
 
+async def _maybe_forget(day: int) -> None:
+    """Simulates forgetting the 5th day so Temporal's retries can be demoed."""
+    # Fails right away on the first three attempts - recovery is paced by the retry backoff
+    if SIMULATE_FAILURES and day == 5 and activity.info().attempt <= 3:
+        raise forgot_verse(day)
@@ -0,0 +1,142 @@
+"""
+Helpers for the agent's tools inside TwelveDaysWorkflow.
+
+When the model asks for several tools in one turn (say get_gift_info for
+days 3, 7 and 11), the Agents SDK runs them with asyncio.gather, so inside
+the workflow each call becomes its own activity and they all run at once.
+ToolCallLimiter puts a bound on that fan-out and hands out slots in song
+order, so earlier verses start first. Results still go back to the model
+in the original call order - gather takes care of that.
+
+Not every tool needs to be a full activity. local_activity_as_tool runs an
+activity as a local activity (in the worker already running the workflow,
+recorded as a single marker event), and inline_tool runs a pure,
+deterministic function directly in the workflow with nothing recorded.
+
+ToolQueueInterceptor sends the tool activities a workflow schedules to the
+worker's tool task queue, the way ModelActivityParameters.task_queue does
+for model calls, so the workers decide where tools run - not whoever
+started the workflow.
+"""
+
+import dataclasses
+import heapq
+import json
+from typing import Any, Callable, Iterable, Optional
+
+from agents import FunctionTool, function_tool
+from agents.function_schema import function_schema
+from temporalio import workflow
+from temporalio.worker import (
+    Interceptor,
+    StartActivityInput,
+    WorkflowInboundInterceptor,
+    WorkflowInterceptorClassInput,
+    WorkflowOutboundInterceptor,
+)
+
+
+def song_position(tool_input: str) -> int:
+    """The day a tool call is about, so queued calls can be started in song order."""
+    try:
+        args = json.loads(tool_input)
+    except ValueError:
+        return 0
+    day = args.get("day", args.get("start_day")) if isinstance(args, dict) else None
+    return day if isinstance(day, int) else 0
+
+
+class ToolCallLimiter:
+    """
+    Bounds how many tool activities run at once within a workflow.
+
+    Built on workflow.wait_condition, so which call gets the next free slot
+    is deterministic and replays identically.
+    """
+
+    def __init__(self, limit: int) -> None:
+        if limit < 1:
+            raise ValueError(f"Tool concurrency limit must be at least 1, got {limit}")
+        self.limit = limit
+        self._running = 0
+        self._waiting: list[tuple[int, int]] = []
+        self._next_ticket = 0
+
+    async def acquire(self, position: int) -> None:
+        ticket = (position, self._next_ticket)
+        self._next_ticket += 1
+        heapq.heappush(self._waiting, ticket)
+        # Conditions are checked once every call in the turn has queued up,
+        # so the lowest day always goes first
+        await workflow.wait_condition(
+            lambda: self._running < self.limit and self._waiting[0] == ticket
+        )
+        heapq.heappop(self._waiting)
+        self._running += 1
+
+    def release(self) -> None:
+        self._running -= 1
+
+    def wrap(self, tool: FunctionTool) -> FunctionTool:
+        """Returns a copy of the tool whose calls go through this limiter."""
+        invoke = tool.on_invoke_tool
+
+        async def on_invoke_tool(ctx: Any, tool_input: str) -> Any:
+            await self.acquire(song_position(tool_input))
+            try:
+                return await invoke(ctx, tool_input)
+            finally:
+                self.release()
+
+        return dataclasses.replace(tool, on_invoke_tool=on_invoke_tool)
+
+
+def local_activity_as_tool(fn: Callable, **options: Any) -> FunctionTool:
+    """Like activity_as_tool, but the activity runs as a local activity."""
+    schema = function_schema(fn)
+
+    async def run_local_activity(ctx: Any, tool_input: str) -> Any:
+        args, _ = schema.to_call_args(schema.params_pydantic_model(**json.loads(tool_input)))
+        return await workflow.execute_local_activity(fn, args=args, **options)
+
+    return FunctionTool(
+        name=schema.name,
+        description=schema.description or "",
+        params_json_schema=schema.params_json_schema,
+        on_invoke_tool=run_local_activity,
+    )
+
+
+def inline_tool(fn: Callable, name: str) -> FunctionTool:
+    """A tool that calls a pure, deterministic function right in the workflow."""
+    return function_tool(fn, name_override=name)
+
+
+class ToolQueueInterceptor(Interceptor):
+    """Schedules the named tool activities on `task_queue` unless the workflow picked a queue itself."""
+
+    def __init__(self, task_queue: str, tools: Iterable[Callable]) -> None:
+        self.task_queue = task_queue
+        self.activities = frozenset(tool.__name__ for tool in tools)
+
+    def workflow_interceptor_class(self, input: WorkflowInterceptorClassInput) -> Optional[type[WorkflowInboundInterceptor]]:
+        task_queue, activities = self.task_queue, self.activities
+
+        class _WorkflowToolQueue(WorkflowInboundInterceptor):
+            def init(self, outbound: WorkflowOutboundInterceptor) -> None:
+                super().init(_WorkflowToolQueueOutbound(outbound, task_queue, activities))
+
+        return _WorkflowToolQueue
+
+
+class _WorkflowToolQueueOutbound(WorkflowOutboundInterceptor):
+    def __init__(self, next: WorkflowOutboundInterceptor, task_queue: str, activities: frozenset) -> None:
+        super().__init__(next)
+        self._task_queue = task_queue
+        self._activities = activities
+
+    def start_activity(self, input: StartActivityInput) -> workflow.ActivityHandle:
+        # AgentOptions.tool_task_queue still wins for a run that names one
+        if input.activity in self._activities and input.task_queue is None:
+            input.task_queue = self._task_queue
+        return super().start_activity(input)
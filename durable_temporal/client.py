@@ -0,0 +1,64 @@
+"""
+Connecting to Temporal.
+
+Every entry point (worker, starter, Streamlit UI) connects the same way:
+to TEMPORAL_ADDRESS (default localhost:7233) with the OpenAI Agents plugin
+and the payload compression codec (see codec.py), and uses
+TEMPORAL_TASK_QUEUE (default twelve-days-queue).
+
+Model and tool activities go to the same queue unless
+TEMPORAL_MODEL_TASK_QUEUE or TEMPORAL_TOOL_TASK_QUEUE sends them to their
+own, so each kind of work can get its own workers (see worker.py --roles).
+"""
+
+import os
+from typing import Optional, Sequence
+
+from temporalio.client import Client, Interceptor
+from temporalio.contrib.openai_agents import OpenAIAgentsPlugin
+from temporalio.converter import DataConverter, PayloadCodec
+from temporalio.runtime import Runtime
+
+from .codec import codec_from_env
+from .workflow import TASK_QUEUE
+
+DEFAULT_ADDRESS = "localhost:7233"
+
+
+async def connect(
+    address: Optional[str] = None,
+    plugin: Optional[OpenAIAgentsPlugin] = None,
+    runtime: Optional[Runtime] = None,
+    interceptors: Sequence[Interceptor] = (),
+    codec: Optional[PayloadCodec] = None,
+) -> Client:
+    """
+    Connects to Temporal with the plugin that configures it for the OpenAI Agents SDK.
+
+    A runtime (e.g. one exporting metrics) and interceptors (e.g. tracing)
+    are optional; workers built on the client pick the interceptors up too.
+    Payloads are compressed with `codec`, or as PAYLOAD_COMPRESSION says.
+    """
+    # The plugin swaps in its own payload converter and keeps the codec
+    return await Client.connect(
+        address or os.environ.get("TEMPORAL_ADDRESS", DEFAULT_ADDRESS),
+        plugins=[plugin or OpenAIAgentsPlugin()],
+        data_converter=DataConverter(payload_codec=codec or codec_from_env()),
+        runtime=runtime,
+        interceptors=list(interceptors),
+    )
+
+
+def task_queue() -> str:
+    """The task queue workflows are started on and the worker polls."""
+    return os.environ.get("TEMPORAL_TASK_QUEUE", TASK_QUEUE)
+
+
+def model_task_queue() -> Optional[str]:
+    """The task queue for the model activities, or None for the workflow's own."""
+    return os.environ.get("TEMPORAL_MODEL_TASK_QUEUE") or None
+
+
+def tool_task_queue() -> Optional[str]:
+    """The task queue for the tool activities, or None for the workflow's own."""
+    return os.environ.get("TEMPORAL_TOOL_TASK_QUEUE") or None
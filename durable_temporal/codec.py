@@ -0,0 +1,105 @@
+"""
+Payload compression.
+
+Every model activity carries the whole conversation - the instructions, each
+tool call and result, emoji-heavy verses - as JSON, both as its input and in
+its output, and all of it lands in the workflow history. CompressionCodec
+compresses payloads above a size threshold before they leave the process,
+so histories (and with them replay and cache-miss workflow tasks) and the
+bytes sent to and from Temporal shrink. Small payloads, and ones that don't
+get smaller, are left alone.
+
+zlib is always available; zstd is used instead when asked for and the
+zstandard package is installed. Decoding handles both, and passes
+uncompressed payloads through, so clients without compression turned on can
+still be read by ones that have it.
+
+Every client and worker reading these workflows needs the codec - the
+Temporal UI and CLI show compressed payloads as binary unless they're
+pointed at a codec server.
+"""
+
+import logging
+import os
+import zlib
+from typing import Optional, Sequence
+
+from temporalio.api.common.v1 import Payload
+from temporalio.converter import PayloadCodec
+
+logger = logging.getLogger(__name__)
+
+ZLIB_ENCODING = b"binary/zlib"
+ZSTD_ENCODING = b"binary/zstd"
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def zstd_available() -> bool:
+    return _zstd() is not None
+
+
+class CompressionCodec(PayloadCodec):
+    """Compresses payloads of at least `threshold` bytes with zlib or zstd."""
+
+    def __init__(self, algorithm: str = "zlib", threshold: int = 256, level: Optional[int] = None) -> None:
+        if algorithm == "zstd" and not zstd_available():
+            logger.warning("⚠️  zstd compression needs zstandard (uv pip install zstandard) - using zlib instead")
+            algorithm = "zlib"
+        if algorithm not in ("zlib", "zstd"):
+            raise ValueError(f"Unknown compression algorithm: {algorithm}")
+        self.algorithm = algorithm
+        self.threshold = threshold
+        self.level = level
+
+    def _compress(self, data: bytes) -> tuple[bytes, bytes]:
+        if self.algorithm == "zstd":
+            compressor = _zstd().ZstdCompressor(level=self.level or 3)
+            return ZSTD_ENCODING, compressor.compress(data)
+        return ZLIB_ENCODING, zlib.compress(data, self.level or 6)
+
+    async def encode(self, payloads: Sequence[Payload]) -> list[Payload]:
+        encoded = []
+        for payload in payloads:
+            data = payload.SerializeToString()
+            if len(data) < self.threshold:
+                encoded.append(payload)
+                continue
+            encoding, compressed = self._compress(data)
+            if len(compressed) >= len(data):
+                encoded.append(payload)
+                continue
+            encoded.append(Payload(metadata={"encoding": encoding}, data=compressed))
+        return encoded
+
+    async def decode(self, payloads: Sequence[Payload]) -> list[Payload]:
+        decoded = []
+        for payload in payloads:
+            encoding = payload.metadata.get("encoding")
+            if encoding == ZLIB_ENCODING:
+                decoded.append(Payload.FromString(zlib.decompress(payload.data)))
+            elif encoding == ZSTD_ENCODING:
+                zstandard = _zstd()
+                if zstandard is None:
+                    raise RuntimeError("Payload is zstd-compressed but zstandard isn't installed")
+                decoded.append(Payload.FromString(zstandard.ZstdDecompressor().decompress(payload.data)))
+            else:
+                decoded.append(payload)
+        return decoded
+
+
+def codec_from_env() -> Optional[CompressionCodec]:
+    """
+    A CompressionCodec set up from PAYLOAD_COMPRESSION ("zlib" by default,
+    "zstd", or "off") and PAYLOAD_COMPRESSION_THRESHOLD (bytes, default 256).
+    """
+    algorithm = os.environ.get("PAYLOAD_COMPRESSION", "zlib").strip().lower()
+    if algorithm in ("", "off"):
+        return None
+    return CompressionCodec(algorithm, int(os.environ.get("PAYLOAD_COMPRESSION_THRESHOLD", 256)))
@@ -0,0 +1,83 @@
+"""
+Error classification shared by the tool activities.
+
+Temporal retries any activity failure unless told otherwise, so a bad
+argument would be retried until the attempts run out. Everything a tool
+raises goes through classify_errors instead, which turns it into an
+ApplicationError with a type from below: input errors are non-retryable and
+fail the tool call at once, anything else (a forgotten verse, a flaky
+dependency) is retried with the tool's retry policy.
+
+retry_policy builds those policies; it always carries NON_RETRYABLE_TYPES,
+so the workflow side and the activity side agree on what's worth retrying.
+"""
+
+import functools
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, TypeVar
+
+from temporalio.common import RetryPolicy
+from temporalio.exceptions import ApplicationError
+
+# Retryable: something that may well work on the next attempt
+TRANSIENT = "Transient"
+FORGOT_VERSE = "ForgotVerse"
+
+# Non-retryable: the same input will fail the same way every time
+INVALID_INPUT = "InvalidInput"
+
+NON_RETRYABLE_TYPES = [INVALID_INPUT]
+
+# Exceptions that mean the tool was called wrong, not that it had bad luck
+_INPUT_ERRORS = (ValueError, TypeError, KeyError, IndexError)
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+
+def forgot_verse(day: int) -> ApplicationError:
+    """The (simulated) failure of forgetting a verse - retryable."""
+    return ApplicationError(
+        f"I'm sorry, I forgot what the {day}th day of Christmas is...let me try again!",
+        type=FORGOT_VERSE,
+    )
+
+
+def classify(error: BaseException) -> ApplicationError:
+    """The ApplicationError Temporal should see for an exception raised by a tool."""
+    if isinstance(error, ApplicationError):
+        return error
+    if isinstance(error, _INPUT_ERRORS):
+        return ApplicationError(str(error), type=INVALID_INPUT, non_retryable=True)
+    return ApplicationError(f"{type(error).__name__}: {error}", type=TRANSIENT)
+
+
+def classify_errors(fn: F) -> F:
+    """Decorator for activities: anything they raise is classified first. Goes under @activity.defn."""
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        try:
+            return await fn(*args, **kwargs)
+        except Exception as error:
+            classified = classify(error)
+            if classified is error:
+                raise
+            raise classified from error
+
+    return wrapper  # type: ignore[return-value]
+
+
+def retry_policy(
+    initial_interval: float = 1.0,
+    backoff: float = 2.0,
+    maximum_interval: float = 10.0,
+    maximum_attempts: int = 5,
+) -> RetryPolicy:
+    """A tool's retry policy (intervals in seconds) that never retries NON_RETRYABLE_TYPES."""
+    return RetryPolicy(
+        initial_interval=timedelta(seconds=initial_interval),
+        backoff_coefficient=backoff,
+        maximum_interval=timedelta(seconds=maximum_interval),
+        maximum_attempts=maximum_attempts,
+        non_retryable_error_types=NON_RETRYABLE_TYPES,
+    )
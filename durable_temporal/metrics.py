@@ -0,0 +1,165 @@
+"""
+Metrics and tracing for the worker.
+
+Temporal's runtime metrics (workflow/activity task latencies, slot usage,
+poll results, ...) are served on a Prometheus endpoint when the worker is
+given a metrics address. MetricsInterceptor records ours through the same
+meter, so they're scraped from the same endpoint:
+
+- twelve_days_tool_latency: time spent in each tool activity
+- twelve_days_model_latency: time spent in each model activity
+- twelve_days_model_input_tokens / twelve_days_model_output_tokens: per model turn
+- twelve_days_activity_retries: retried activity attempts (e.g. the day-5 failures)
+- twelve_days_schedule_to_start_lag: how long activities waited for a worker
+- twelve_days_workflow_duration: workflow start to finish
+- twelve_days_route_latency / twelve_days_route_tokens: per model route
+  (recorded by twelve_days.model_routing, with route and model attributes)
+
+Every metric carries Temporal's own attributes (activity_type, workflow_type,
+task_queue, namespace), so they can be broken down per tool.
+
+Tracing is optional: with opentelemetry-sdk installed, tracing_interceptor()
+sets up an exporter (OTLP if its package is installed, the console
+otherwise) and Temporal's TracingInterceptor, which links the workflow,
+model turns and tool activities of one request into a single trace.
+"""
+
+import logging
+import time
+from datetime import timedelta
+from typing import Any, Optional, Type
+
+from temporalio import activity, workflow
+from temporalio.runtime import PrometheusConfig, Runtime, TelemetryConfig
+from temporalio.worker import (
+    ActivityInboundInterceptor,
+    ExecuteActivityInput,
+    ExecuteWorkflowInput,
+    Interceptor,
+    WorkflowInboundInterceptor,
+    WorkflowInterceptorClassInput,
+)
+
+logger = logging.getLogger(__name__)
+
+# Activity type the OpenAI Agents plugin uses for model calls
+MODEL_ACTIVITY = "invoke_model_activity"
+
+METRIC_NAMES = [
+    "twelve_days_tool_latency",
+    "twelve_days_model_latency",
+    "twelve_days_model_input_tokens",
+    "twelve_days_model_output_tokens",
+    "twelve_days_activity_retries",
+    "twelve_days_schedule_to_start_lag",
+    "twelve_days_workflow_duration",
+    "twelve_days_route_latency",
+    "twelve_days_route_tokens",
+]
+
+# The default buckets are for durations - token counts need their own
+_TOKEN_BUCKETS = [50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000]
+
+
+def prometheus_runtime(bind_address: str) -> Runtime:
+    """A Temporal runtime that serves metrics for Prometheus at http://<bind_address>/metrics."""
+    return Runtime(telemetry=TelemetryConfig(metrics=PrometheusConfig(
+        bind_address=bind_address,
+        durations_as_seconds=True,
+        histogram_bucket_overrides={
+            "twelve_days_model_input_tokens": _TOKEN_BUCKETS,
+            "twelve_days_model_output_tokens": _TOKEN_BUCKETS,
+            "twelve_days_route_tokens": _TOKEN_BUCKETS,
+        },
+    )))
+
+
+def offset_port(address: str, offset: int) -> str:
+    """"0.0.0.0:9464" with offset 2 -> "0.0.0.0:9466", so each worker process gets its own port."""
+    host, _, port = address.rpartition(":")
+    return f"{host}:{int(port) + offset}"
+
+
+def tracing_interceptor(service_name: str = "twelve-days-worker") -> Optional[Interceptor]:
+    """Temporal's OpenTelemetry interceptor with an exporter set up, or None without opentelemetry-sdk."""
+    try:
+        from opentelemetry import trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+        from temporalio.contrib.opentelemetry import TracingInterceptor
+    except ImportError:
+        logger.warning("⚠️  Tracing needs opentelemetry-sdk (uv pip install opentelemetry-sdk) - continuing without it")
+        return None
+
+    try:
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        exporter = OTLPSpanExporter()
+    except ImportError:
+        exporter = ConsoleSpanExporter()
+
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    return TracingInterceptor()
+
+
+class MetricsInterceptor(Interceptor):
+    """Records the twelve_days_* metrics for every activity and workflow on the worker."""
+
+    def intercept_activity(self, next: ActivityInboundInterceptor) -> ActivityInboundInterceptor:
+        return _ActivityMetrics(next)
+
+    def workflow_interceptor_class(
+        self, input: WorkflowInterceptorClassInput
+    ) -> Optional[Type[WorkflowInboundInterceptor]]:
+        return _WorkflowMetrics
+
+
+class _ActivityMetrics(ActivityInboundInterceptor):
+    async def execute_activity(self, input: ExecuteActivityInput) -> Any:
+        info = activity.info()
+        meter = activity.metric_meter()
+        is_model = info.activity_type == MODEL_ACTIVITY
+
+        meter.create_histogram_timedelta(
+            "twelve_days_schedule_to_start_lag", "Time an activity attempt waited for a worker"
+        ).record(max(info.started_time - info.current_attempt_scheduled_time, timedelta(0)))
+        if info.attempt > 1:
+            meter.create_counter(
+                "twelve_days_activity_retries", "Retried activity attempts"
+            ).add(1)
+
+        start = time.monotonic()
+        try:
+            result = await self.next.execute_activity(input)
+        finally:
+            elapsed = timedelta(seconds=time.monotonic() - start)
+            if is_model:
+                meter.create_histogram_timedelta(
+                    "twelve_days_model_latency", "Time spent in a model activity"
+                ).record(elapsed)
+            else:
+                meter.create_histogram_timedelta(
+                    "twelve_days_tool_latency", "Time spent in a tool activity"
+                ).record(elapsed)
+
+        usage = getattr(result, "usage", None) if is_model else None
+        if usage is not None:
+            meter.create_histogram(
+                "twelve_days_model_input_tokens", "Input tokens per model turn", "tokens"
+            ).record(usage.input_tokens)
+            meter.create_histogram(
+                "twelve_days_model_output_tokens", "Output tokens per model turn", "tokens"
+            ).record(usage.output_tokens)
+        return result
+
+
+class _WorkflowMetrics(WorkflowInboundInterceptor):
+    async def execute_workflow(self, input: ExecuteWorkflowInput) -> Any:
+        result = await self.next.execute_workflow(input)
+        # The workflow meter skips recording while replaying, so each run counts once
+        workflow.metric_meter().create_histogram_timedelta(
+            "twelve_days_workflow_duration", "Workflow start to finish"
+        ).record(workflow.now() - workflow.info().start_time)
+        return result
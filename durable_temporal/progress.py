@@ -0,0 +1,267 @@
+"""
+Live progress for TwelveDaysWorkflow runs.
+
+The workflow keeps a small Progress snapshot - verses sung so far, the tool
+calls in flight, activities being retried and the model's latest text - and
+exposes it through the `progress` query and the `wait_for_progress` update.
+The update is a long poll: it returns as soon as the snapshot moves past the
+version the caller already has, so clients can show each verse the moment
+it's sung instead of waiting for the whole song.
+
+ProgressHooks fills it in from the agent loop: tool calls starting and
+finishing, the verses in their results and the model's text. That costs no
+history at all. For verse-by-verse progress inside a long sing_verses call
+(and retries in flight), a run can opt in with AgentOptions.report_progress:
+ProgressInterceptor then tells its tool activities, through a header, to
+report each verse and retry back with the `report_progress` signal - every
+one of which adds a signal and a workflow task to the history.
+"""
+
+import asyncio
+import contextvars
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Optional
+
+from agents import RunHooks
+from temporalio import workflow
+from temporalio.client import (
+    WorkflowExecutionStatus,
+    WorkflowHandle,
+    WorkflowQueryFailedError,
+    WorkflowQueryRejectedError,
+    WorkflowUpdateFailedError,
+    WorkflowUpdateRPCTimeoutOrCancelledError,
+)
+from temporalio.converter import PayloadConverter
+from temporalio.service import RPCError
+from temporalio.worker import (
+    ActivityInboundInterceptor,
+    ExecuteActivityInput,
+    Interceptor,
+    StartActivityInput,
+    StartLocalActivityInput,
+    WorkflowInboundInterceptor,
+    WorkflowInterceptorClassInput,
+    WorkflowOutboundInterceptor,
+)
+
+from twelve_days.verses import verses_in_result
+
+# Names of the workflow's progress handlers, for callers without the workflow class
+PROGRESS_QUERY = "progress"
+PROGRESS_UPDATE = "wait_for_progress"
+PROGRESS_SIGNAL = "report_progress"
+
+# Header on a tool activity whose workflow wants its verses and retries signalled back
+PROGRESS_HEADER = "twelve-days-report-progress"
+
+_reporting: contextvars.ContextVar[bool] = contextvars.ContextVar("reporting_progress", default=False)
+
+
+def reporting() -> bool:
+    """Whether the running activity should signal its progress to the workflow."""
+    return _reporting.get()
+
+
+@dataclass
+class ToolProgress:
+    """Sent by an activity when it finishes a verse or starts a retry."""
+
+    activity_id: str
+    tool: str
+    attempt: int
+    day: Optional[int] = None
+    """The verse that was just sung, if any."""
+
+    finished: bool = False
+    """The activity succeeded, so it's no longer being retried."""
+
+
+@dataclass
+class Progress:
+    """Snapshot of a TwelveDaysWorkflow run, returned by its progress query and update."""
+
+    version: int = 0
+    """Bumped on every change, so long polls know when there's news."""
+
+    verses_completed: list[int] = field(default_factory=list)
+    current_tools: list[str] = field(default_factory=list)
+    retries: dict[str, int] = field(default_factory=dict)
+    """Attempt number of each activity currently being retried, keyed by "tool #activity_id"."""
+
+    partial_output: str = ""
+    """The most recent text the model produced."""
+
+    done: bool = False
+
+    def status(self) -> str:
+        """One line describing what the run is doing right now."""
+        if self.done:
+            return "✅ Done"
+        parts = [f"🎵 {len(self.verses_completed)} verse(s) sung"]
+        if self.current_tools:
+            parts.append(f"🔧 Running {', '.join(self.current_tools)}")
+        else:
+            parts.append("🤔 Thinking")
+        parts += [f"🔁 Retrying {key} (attempt {attempt})" for key, attempt in self.retries.items()]
+        return " · ".join(parts)
+
+    def tool_started(self, name: str) -> None:
+        self.current_tools.append(name)
+        self.version += 1
+
+    def tool_finished(self, name: str) -> None:
+        if name in self.current_tools:
+            self.current_tools.remove(name)
+        self.version += 1
+
+    def verses_sung(self, days: list[int]) -> None:
+        """Adds the verses a finished tool call sang."""
+        new = [day for day in days if day not in self.verses_completed]
+        if new:
+            self.verses_completed.extend(new)
+            self.version += 1
+
+    def apply(self, update: ToolProgress) -> None:
+        """Folds an activity's report into the snapshot."""
+        key = f"{update.tool} #{update.activity_id}"
+        if update.day is not None and update.day not in self.verses_completed:
+            self.verses_completed.append(update.day)
+        if update.finished:
+            self.retries.pop(key, None)
+        elif update.attempt > 1:
+            self.retries[key] = update.attempt
+        self.version += 1
+
+    def set_output(self, text: str) -> None:
+        self.partial_output = text
+        self.version += 1
+
+    def finish(self) -> None:
+        self.current_tools.clear()
+        self.retries.clear()
+        self.done = True
+        self.version += 1
+
+
+class ProgressHooks(RunHooks):
+    """Keeps a Progress snapshot up to date from the agent loop."""
+
+    def __init__(self, progress: Progress) -> None:
+        self.progress = progress
+
+    async def on_tool_start(self, context: Any, agent: Any, tool: Any) -> None:
+        self.progress.tool_started(tool.name)
+
+    async def on_tool_end(self, context: Any, agent: Any, tool: Any, result: str) -> None:
+        if isinstance(result, str):
+            self.progress.verses_sung(verses_in_result(result))
+        self.progress.tool_finished(tool.name)
+
+    async def on_llm_end(self, context: Any, agent: Any, response: Any) -> None:
+        text = "".join(
+            part.text
+            for item in response.output
+            if getattr(item, "type", None) == "message"
+            for part in item.content
+            if getattr(part, "type", None) == "output_text"
+        )
+        if text:
+            self.progress.set_output(text)
+
+
+class ProgressInterceptor(Interceptor):
+    """
+    Carries AgentOptions.report_progress from a workflow to its tool
+    activities: the workflow side adds PROGRESS_HEADER to the activities it
+    schedules, the activity side turns it into reporting().
+    """
+
+    def intercept_activity(self, next: ActivityInboundInterceptor) -> ActivityInboundInterceptor:
+        return _ActivityProgress(next)
+
+    def workflow_interceptor_class(self, input: WorkflowInterceptorClassInput) -> Optional[type[WorkflowInboundInterceptor]]:
+        return _WorkflowProgress
+
+
+class _ActivityProgress(ActivityInboundInterceptor):
+    async def execute_activity(self, input: ExecuteActivityInput) -> Any:
+        token = _reporting.set(PROGRESS_HEADER in input.headers)
+        try:
+            return await super().execute_activity(input)
+        finally:
+            _reporting.reset(token)
+
+
+class _WorkflowProgress(WorkflowInboundInterceptor):
+    def init(self, outbound: WorkflowOutboundInterceptor) -> None:
+        super().init(_WorkflowProgressOutbound(outbound))
+
+
+class _WorkflowProgressOutbound(WorkflowOutboundInterceptor):
+    def start_activity(self, input: StartActivityInput) -> workflow.ActivityHandle:
+        _add_header(input)
+        return super().start_activity(input)
+
+    def start_local_activity(self, input: StartLocalActivityInput) -> workflow.ActivityHandle:
+        _add_header(input)
+        return super().start_local_activity(input)
+
+
+def _add_header(input: Any) -> None:
+    # Only workflows that opted in (AgentWorkflowBase.wants_activity_progress)
+    if getattr(workflow.instance(), "wants_activity_progress", False):
+        input.headers = {**input.headers, PROGRESS_HEADER: PayloadConverter.default.to_payload(True)}
+
+
+async def watch_progress(
+    handle: WorkflowHandle, interval: float = 0.5, long_poll: bool = False
+) -> AsyncIterator[Progress]:
+    """
+    Yields each new Progress snapshot of a run until it's done.
+
+    By default it polls the `progress` query every `interval` seconds -
+    queries leave nothing in the history. With long_poll it uses the
+    `wait_for_progress` update instead, so a snapshot arrives the moment
+    something changes, at the cost of update events in the history. Stops
+    quietly if the run has already finished.
+    """
+    if long_poll:
+        async for progress in _long_poll_progress(handle):
+            yield progress
+        return
+
+    version = -1
+    while True:
+        try:
+            progress = await handle.query(PROGRESS_QUERY, result_type=Progress)
+            if progress.version == version and not progress.done:
+                # Nothing new - make sure the run hasn't failed or been terminated
+                if (await handle.describe()).status != WorkflowExecutionStatus.RUNNING:
+                    return
+        except (RPCError, WorkflowQueryFailedError, WorkflowQueryRejectedError):
+            # The workflow is gone (or was never there) - nothing left to watch
+            return
+        if progress.version != version:
+            version = progress.version
+            yield progress
+        if progress.done:
+            return
+        await asyncio.sleep(interval)
+
+
+async def _long_poll_progress(handle: WorkflowHandle) -> AsyncIterator[Progress]:
+    version = -1
+    while True:
+        try:
+            progress = await handle.execute_update(PROGRESS_UPDATE, version, result_type=Progress)
+        except WorkflowUpdateRPCTimeoutOrCancelledError:
+            # Nothing changed before the server's long-poll deadline - ask again
+            continue
+        except (WorkflowUpdateFailedError, RPCError):
+            # Updates can't be delivered to a closed workflow - nothing left to watch
+            return
+        version = progress.version
+        yield progress
+        if progress.done:
+            return
@@ -0,0 +1,236 @@
+"""
+A long-lived agent session per user.
+
+TwelveDaysWorkflow answers one prompt and is done, so every question pays
+for a new workflow and starts the conversation from scratch. SessionWorkflow
+stays running instead: prompts arrive through the `ask` update (which waits
+for the answer) or the `send` signal (fire and forget), and the conversation
+is carried from turn to turn so follow-ups ("and the day after that?") have
+context.
+
+To keep the event history - and with it the cost of replaying the session -
+bounded, the workflow continues as new once the history passes the
+SessionOptions thresholds (or Temporal suggests it), carrying forward a
+compacted conversation: the prompts and answers of the last few turns,
+without the tool calls and results in between.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Optional
+
+from temporalio import workflow
+from temporalio.exceptions import ApplicationError
+
+from .progress import Progress
+from .workflow import AgentOptions, AgentWorkflowBase
+
+# Error type of an ask rejected while the session closes or rolls over - worth asking again
+NOT_ACCEPTING = "SessionNotAccepting"
+
+
+@dataclass
+class SessionOptions:
+    """Settings for a SessionWorkflow, kept across continue-as-new."""
+
+    agent: AgentOptions = field(default_factory=AgentOptions)
+
+    max_history_events: int = 2000
+    """Continue as new once the event history is this long..."""
+
+    max_history_bytes: int = 2_000_000
+    """...or this big."""
+
+    max_turns_per_run: int = 100
+    """...or once this many prompts were answered in one run, whichever comes first."""
+
+    keep_turns: int = 10
+    """How many prompt/answer pairs are carried into the next run."""
+
+    idle_timeout_seconds: float = 3600
+    """The session ends after this long without a prompt."""
+
+
+@dataclass
+class SessionState:
+    """Everything a session carries from one run to the next."""
+
+    options: SessionOptions = field(default_factory=SessionOptions)
+    conversation: list = field(default_factory=list)
+    turns: int = 0
+    """Prompts answered over the whole session, across runs."""
+
+    pending: list[str] = field(default_factory=list)
+    """Prompts sent but not answered yet."""
+
+    ending: bool = False
+    """The session was ended before it rolled over; the next run answers what's pending and stops."""
+
+
+def _message_text(item: Any) -> str:
+    content = item.get("content")
+    if isinstance(content, str):
+        return content
+    return "".join(part.get("text", "") for part in content or [] if isinstance(part, dict))
+
+
+def compact_conversation(items: list, keep_turns: int) -> list:
+    """
+    The conversation boiled down to the last `keep_turns` prompts and their
+    answers, as plain messages - tool calls and results are dropped.
+    """
+    turns: list[list[dict]] = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        role = item.get("role")
+        if role == "user":
+            turns.append([{"role": "user", "content": _message_text(item)}])
+        elif role == "assistant" and turns:
+            text = _message_text(item)
+            if text:
+                turns[-1].append({"role": "assistant", "content": text})
+    return [message for turn in turns[-keep_turns:] for message in turn] if keep_turns > 0 else []
+
+
+@workflow.defn
+class SessionWorkflow(AgentWorkflowBase):
+    """
+    One user's ongoing conversation with the 12 Days of Christmas agent.
+
+    Prompts are answered one at a time, in the order they arrive. Start it
+    with update-with-start (see workflow_ids.ask_session) so the first
+    question also creates the session.
+    """
+
+    @workflow.init
+    def __init__(self, state: Optional[SessionState] = None) -> None:
+        super().__init__()
+        self._state = state or SessionState()
+        self._queue: list[tuple[int, str]] = []
+        self._waiting: set[int] = set()
+        self._answers: dict[int, str] = {}
+        self._last_answer: Optional[str] = None
+        self._ending = self._state.ending
+        self._accepting = not self._ending
+        self._rolling_over = False
+        self._turns_this_run = 0
+        self._next_turn = self._state.turns
+        for prompt in self._state.pending:
+            self._enqueue(prompt)
+
+    @workflow.run
+    async def run(self, state: Optional[SessionState] = None) -> int:
+        """
+        Answers prompts until the session is ended or goes idle.
+
+        Returns:
+            How many prompts the session answered in total
+        """
+        options = self._state.options
+        workflow.logger.info(f"🎅 Session {workflow.info().workflow_id} ready (turn {self._state.turns})")
+
+        while True:
+            # Checked after every turn, so a steady stream of prompts can't keep the history growing
+            if not self._rolling_over and self._should_roll_over(options):
+                workflow.logger.info(f"🔄 Continuing session as new after {self._state.turns} turns")
+                self._rolling_over, self._accepting = True, False
+
+            next_prompt = self._next_prompt()
+            if next_prompt is not None:
+                turn, prompt = next_prompt
+                # A fresh snapshot per prompt; the version keeps counting so long polls see it
+                self._progress = Progress(version=self._progress.version + 1)
+                answer, self._state.conversation = await self._answer(
+                    prompt, options.agent, self._state.conversation
+                )
+                self._state.turns += 1
+                self._turns_this_run += 1
+                self._last_answer = answer
+                if turn in self._waiting:
+                    self._answers[turn] = answer
+                continue
+
+            if self._rolling_over:
+                await self._finish()
+                if self._ending and not self._queue:
+                    return self._state.turns
+                workflow.continue_as_new(self._carry_forward())
+
+            try:
+                await workflow.wait_condition(
+                    lambda: bool(self._queue) or not self._accepting,
+                    timeout=timedelta(seconds=options.idle_timeout_seconds),
+                )
+            except asyncio.TimeoutError:
+                workflow.logger.info(f"💤 Session idle for {options.idle_timeout_seconds:.0f}s - ending it")
+                self._accepting = False
+
+            if not self._accepting and not self._queue:
+                await self._finish()
+                return self._state.turns
+
+    @workflow.update
+    async def ask(self, prompt: str) -> str:
+        """Asks the agent something and waits for the answer."""
+        turn = self._enqueue(prompt)
+        self._waiting.add(turn)
+        await workflow.wait_condition(lambda: turn in self._answers)
+        self._waiting.discard(turn)
+        return self._answers.pop(turn)
+
+    @ask.validator
+    def _validate_ask(self, prompt: str) -> None:
+        # Rejected updates leave no trace in history, so callers can just retry
+        if not self._accepting:
+            raise ApplicationError("The session is closing or rolling over - please ask again", type=NOT_ACCEPTING)
+        if not prompt.strip():
+            raise ValueError("Prompt is empty")
+
+    @workflow.signal
+    def send(self, prompt: str) -> None:
+        """Queues a prompt without waiting; read the answer with the last_answer query."""
+        self._enqueue(prompt)
+
+    @workflow.signal
+    def end(self) -> None:
+        """Ends the session once any queued prompts are answered."""
+        self._ending, self._accepting = True, False
+
+    @workflow.query
+    def last_answer(self) -> Optional[str]:
+        return self._last_answer
+
+    def _enqueue(self, prompt: str) -> int:
+        turn = self._next_turn
+        self._next_turn += 1
+        self._queue.append((turn, prompt))
+        return turn
+
+    def _next_prompt(self) -> Optional[tuple[int, str]]:
+        # Updates can't follow the session into its next run, so while rolling over only
+        # prompts someone is waiting on are answered here; the rest are carried forward
+        for index, (turn, _) in enumerate(self._queue):
+            if not self._rolling_over or turn in self._waiting:
+                return self._queue.pop(index)
+        return None
+
+    def _should_roll_over(self, options: SessionOptions) -> bool:
+        info = workflow.info()
+        return (
+            self._turns_this_run >= options.max_turns_per_run
+            or info.get_current_history_length() >= options.max_history_events
+            or info.get_current_history_size() >= options.max_history_bytes
+            or info.is_continue_as_new_suggested()
+        )
+
+    def _carry_forward(self) -> SessionState:
+        """The state for the next run, with the conversation compacted."""
+        return SessionState(
+            options=self._state.options,
+            conversation=compact_conversation(self._state.conversation, self._state.options.keep_turns),
+            turns=self._state.turns,
+            pending=[prompt for _, prompt in self._queue],
+            ending=self._ending,
+        )
@@ -2,31 +2,90 @@
 Starter script for the 12 Days of Christmas AI Agent.
 
 This connects to Temporal and starts a workflow execution.
-The workflow ID is important - using the same ID allows resuming after crashes!
+Each request gets its own workflow ID, so several people can run the agent
+at once. The workflow ID is also your resume token - pass it to --resume
+to reattach to a run after a crash!
+
+With --session NAME, questions go to a long-lived session workflow instead,
+so follow-up questions keep the conversation's context.
+
+With --batch PROMPTS.jsonl (or - for stdin) it runs without asking anything:
+every prompt becomes a workflow, started through one client with bounded
+concurrency (plus an optional rate, count and deadline), and each result is
+written out as a JSON line as it finishes - handy for soak-testing workers:
+
+    uv run python -m durable_temporal.starter --batch prompts.jsonl --concurrency 50 --rate 10 --count 1000 --output results.jsonl
 """
 
+import argparse
 import asyncio
-from temporalio.client import Client
-from .workflow import TwelveDaysWorkflow
-from temporalio.contrib.openai_agents import OpenAIAgentsPlugin
-from temporalio.common import WorkflowIDReusePolicy
 from dotenv import load_dotenv
 import os
 
+from twelve_days.load import LoadSettings, add_load_arguments, run_batch
+from twelve_days.verses import print_verse
+
+from .client import connect
+from .progress import watch_progress
+from .workflow import AgentOptions
+from .workflow_ids import ask_session, resume_twelve_days, start_twelve_days
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the 12 Days of Christmas agent workflow.")
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Attach to an identical request that is already running instead of starting a new one",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="TOKEN",
+        help="Reattach to an earlier run using the resume token it printed",
+    )
+    parser.add_argument(
+        "--session",
+        metavar="NAME",
+        help="Keep asking questions in NAME's ongoing session (empty line to quit)",
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="PROMPTS",
+        help="Run every prompt in a JSONL file (- for stdin) as its own workflow, without prompting",
+    )
+    parser.add_argument(
+        "--report-progress",
+        action="store_true",
+        help="Have the activities report every verse and retry as it happens (adds history events per verse)",
+    )
+    add_load_arguments(parser)
+    return parser.parse_args()
+
 
 async def main():
     """Start the 12 Days of Christmas workflow."""
+    args = parse_args()
+    
     # Load environment variables
     load_dotenv()
     
-    client = await Client.connect(
-        "localhost:7233",
-        # Use the plugin to configure Temporal for use with OpenAI Agents SDK
-        plugins=[OpenAIAgentsPlugin()],
-    )
+    # Connects with the plugin that configures Temporal for the OpenAI Agents SDK
+    client = await connect()
+    
+    if args.session:
+        await run_session(client, args.session)
+        return
     
-    # The user's request - change this to test different scenarios!
-    print("""🎄 Welcome to the 12 Days of Christmas AI Agent! 🎵
+    if args.batch:
+        await run_workflow_batch(client, args)
+        return
+    
+    if args.resume:
+        handle = resume_twelve_days(client, args.resume)
+        print(f"\n🔄 Reattaching to workflow {args.resume}...\n")
+    else:
+        # The user's request - change this to test different scenarios!
+        print("""🎄 Welcome to the 12 Days of Christmas AI Agent! 🎵
     
 You can ask questions like:
     🎁 Please sing the entire 12 Days of Christmas song for me!
@@ -34,22 +93,25 @@ You can ask questions like:
     🎁 Sing days 1 through 5
     🎁 Tell me about the gift on day 5
 """)
-    user_request = input("What would you like to do?: ")
+        user_request = input("What would you like to do?: ")
+        
+        print(f"\n{'='*60}")
+        print(f"🎵 Starting 12 Days of Christmas Workflow")
+        print(f"{'='*60}")
+        print(f"📨 Request: {user_request}")
+        
+        # Start the workflow (or attach to an identical running one with --dedup)
+        handle = await start_twelve_days(
+            client, user_request, dedup=args.dedup, options=AgentOptions(report_progress=args.report_progress)
+        )
+        
+        print(f"🔖 Resume token: {handle.id}")
+        print(f"   (rerun with --resume {handle.id} to reattach after a crash)")
+        print(f"{'='*60}\n")
     
-    print(f"\n{'='*60}")
-    print(f"🎵 Starting 12 Days of Christmas Workflow")
-    print(f"{'='*60}")
-    print(f"📨 Request: {user_request}")
-    print(f"{'='*60}\n")
-    
-    # Execute workflow
-    result = await client.execute_workflow(
-        TwelveDaysWorkflow.run,
-        user_request,
-        id="twelve-days-demo",  # Same ID = resume capability!
-        task_queue="twelve-days-queue",
-        id_reuse_policy=WorkflowIDReusePolicy.TERMINATE_IF_RUNNING,
-    )
+    # Show each verse as soon as it's sung, then wait for the final answer
+    await show_progress(handle)
+    result = await handle.result()
     
     print(f"\n{'='*60}")
     print(f"🎉 Workflow Completed Successfully!")
@@ -58,7 +120,44 @@ You can ask questions like:
     print(f"{'='*60}\n")
 
 
+async def run_session(client, user: str) -> None:
+    """Asks question after question in the user's session until an empty line."""
+    print(f"🎄 Session for {user} - ask away! (empty line to quit)\n")
+    while True:
+        user_request = input("❓ ").strip()
+        if not user_request:
+            break
+        answer = await ask_session(client, user, user_request)
+        print(f"\n{answer}\n")
+
+
+async def run_workflow_batch(client, args: argparse.Namespace) -> None:
+    """Runs the prompts in args.batch as workflows, all through the one client."""
+
+    async def run_one(prompt: str) -> dict:
+        handle = await start_twelve_days(client, prompt, dedup=args.dedup)
+        return {"workflow_id": handle.id, "answer": await handle.result()}
+
+    await run_batch(args.batch, run_one, LoadSettings.from_args(args), args.output, "Temporal")
+
+
+async def show_progress(handle) -> None:
+    """Prints verses, tool calls, retries and model text as the workflow reports them."""
+    shown_verses = set()
+    last_status = last_output = None
+    async for progress in watch_progress(handle):
+        for day in progress.verses_completed:
+            if day not in shown_verses:
+                shown_verses.add(day)
+                print_verse(day)
+        if progress.partial_output and progress.partial_output != last_output and not progress.done:
+            last_output = progress.partial_output
+            print(f"💬 {last_output}")
+        status = progress.status()
+        if status != last_status:
+            last_status = status
+            print(status)
+
 
 if __name__ == "__main__":
     asyncio.run(main())
-
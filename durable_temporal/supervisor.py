@@ -0,0 +1,97 @@
+"""
+Supervisor for running several worker processes.
+
+Starts N copies of the worker (one per CPU core by default), restarts any
+that crash - with a growing backoff so a worker that can't start doesn't
+spin - and on Ctrl+C or SIGTERM asks every child to shut down gracefully
+before exiting.
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+# How long children get to finish shutting down before they're killed
+SHUTDOWN_GRACE_SECONDS = 30.0
+# Restart backoff: doubles per quick crash, resets once a child stays up
+MIN_BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 30.0
+HEALTHY_AFTER_SECONDS = 60.0
+
+
+@dataclass
+class _Child:
+    index: int
+    process: Optional[subprocess.Popen] = None
+    started_at: float = 0.0
+    backoff: float = MIN_BACKOFF_SECONDS
+    restart_at: float = 0.0
+
+
+def supervise(processes: int, child_args: list[str]) -> int:
+    """
+    Runs `processes` workers (0 means one per CPU core) until told to stop.
+
+    child_args are passed to each `python -m durable_temporal.worker`.
+    Returns the exit code for the supervisor.
+    """
+    count = processes if processes > 0 else (os.cpu_count() or 1)
+    stopping = False
+
+    def request_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    def start(child: _Child) -> None:
+        # WORKER_INDEX lets each child pick its own metrics port
+        child.process = subprocess.Popen(
+            [sys.executable, "-m", "durable_temporal.worker", *child_args],
+            env={**os.environ, "WORKER_INDEX": str(child.index)},
+        )
+        child.started_at = time.monotonic()
+        print(f"🚀 Worker {child.index} started (pid {child.process.pid})")
+
+    children = [_Child(index) for index in range(count)]
+    print(f"\n🧑‍✈️ Supervising {count} worker processes (pid {os.getpid()})\n")
+    for child in children:
+        start(child)
+
+    while not stopping:
+        now = time.monotonic()
+        for child in children:
+            if child.process is None:
+                if now >= child.restart_at:
+                    start(child)
+                continue
+            code = child.process.poll()
+            if code is None:
+                # Up long enough to count as healthy again
+                if now - child.started_at > HEALTHY_AFTER_SECONDS:
+                    child.backoff = MIN_BACKOFF_SECONDS
+                continue
+            print(f"💥 Worker {child.index} exited with code {code}, restarting in {child.backoff:.0f}s")
+            child.process = None
+            child.restart_at = now + child.backoff
+            child.backoff = min(child.backoff * 2, MAX_BACKOFF_SECONDS)
+        time.sleep(0.5)
+
+    print(f"\n👋 Stopping {count} worker processes...")
+    running = [child.process for child in children if child.process and child.process.poll() is None]
+    for process in running:
+        process.send_signal(signal.SIGTERM)
+    deadline = time.monotonic() + SHUTDOWN_GRACE_SECONDS
+    for process in running:
+        try:
+            process.wait(timeout=max(0.0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            print(f"⚠️  Worker pid {process.pid} didn't stop in time, killing it")
+            process.kill()
+            process.wait()
+    return 0
@@ -3,56 +3,311 @@ Temporal worker for the 12 Days of Christmas AI Agent.
 
 The worker listens for workflow tasks and executes them.
 Run this in one terminal, then run starter.py in another to execute workflows.
+
+Concurrency (activity/workflow task slots, pollers, the sticky workflow
+cache) can be tuned with flags or WORKER_* environment variables, and
+--processes starts several worker processes under a supervisor - one
+Python process running both the workflow sandbox and the activities
+saturates a single core long before the Temporal server does.
+
+Workflow tasks (CPU-bound replay in the sandbox), model activities (slow
+OpenAI calls) and tool activities can each be given their own task queue
+(TEMPORAL_MODEL_TASK_QUEUE, TEMPORAL_TOOL_TASK_QUEUE), and --roles picks
+which of them a worker process takes on, so each kind of work can be
+scaled - and limited - on its own.
 """
 
+import argparse
 import asyncio
+import contextlib
 import os
+import signal
+import sys
+from dataclasses import dataclass
 from dotenv import load_dotenv
 from datetime import timedelta
-from temporalio.client import Client
+from typing import Optional
 from temporalio.worker import Worker
+from temporalio.worker.workflow_sandbox import SandboxedWorkflowRunner, SandboxRestrictions
 from temporalio.contrib.openai_agents import OpenAIAgentsPlugin, ModelActivityParameters
 
+from .client import connect, model_task_queue, task_queue, tool_task_queue
+from .metrics import MetricsInterceptor, offset_port, prometheus_runtime, tracing_interceptor
+from .progress import ProgressInterceptor
+from .agent_tools import ToolQueueInterceptor
+from .supervisor import supervise
+from .session import SessionWorkflow
 from .workflow import TwelveDaysWorkflow
-from .activities import sing_verse, get_gift_info
+from .activities import sing_verse, sing_verses, get_gift_info
+from twelve_days import model_cache, model_routing
+from twelve_days.logs import configure_logging
 
+# Modules the workflow sandbox uses as-is instead of re-importing them for
+# every workflow run that isn't in the sticky cache. All are deterministic:
+# pure data and parsing code, or code that only runs inside activities.
+# (pydantic, openai, agents and temporalio are passed through by the SDK.)
+SANDBOX_PASSTHROUGH_MODULES = [
+    "pydantic_core",
+    "annotated_types",
+    "twelve_days",
+    "durable_temporal.activities",
+    "durable_temporal.agent_tools",
+    "durable_temporal.errors",
+    "durable_temporal.progress",
+]
 
-async def main():
-    """Start the Temporal worker."""
-    # Load environment variables from .env file
-    load_dotenv()
-    
-    client = await Client.connect(
-        "localhost:7233",
-        plugins=[
-            OpenAIAgentsPlugin(
-                model_params=ModelActivityParameters(
-                    start_to_close_timeout=timedelta(seconds=30)
-                )
-            ),
-        ],
+
+# The kinds of work a worker can take on
+ROLES = ("workflow", "model", "tools")
+
+
+def parse_roles(text: str) -> tuple[str, ...]:
+    """"workflow,model" -> ("workflow", "model")."""
+    roles = tuple(role.strip() for role in text.split(",") if role.strip())
+    unknown = [role for role in roles if role not in ROLES]
+    if unknown or not roles:
+        raise argparse.ArgumentTypeError(f"Bad roles {text!r}. Expected a comma-separated subset of {','.join(ROLES)}")
+    return roles
+
+
+def workflow_runner(passthrough: bool = True) -> SandboxedWorkflowRunner:
+    """The sandboxed runner, with SANDBOX_PASSTHROUGH_MODULES passed through unless turned off."""
+    if not passthrough:
+        return SandboxedWorkflowRunner()
+    return SandboxedWorkflowRunner(
+        restrictions=SandboxRestrictions.default.with_passthrough_modules(*SANDBOX_PASSTHROUGH_MODULES)
     )
-    
-    worker = Worker(
+
+
+@dataclass
+class WorkerSettings:
+    """How the worker connects and how much work it takes on at once."""
+
+    address: Optional[str] = None
+    task_queue: Optional[str] = None
+    max_concurrent_activities: Optional[int] = None
+    max_concurrent_workflow_tasks: Optional[int] = None
+    workflow_pollers: Optional[int] = None
+    activity_pollers: Optional[int] = None
+    max_cached_workflows: int = 1000
+    processes: int = 1
+    metrics_address: Optional[str] = None
+    tracing: bool = False
+    log_level: Optional[str] = None
+    roles: tuple[str, ...] = ROLES
+    model_task_queue: Optional[str] = None
+    tool_task_queue: Optional[str] = None
+    model_max_concurrent_activities: Optional[int] = None
+    tool_max_concurrent_activities: Optional[int] = None
+
+    def role_queues(self) -> dict[str, tuple[str, ...]]:
+        """This process's roles, grouped by the task queue each polls - roles sharing a queue share a worker."""
+        workflow_queue = self.task_queue or task_queue()
+        queues = {
+            "workflow": workflow_queue,
+            "model": self.model_task_queue or workflow_queue,
+            "tools": self.tool_task_queue or workflow_queue,
+        }
+        grouped: dict[str, tuple[str, ...]] = {}
+        for role in self.roles:
+            grouped[queues[role]] = grouped.get(queues[role], ()) + (role,)
+        return grouped
+
+
+def _env_int(name: str, default: Optional[int] = None) -> Optional[int]:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def parse_args(argv: Optional[list[str]] = None) -> WorkerSettings:
+    """Reads worker settings from flags, falling back to WORKER_* environment variables."""
+    defaults = WorkerSettings()
+    parser = argparse.ArgumentParser(description="Run the 12 Days of Christmas Temporal worker.")
+    parser.add_argument("--address", default=os.environ.get("TEMPORAL_ADDRESS"),
+                        help="Temporal frontend address (env TEMPORAL_ADDRESS, default localhost:7233)")
+    parser.add_argument("--task-queue", default=os.environ.get("TEMPORAL_TASK_QUEUE"),
+                        help="Task queue for workflow tasks (env TEMPORAL_TASK_QUEUE, default twelve-days-queue)")
+    parser.add_argument("--model-task-queue", default=model_task_queue(),
+                        help="Task queue for model activities (env TEMPORAL_MODEL_TASK_QUEUE, default: the workflow queue)")
+    parser.add_argument("--tool-task-queue", default=tool_task_queue(),
+                        help="Task queue for tool activities (env TEMPORAL_TOOL_TASK_QUEUE, default: the workflow queue). "
+                             "Workflow workers schedule the tools there; tools workers poll it")
+    parser.add_argument("--roles", type=parse_roles, default=os.environ.get("WORKER_ROLES", ",".join(ROLES)),
+                        help=f"Which work to take on, any of {','.join(ROLES)} (env WORKER_ROLES, default all)")
+    parser.add_argument("--max-concurrent-activities", type=int,
+                        default=_env_int("WORKER_MAX_CONCURRENT_ACTIVITIES"),
+                        help="Activity slots per process (env WORKER_MAX_CONCURRENT_ACTIVITIES, SDK default 100)")
+    parser.add_argument("--model-max-concurrent-activities", type=int,
+                        default=_env_int("WORKER_MODEL_MAX_CONCURRENT_ACTIVITIES"),
+                        help="Model activity slots, when model activities have their own queue "
+                             "(env WORKER_MODEL_MAX_CONCURRENT_ACTIVITIES, default --max-concurrent-activities)")
+    parser.add_argument("--tool-max-concurrent-activities", type=int,
+                        default=_env_int("WORKER_TOOL_MAX_CONCURRENT_ACTIVITIES"),
+                        help="Tool activity slots, when tools have their own queue "
+                             "(env WORKER_TOOL_MAX_CONCURRENT_ACTIVITIES, default --max-concurrent-activities)")
+    parser.add_argument("--max-concurrent-workflow-tasks", type=int,
+                        default=_env_int("WORKER_MAX_CONCURRENT_WORKFLOW_TASKS"),
+                        help="Workflow task slots per process (env WORKER_MAX_CONCURRENT_WORKFLOW_TASKS, SDK default 100)")
+    parser.add_argument("--workflow-pollers", type=int, default=_env_int("WORKER_WORKFLOW_POLLERS"),
+                        help="Concurrent workflow task polls (env WORKER_WORKFLOW_POLLERS, SDK default 5)")
+    parser.add_argument("--activity-pollers", type=int, default=_env_int("WORKER_ACTIVITY_POLLERS"),
+                        help="Concurrent activity task polls (env WORKER_ACTIVITY_POLLERS, SDK default 5)")
+    parser.add_argument("--max-cached-workflows", type=int,
+                        default=_env_int("WORKER_MAX_CACHED_WORKFLOWS", defaults.max_cached_workflows),
+                        help="Sticky workflow cache size (env WORKER_MAX_CACHED_WORKFLOWS, default 1000)")
+    parser.add_argument("--processes", type=int,
+                        default=_env_int("WORKER_PROCESSES", defaults.processes),
+                        help="Worker processes to supervise, 0 for one per CPU core (env WORKER_PROCESSES, default 1)")
+    parser.add_argument("--metrics-address", default=os.environ.get("WORKER_METRICS_ADDRESS"),
+                        help="Serve Prometheus metrics on host:port, e.g. 0.0.0.0:9464; with several "
+                             "processes each child adds its index to the port (env WORKER_METRICS_ADDRESS)")
+    parser.add_argument("--tracing", action="store_true", default=os.environ.get("WORKER_TRACING", "0") == "1",
+                        help="Export OpenTelemetry traces, needs opentelemetry-sdk (env WORKER_TRACING=1)")
+    parser.add_argument("--log-level", default=os.environ.get("LOG_LEVEL"),
+                        help="DEBUG, INFO, WARNING or ERROR; WARNING hides the verses (env LOG_LEVEL, default INFO)")
+    args = parser.parse_args(argv)
+    return WorkerSettings(**vars(args))
+
+
+def build_worker(
+    client,
+    settings: WorkerSettings,
+    queue: Optional[str] = None,
+    roles: tuple[str, ...] = ROLES,
+) -> Worker:
+    """
+    Creates the worker for `roles` on one task queue, with the configured
+    slots, pollers and cache. The model activity comes from the client's
+    plugin, so `client` must register it exactly when "model" is a role.
+    """
+    activity_roles = set(roles) & {"model", "tools"}
+    interceptors = [MetricsInterceptor(), ProgressInterceptor()]
+    if "workflow" in roles and settings.tool_task_queue:
+        # Like the model queue, where the tools run is the workers' call, not the starter's
+        interceptors.append(ToolQueueInterceptor(settings.tool_task_queue, [sing_verse, sing_verses, get_gift_info]))
+    if activity_roles == {"model"}:
+        max_concurrent_activities = settings.model_max_concurrent_activities or settings.max_concurrent_activities
+    elif activity_roles == {"tools"}:
+        max_concurrent_activities = settings.tool_max_concurrent_activities or settings.max_concurrent_activities
+    else:
+        max_concurrent_activities = settings.max_concurrent_activities
+    return Worker(
         client,
-        task_queue="twelve-days-queue",
-        workflows=[TwelveDaysWorkflow],
-        activities=[sing_verse, get_gift_info],
+        task_queue=queue or settings.task_queue or task_queue(),
+        workflows=[TwelveDaysWorkflow, SessionWorkflow] if "workflow" in roles else [],
+        # Workflow workers keep the tools too, for the ones run as local activities
+        activities=[sing_verse, sing_verses, get_gift_info] if {"workflow", "tools"} & set(roles) else [],
+        # ...but only poll for activities if some are meant for this queue
+        no_remote_activities=not activity_roles,
+        workflow_runner=workflow_runner(),
+        interceptors=interceptors,
+        max_concurrent_activities=max_concurrent_activities,
+        max_concurrent_workflow_tasks=settings.max_concurrent_workflow_tasks,
+        max_concurrent_workflow_task_polls=settings.workflow_pollers,
+        max_concurrent_activity_task_polls=settings.activity_pollers,
+        max_cached_workflows=settings.max_cached_workflows,
     )
+
+
+async def main(settings: WorkerSettings):
+    """Start the Temporal worker."""
+    # Verses and agent notes go through a queue to one writer thread (LOG_FORMAT=text|json)
+    configure_logging(settings.log_level)
+    
+    # Optional response cache in front of OpenAI (MODEL_CACHE=memory|sqlite).
+    # It runs inside the model activity, so cache hits are still recorded
+    # as activity results and replay stays deterministic.
+    model_provider = model_cache.provider_from_env()
+    # With MODEL_ROUTING=on, cheap turns go to a small model and long answers to the large one
+    model_provider = model_routing.provider_from_env(model_provider)
+    
+    # Temporal's runtime metrics plus our own, on one Prometheus endpoint.
+    # Children of the supervisor each get their own port.
+    metrics_address = settings.metrics_address
+    if metrics_address:
+        metrics_address = offset_port(metrics_address, int(os.environ.get("WORKER_INDEX", 0)))
+    tracing = tracing_interceptor() if settings.tracing else None
+    
+    runtime = prometheus_runtime(metrics_address) if metrics_address else None
+    
+    # The plugin registers the model activity on every worker of its client,
+    # so workers without the model role get a client whose plugin doesn't
+    clients = {}
+    
+    async def client_for(model_role: bool):
+        if model_role not in clients:
+            clients[model_role] = await connect(
+                settings.address,
+                plugin=OpenAIAgentsPlugin(
+                    model_params=ModelActivityParameters(
+                        start_to_close_timeout=timedelta(seconds=30),
+                        # Where the workflows schedule model calls (None: their own queue)
+                        task_queue=settings.model_task_queue,
+                    ),
+                    model_provider=model_provider,
+                    register_activities=model_role,
+                ),
+                runtime=runtime,
+                interceptors=[tracing] if tracing else [],
+            )
+        return clients[model_role]
+    
+    # One worker per task queue this process polls
+    workers = [
+        build_worker(await client_for("model" in roles), settings, queue, roles)
+        for queue, roles in settings.role_queues().items()
+    ]
     
     print("\n" + "="*60)
-    print("🎄 12 Days of Christmas Worker Started!")
+    print(f"🎄 12 Days of Christmas Worker Started! (pid {os.getpid()})")
     print("="*60)
-    print("📋 Task queue: twelve-days-queue")
-    print("🔄 Workflows: TwelveDaysWorkflow")
-    print("🛠️  Activities: sing_verse, get_gift_info")
+    for worker in workers:
+        print(f"📋 Task queue: {worker.task_queue} ({', '.join(settings.role_queues()[worker.task_queue])})")
+    if "workflow" in settings.roles:
+        print("🔄 Workflows: TwelveDaysWorkflow, SessionWorkflow")
+    if "tools" in settings.roles:
+        print("🛠️  Activities: sing_verse, sing_verses, get_gift_info")
+    if "workflow" in settings.roles:
+        # Model calls and tools without a queue of their own land on the workflow queue, which this process doesn't poll for them
+        for role, queue in (("model", settings.model_task_queue), ("tools", settings.tool_task_queue)):
+            if not queue and role not in settings.roles:
+                print(f"⚠️  {role.capitalize()} activities go to {settings.task_queue or task_queue()} - "
+                      f"make sure a worker with --roles {role} polls it")
+    print(f"📈 Metrics: {f'http://{metrics_address}/metrics' if metrics_address else 'off'}"
+          f"{', tracing on' if tracing else ''}")
+    print(f"💾 Model cache: {os.environ.get('MODEL_CACHE', 'off')}")
+    print(f"🔀 Model routing: {model_provider.routes if isinstance(model_provider, model_routing.RoutingModelProvider) else 'off'}")
+    print(f"🎚️  Slots: activities={settings.max_concurrent_activities or 'default'} "
+          f"(model {settings.model_max_concurrent_activities or 'same'}, tools {settings.tool_max_concurrent_activities or 'same'}), "
+          f"workflow tasks={settings.max_concurrent_workflow_tasks or 'default'}, "
+          f"cached workflows={settings.max_cached_workflows}")
     print("\n✨ Waiting for workflows... (Press Ctrl+C to stop)")
     print("="*60 + "\n")
     
-    # Run the worker (this blocks until interrupted)
-    await worker.run()
+    # Stop polling and shut down cleanly on Ctrl+C or SIGTERM (e.g. from the supervisor)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            # Windows: Ctrl+C still interrupts, just without the clean shutdown
+            pass
+    
+    # Run the workers until asked to stop
+    async with contextlib.AsyncExitStack() as stack:
+        for worker in workers:
+            await stack.enter_async_context(worker)
+        await stop.wait()
+        print("\n👋 Shutting down worker...")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
-
+    # Load environment variables from .env file before reading settings
+    load_dotenv()
+    settings = parse_args()
+    if settings.processes == 1:
+        asyncio.run(main(settings))
+    else:
+        # Each child is this same worker in single-process mode
+        sys.exit(supervise(settings.processes, sys.argv[1:] + ["--processes", "1"]))
@@ -4,24 +4,264 @@ Temporal workflow for the 12 Days of Christmas AI Agent.
 This workflow uses the OpenAI Agents SDK integrated with Temporal to create
 a durable AI agent. Each tool call runs as a Temporal activity, making the
 entire agent interaction durable and observable.
-"""
 
-# Pre-import Pydantic dependencies to avoid sandbox warnings
-# These must be imported BEFORE any workflow code to ensure they're loaded
-# into Temporal's workflow sandbox properly
-import annotated_types
-import pydantic_core
-import pydantic_core._pydantic_core
-import pydantic_core.core_schema
+Tools without side effects don't need that: each tool can be run as a
+regular activity, a local activity (no task queue round trip, one marker
+event in history) or inline in the workflow (nothing recorded at all, for
+pure lookups like get_gift_info). See TOOL_MODES and AgentOptions.tool_modes.
+"""
 
 from temporalio import workflow
+from dataclasses import dataclass, field
 from datetime import timedelta
-from agents import Agent, Runner
+from typing import Optional
+from agents import Agent, ModelSettings, RunConfig, Runner
 from temporalio.contrib import openai_agents
-from .activities import sing_verse, get_gift_info
+from temporalio.exceptions import ApplicationError
+from .activities import sing_verse, sing_verses, get_gift_info, lookup_gift
+from .agent_tools import ToolCallLimiter, inline_tool, local_activity_as_tool
+from .errors import retry_policy
+from .progress import Progress, ProgressHooks, ToolProgress
+
+# The fast-path stats are process-wide, so keep the module out of the
+# per-workflow sandbox (the parser itself is pure and deterministic)
+with workflow.unsafe.imports_passed_through():
+    from twelve_days import fast_path
+
+from twelve_days.compaction import Compactor
+from twelve_days.verses import verses_in_result
+
+# Task queue the worker polls and the starters submit to
+TASK_QUEUE = "twelve-days-queue"
+
+# Activity options for each tool, shared by the agent's tools and the fast path.
+# Failed attempts fail fast, so recovery is paced by the retry backoff rather
+# than by timeouts; input errors are never retried (see errors.py).
+TOOL_OPTIONS = {
+    sing_verse: dict(
+        start_to_close_timeout=timedelta(seconds=10),
+        retry_policy=retry_policy(initial_interval=1, backoff=2, maximum_attempts=5),
+    ),
+    # A full song is ~12 verses; heartbeats carry per-verse progress and show
+    # the worker is alive, so a lost worker is noticed after 6s, not 60s
+    sing_verses: dict(
+        start_to_close_timeout=timedelta(seconds=60),
+        heartbeat_timeout=timedelta(seconds=6),
+        retry_policy=retry_policy(initial_interval=1, backoff=2, maximum_attempts=5),
+    ),
+    get_gift_info: dict(
+        start_to_close_timeout=timedelta(seconds=5),
+        retry_policy=retry_policy(initial_interval=0.5, backoff=2, maximum_attempts=3),
+    ),
+}
+
+# How a tool can run: "activity", "local" (local activity) or "inline" (in the workflow)
+TOOL_MODES = ("activity", "local", "inline")
+
+# The default per tool - durability is kept for the tools that do (simulated) I/O
+DEFAULT_TOOL_MODES = {
+    "sing_verse": "activity",
+    "sing_verses": "activity",
+    "get_gift_info": "inline",
+}
+
+# Deterministic implementations of the tools that may run inline
+INLINE_TOOLS = {
+    get_gift_info: lookup_gift,
+}
+
+# What the agent is told, by every workflow that runs it
+INSTRUCTIONS = """You are a cheerful AI teacher helping someone learn "The 12 Days of Christmas" song.
+
+When asked to sing the ENTIRE/FULL/WHOLE song (all 12 days):
+1. Call sing_verses once with start_day=1 and end_day=12 - it sings every verse in order
+2. Make sure to complete all 12 days - don't skip any!
+3. After calling all the tools, provide a condensed summary listing each day with ONLY its main gift (not cumulative)
+4. Format like: "On the first day of Christmas, my true love gave to me... 🐦 A partridge in a pear tree"
+5. Then "On the second day of Christmas, my true love gave to me... 🕊️ Two turtle doves"
+6. Continue through all 12 days in this condensed format
+
+When asked to sing specific days or a range (like "day 7" or "days 1-5"):
+1. Call sing_verse for a single day, or sing_verses once for a range of consecutive days
+2. In your response, write out the FULL verses with all cumulative gifts as they appear in the song
+3. Include all the previous gifts that come before, just like in the traditional song
+4. Be enthusiastic and sing the complete verses!
+
+When asked about specific gifts:
+- Use get_gift_info to answer questions about what comes on which day
+- If several days are asked about, call get_gift_info for all of them in the same turn - they run in parallel
+- Be helpful and enthusiastic
+
+Always be enthusiastic and make learning fun! Use holiday emojis when appropriate."""
+
+
+@dataclass
+class AgentOptions:
+    """Optional knobs for a single TwelveDaysWorkflow run."""
+
+    fast_path: bool = True
+    """Answer simple requests (gift lookups, singing days) without the model."""
+
+    max_parallel_tools: int = 12
+    """How many tool activities from one model turn may run at the same time."""
+
+    compaction_budget: Optional[int] = 600
+    """Compact the model's input between turns once it passes this many tokens (None: never)."""
+
+    tool_modes: dict[str, str] = field(default_factory=dict)
+    """Per-tool overrides of DEFAULT_TOOL_MODES, e.g. {"get_gift_info": "activity"}."""
+
+    report_progress: bool = False
+    """Have the tool activities signal each verse and retry back as it happens (adds history events per verse)."""
+
+    tool_task_queue: Optional[str] = None
+    """
+    Task queue for this run's tool activities. None (the default) leaves it to
+    the workers: TEMPORAL_TOOL_TASK_QUEUE on the workflow workers, or their own
+    queue. Local and inline tools ignore it.
+    """
+
+
+class AgentWorkflowBase:
+    """
+    What every workflow running the agent shares: answering one prompt
+    (fast path or agent loop, with the tools as activities) and the live
+    progress handlers.
+
+    Clients can follow a run as it goes with the `progress` query, or the
+    `wait_for_progress` update, which long-polls for the next change.
+    """
+
+    def __init__(self) -> None:
+        self._progress = Progress()
+        # Read by ProgressInterceptor when the tools are scheduled
+        self.wants_activity_progress = False
+
+    async def _answer(
+        self, prompt: str, options: AgentOptions, history: Optional[list] = None
+    ) -> tuple[str, list]:
+        """
+        Answers one prompt, optionally following on from earlier turns.
+
+        Returns the answer and the conversation so far, ready to be passed
+        back in as `history` for the next prompt.
+        """
+        history = history or []
+        modes = self._tool_modes(options)
+        self.wants_activity_progress = options.report_progress
+
+        # Simple requests skip the model - the tools still run as activities
+        intent = fast_path.parse_intent(prompt) if options.fast_path else None
+        if not workflow.unsafe.is_replaying():
+            fast_path.STATS.record(intent is not None)
+        if intent is not None:
+            workflow.logger.info(f"⚡ Fast path: {intent.describe()} ({fast_path.STATS})")
+            answer = await fast_path.answer(
+                intent,
+                sing_verse=lambda day: self._run_tool(sing_verse, modes, options, day),
+                sing_verses=lambda start_day, end_day: self._run_tool(sing_verses, modes, options, start_day, end_day),
+                get_gift_info=lambda day: self._run_tool(get_gift_info, modes, options, day),
+            )
+            return answer, history + [
+                {"role": "user", "content": prompt},
+                {"role": "assistant", "content": answer},
+            ]
+
+        # Create the agent with activities as tools
+        # activity_as_tool automatically generates OpenAI-compatible tool schemas
+        # and wraps each activity call so Temporal can track and checkpoint them.
+        # Tool calls from the same turn run as concurrent activities, bounded
+        # by the limiter, on the tool task queue if there is one. Inline
+        # tools skip all of that.
+        limiter = ToolCallLimiter(options.max_parallel_tools)
+        agent = Agent(
+            name="twelve-days-teacher",
+            model="gpt-4o",  # The default; with MODEL_ROUTING=on easy turns go to a smaller model
+            instructions=INSTRUCTIONS,
+            model_settings=ModelSettings(parallel_tool_calls=True),
+            tools=[self._agent_tool(tool, modes[tool.__name__], limiter, options) for tool in TOOL_OPTIONS]
+        )
+
+        # Finished tool calls are folded into a running summary between turns
+        compactor = Compactor(options.compaction_budget) if options.compaction_budget is not None else None
+        run_config = RunConfig(call_model_input_filter=compactor)
+
+        # Run the agent - this handles the entire agent loop with durability
+        input = history + [{"role": "user", "content": prompt}] if history else prompt
+        result = await Runner.run(agent, input, hooks=ProgressHooks(self._progress), run_config=run_config)
+        if compactor and compactor.stats.compacted:
+            workflow.logger.info(f"🗜️ Compaction: {compactor.stats}")
+        return result.final_output, result.to_input_list()
+
+    @workflow.query
+    def progress(self) -> Progress:
+        """The run's progress so far."""
+        return self._progress
+
+    @workflow.update
+    async def wait_for_progress(self, version: int) -> Progress:
+        """Long poll: returns once the progress has moved past `version`."""
+        await workflow.wait_condition(lambda: self._progress.version > version)
+        return self._progress
+
+    @workflow.signal
+    def report_progress(self, update: ToolProgress) -> None:
+        """Called by the tool activities as verses finish and retries start."""
+        self._progress.apply(update)
+
+    async def _finish(self) -> None:
+        # Let any waiting long polls see the final state before the run closes
+        self._progress.finish()
+        await workflow.wait_condition(workflow.all_handlers_finished)
+
+    def _tool_modes(self, options: AgentOptions) -> dict[str, str]:
+        modes = {**DEFAULT_TOOL_MODES, **options.tool_modes}
+        for name, mode in modes.items():
+            if mode not in TOOL_MODES:
+                raise ApplicationError(f"Unknown mode {mode!r} for {name} (expected one of {TOOL_MODES})", non_retryable=True)
+            if mode == "inline" and name not in {tool.__name__ for tool in INLINE_TOOLS}:
+                raise ApplicationError(f"{name} has side effects and can't run inline", non_retryable=True)
+        return modes
+
+    def _agent_tool(self, tool, mode: str, limiter: ToolCallLimiter, options: AgentOptions):
+        """The tool as the agent sees it, run the way `mode` says."""
+        if mode == "inline":
+            return inline_tool(INLINE_TOOLS[tool], tool.__name__)
+        if mode == "local":
+            return limiter.wrap(local_activity_as_tool(tool, **_local_options(tool)))
+        return limiter.wrap(openai_agents.workflow.activity_as_tool(tool, **_activity_options(tool, options)))
+
+    async def _run_tool(self, tool, modes: dict[str, str], options: AgentOptions, *args) -> str:
+        """Runs a tool directly, the same way and with the same options the agent uses."""
+        mode = modes[tool.__name__]
+        self._progress.tool_started(tool.__name__)
+        try:
+            if mode == "inline":
+                result = INLINE_TOOLS[tool](*args)
+            elif mode == "local":
+                result = await workflow.execute_local_activity(tool, args=args, **_local_options(tool))
+            else:
+                result = await workflow.execute_activity(tool, args=args, **_activity_options(tool, options))
+            self._progress.verses_sung(verses_in_result(result))
+            return result
+        finally:
+            self._progress.tool_finished(tool.__name__)
+
+
+def _activity_options(tool, options: AgentOptions) -> dict:
+    # Tools can be sent to their own workers, apart from workflow tasks and model calls
+    if options.tool_task_queue:
+        return {**TOOL_OPTIONS[tool], "task_queue": options.tool_task_queue}
+    return TOOL_OPTIONS[tool]
+
+
+def _local_options(tool) -> dict:
+    # Local activities don't heartbeat to the server, so there's no heartbeat timeout
+    return {key: value for key, value in TOOL_OPTIONS[tool].items() if key != "heartbeat_timeout"}
+
 
 @workflow.defn
-class TwelveDaysWorkflow:
+class TwelveDaysWorkflow(AgentWorkflowBase):
     """
     Workflow that runs the 12 Days of Christmas AI agent.
     
@@ -33,67 +273,27 @@ class TwelveDaysWorkflow:
     """
     
     @workflow.run
-    async def run(self, prompt: str) -> str:
+    async def run(self, prompt: str, options: Optional[AgentOptions] = None) -> str:
         """
         Runs the AI agent to handle user requests about the song.
         The entire agent interaction is durable via Temporal.
         
         Args:
             prompt: The user's request (e.g., "Sing the whole song!")
+            options: Optional per-run settings (see AgentOptions)
             
         Returns:
             The agent's final response
         """
-        print(f"\n{'='*60}")
-        print(f"\n🎅 Starting 12 Days of Christmas Agent")
-        # print(f"📝 User request: {prompt}\n")
-        
-        # Create the agent with activities as tools
-        # activity_as_tool automatically generates OpenAI-compatible tool schemas
-        # and wraps each activity call so Temporal can track and checkpoint them
-        agent = Agent(
-            name="twelve-days-teacher",
-            model="gpt-4o",  # Use GPT-4o for better performance
-            instructions="""You are a cheerful AI teacher helping someone learn "The 12 Days of Christmas" song.
-
-When asked to sing the ENTIRE/FULL/WHOLE song (all 12 days):
-1. Call sing_verse for each day from 1 to 12 in order
-2. Make sure to complete all 12 days - don't skip any!
-3. After calling all the tools, provide a condensed summary listing each day with ONLY its main gift (not cumulative)
-4. Format like: "On the first day of Christmas, my true love gave to me... 🐦 A partridge in a pear tree"
-5. Then "On the second day of Christmas, my true love gave to me... 🕊️ Two turtle doves"
-6. Continue through all 12 days in this condensed format
-
-When asked to sing specific days or a range (like "day 7" or "days 1-5"):
-1. Call sing_verse for each requested day
-2. In your response, write out the FULL verses with all cumulative gifts as they appear in the song
-3. Include all the previous gifts that come before, just like in the traditional song
-4. Be enthusiastic and sing the complete verses!
-
-When asked about specific gifts:
-- Use get_gift_info to answer questions about what comes on which day
-- Be helpful and enthusiastic
-
-Always be enthusiastic and make learning fun! Use holiday emojis when appropriate.""",
-            tools=[
-                openai_agents.workflow.activity_as_tool(
-                    sing_verse,
-                    start_to_close_timeout=timedelta(seconds=10)
-                ),
-                openai_agents.workflow.activity_as_tool(
-                    get_gift_info,
-                    start_to_close_timeout=timedelta(seconds=5)
-                )
-            ]
-        )
+        options = options or AgentOptions()
+        # workflow.logger stays quiet during replay, so these show once per run
+        workflow.logger.info("🎅 Starting 12 Days of Christmas Agent")
         
-        # Run the agent - this handles the entire agent loop with durability
-        result = await Runner.run(agent, prompt)
+        answer, _ = await self._answer(prompt, options)
+        await self._finish()
         
-        print(f"\n✨ Agent completed successfully!")
-        print(f"\n{'='*60}")
+        workflow.logger.info("✨ Agent completed successfully!")
         
         # Return the agent's response
-        # Note: The full verses are printed in the worker terminal by the activities
-        return result.final_output
-
+        # Note: The full verses are logged in the worker terminal by the activities
+        return answer
@@ -0,0 +1,140 @@
+"""
+Workflow IDs for TwelveDaysWorkflow runs.
+
+Every request gets its own workflow ID, so concurrent users no longer
+terminate each other's runs. With dedup turned on, the ID is derived from
+a hash of the normalized prompt and the run's AgentOptions instead: an
+identical request with the same options that is already running is
+attached to (USE_EXISTING) rather than started again.
+
+A workflow ID doubles as the resume token - get a handle for it and wait
+on the result to pick a run back up after a crash.
+
+Sessions are keyed by user instead: ask_session sends the prompt to that
+user's SessionWorkflow, starting it first if it isn't running.
+"""
+
+import asyncio
+import dataclasses
+import hashlib
+import json
+import re
+import time
+import uuid
+from typing import Optional
+
+from temporalio.client import Client, WithStartWorkflowOperation, WorkflowHandle, WorkflowUpdateFailedError
+from temporalio.common import WorkflowIDConflictPolicy, WorkflowIDReusePolicy
+from temporalio.exceptions import ApplicationError
+
+from .client import task_queue as default_task_queue
+from .session import NOT_ACCEPTING, SessionOptions, SessionState, SessionWorkflow
+from .workflow import AgentOptions, TwelveDaysWorkflow
+
+WORKFLOW_ID_PREFIX = "twelve-days"
+
+# How long ask_session keeps asking a session that's rolling over or closing
+ASK_RETRY_SECONDS = 30.0
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case, whitespace and trailing punctuation don't make a request different."""
+    text = re.sub(r"\s+", " ", prompt.lower()).strip()
+    return text.rstrip("!?. ")
+
+
+def unique_workflow_id() -> str:
+    """A fresh ID for a single request."""
+    return f"{WORKFLOW_ID_PREFIX}-{uuid.uuid4().hex[:12]}"
+
+
+def dedup_workflow_id(prompt: str, options: Optional[AgentOptions] = None) -> str:
+    """The same ID for every identical (normalized) prompt with the same options."""
+    # Options are part of the key, so a run with other tool modes or budgets is never joined by mistake
+    settings = json.dumps(dataclasses.asdict(options or AgentOptions()), sort_keys=True, default=str)
+    digest = hashlib.sha256(f"{normalize_prompt(prompt)}\n{settings}".encode("utf-8")).hexdigest()
+    return f"{WORKFLOW_ID_PREFIX}-{digest[:16]}"
+
+
+async def start_twelve_days(
+    client: Client,
+    prompt: str,
+    *,
+    dedup: bool = False,
+    options: Optional[AgentOptions] = None,
+    task_queue: Optional[str] = None,
+) -> WorkflowHandle:
+    """
+    Starts a TwelveDaysWorkflow for the prompt and returns its handle.
+
+    With dedup, an identical request with the same options that is still
+    running is attached to instead of started again. Finished runs don't
+    count, so asking again later starts a new run.
+    """
+    task_queue = task_queue or default_task_queue()
+    if dedup:
+        return await client.start_workflow(
+            TwelveDaysWorkflow.run,
+            args=[prompt, options],
+            id=dedup_workflow_id(prompt, options),
+            task_queue=task_queue,
+            id_conflict_policy=WorkflowIDConflictPolicy.USE_EXISTING,
+            id_reuse_policy=WorkflowIDReusePolicy.ALLOW_DUPLICATE,
+        )
+    return await client.start_workflow(
+        TwelveDaysWorkflow.run,
+        args=[prompt, options],
+        id=unique_workflow_id(),
+        task_queue=task_queue,
+    )
+
+
+def resume_twelve_days(client: Client, resume_token: str) -> WorkflowHandle:
+    """Gets the handle of an earlier run from its resume token (its workflow ID)."""
+    return client.get_workflow_handle_for(TwelveDaysWorkflow.run, resume_token)
+
+
+def session_workflow_id(user: str) -> str:
+    """The ID of a user's session - one per user."""
+    return f"{WORKFLOW_ID_PREFIX}-session-{user}"
+
+
+async def ask_session(
+    client: Client,
+    user: str,
+    prompt: str,
+    *,
+    options: Optional[SessionOptions] = None,
+    task_queue: Optional[str] = None,
+) -> str:
+    """
+    Asks the user's session a question and returns the answer.
+
+    Uses update-with-start, so the first question also starts the session
+    and later ones join it. `options` only apply to a newly started session.
+    A session that's rolling over (or closing) turns asks away for a moment,
+    so those are retried with a short backoff until the continued (or a new)
+    run takes them.
+    """
+    options = options or SessionOptions()
+    deadline = time.monotonic() + ASK_RETRY_SECONDS
+    delay = 0.1
+    while True:
+        # A start operation can only be used once
+        start_session = WithStartWorkflowOperation(
+            SessionWorkflow.run,
+            SessionState(options=options),
+            id=session_workflow_id(user),
+            task_queue=task_queue or default_task_queue(),
+            id_conflict_policy=WorkflowIDConflictPolicy.USE_EXISTING,
+        )
+        try:
+            return await client.execute_update_with_start_workflow(
+                SessionWorkflow.ask, prompt, start_workflow_operation=start_session
+            )
+        except WorkflowUpdateFailedError as error:
+            rejected = isinstance(error.cause, ApplicationError) and error.cause.type == NOT_ACCEPTING
+            if not rejected or time.monotonic() + delay > deadline:
+                raise
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 2.0)
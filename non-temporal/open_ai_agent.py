@@ -1,15 +1,36 @@
+import argparse
 import asyncio
-from agents import Agent, Runner
-from tools import sing_verse, get_gift_info
+import functools
+import logging
+from typing import Optional
+from agents import Agent, ModelProvider, ModelSettings, RunConfig, Runner, set_default_openai_client
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+import httpx
+from tools import TOOL_FUNCTIONS, TOOLS
+from twelve_days import compaction, fast_path, model_cache, model_routing
+from twelve_days.load import LoadSettings, add_load_arguments, run_batch
+from twelve_days.logs import configure_logging
+
+logger = logging.getLogger(__name__)
+
+@functools.lru_cache(maxsize=None)
+def model_provider() -> Optional[ModelProvider]:
+    """
+    The optional response cache in front of OpenAI (MODEL_CACHE=memory|sqlite),
+    behind the router (MODEL_ROUTING) - built on first use, once per process,
+    so importing this module (e.g. from the Streamlit UI) doesn't build them.
+    """
+    return model_routing.provider_from_env(model_cache.provider_from_env())
 
 
 agent = Agent(
     name="twelve-days-teacher",
     model="gpt-4o",  # Use GPT-4o for better performance
+    model_settings=ModelSettings(parallel_tool_calls=True),
     instructions="""You are a cheerful AI teacher helping someone learn "The 12 Days of Christmas" song.
 
 When asked to sing the ENTIRE/FULL/WHOLE song (all 12 days):
-1. Call sing_verse for each day from 1 to 12 in order
+1. Call sing_verses once with start_day=1 and end_day=12 - it sings every verse in order
 2. Make sure to complete all 12 days - don't skip any!
 3. After calling all the tools, provide a condensed summary listing each day with ONLY its main gift (not cumulative)
 4. Format like: "On the first day of Christmas, my true love gave to me... 🐦 A partridge in a pear tree"
@@ -17,20 +38,38 @@ When asked to sing the ENTIRE/FULL/WHOLE song (all 12 days):
 6. Continue through all 12 days in this condensed format
 
 When asked to sing specific days or a range (like "day 7" or "days 1-5"):
-1. Call sing_verse for each requested day
+1. Call sing_verse for a single day, or sing_verses once for a range of consecutive days
 2. In your response, write out the FULL verses with all cumulative gifts as they appear in the song
 3. Include all the previous gifts that come before, just like in the traditional song
 4. Be enthusiastic and sing the complete verses!
 
 When asked about specific gifts:
 - Use get_gift_info to answer questions about what comes on which day
+- If several days are asked about, call get_gift_info for all of them in the same turn - they run in parallel
 - Be helpful and enthusiastic
 
 Always be enthusiastic and make learning fun! Use holiday emojis when appropriate.""",
-    tools=[sing_verse, get_gift_info]
+    tools=TOOLS
 )
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the non-temporal 12 Days of Christmas agent.")
+    parser.add_argument(
+        "--batch",
+        metavar="PROMPTS",
+        help="Run every prompt in a JSONL file (- for stdin) concurrently, without prompting",
+    )
+    parser.add_argument("--log-level", help="DEBUG, INFO, WARNING or ERROR (default: LOG_LEVEL or INFO)")
+    add_load_arguments(parser)
+    return parser.parse_args()
+
 async def main():
+    args = parse_args()
+    configure_logging(args.log_level)
+    if args.batch:
+        await run_agent_batch(args)
+        return
+
     print("""🎄 Welcome to the 12 Days of Christmas AI Agent! 🎵
     
 You can ask questions like:
@@ -40,8 +79,59 @@ You can ask questions like:
     🎁 Tell me about the gift on day 5
 """)
     user_request = input("What would you like to do?: ")
-    result = await Runner.run(agent, user_request)
-    print(result.final_output)
+    print(await run_agent(user_request))
+
+async def run_agent(prompt: str) -> str:
+    """Answers simple requests on the fast path, everything else with the agent."""
+    return (await answer_prompt(prompt))["answer"]
+
+async def answer_prompt(prompt: str) -> dict:
+    """run_agent, plus how the answer came about: fast path or not, and the tokens it took."""
+    intent = fast_path.parse_intent(prompt)
+    fast_path.STATS.record(intent is not None)
+    if intent is not None:
+        logger.info(f"⚡ Fast path: {intent.describe()} ({fast_path.STATS})")
+        answer = await fast_path.answer(intent, **TOOL_FUNCTIONS)
+        return {"answer": answer, "fast_path": True, "model_requests": 0, "input_tokens": 0, "output_tokens": 0}
+
+    # Folds finished tool calls into a running summary between model turns -
+    # one compactor per run, so its stats are this request's alone
+    compactor = compaction.compactor_from_env()
+    run_config = RunConfig(call_model_input_filter=compactor)
+    if model_provider():
+        run_config.model_provider = model_provider()
+    result = await Runner.run(agent, prompt, run_config=run_config)
+    if compactor and compactor.stats.compacted:
+        logger.info(f"🗜️ Compaction: {compactor.stats}")
+    usage = result.context_wrapper.usage
+    return {
+        "answer": result.final_output,
+        "fast_path": False,
+        "model_requests": usage.requests,
+        "input_tokens": usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+    }
+
+def pooled_openai_client(max_connections: int) -> AsyncOpenAI:
+    """An OpenAI client whose connections stay open and are shared by every concurrent run."""
+    return AsyncOpenAI(http_client=DefaultAsyncHttpxClient(limits=httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=60,
+    )))
+
+async def run_agent_batch(args: argparse.Namespace) -> None:
+    """
+    Runs the prompts in args.batch concurrently: one agent, one pooled OpenAI
+    client, and the same JSONL records and summary as the Temporal starter's
+    --batch, so the two can be compared under the same load.
+    """
+    client = pooled_openai_client(args.concurrency)
+    set_default_openai_client(client)
+    try:
+        await run_batch(args.batch, answer_prompt, LoadSettings.from_args(args), args.output, "Non-temporal")
+    finally:
+        await client.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -1,65 +1,167 @@
 """
 Tool implementations for the 12 Days of Christmas AI Agent.
 
-These are tools that will be exposed to the OpenAI agent
+These are tools that will be exposed to the OpenAI agent. Each tool
+simulates a slow I/O call, and how that wait happens is set by TOOL_MODE:
+
+- "async" (default): the tools await asyncio.sleep, so several tool calls
+  in one turn - and several agents in one process - overlap.
+- "thread": the plain synchronous tools run on a thread pool of
+  TOOL_THREADS workers (default 16), keeping the event loop free.
+- "blocking": the synchronous tools run inline on the event loop, one
+  after another. Only useful as a "what not to do" comparison.
+
+The plain functions are kept undecorated so the fast path can call them
+directly; TOOL_FUNCTIONS holds the ones for the current mode and TOOLS the
+function_tool versions the agent sees.
 """
 
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import logging
+import os
+import sys
 import time
+from pathlib import Path
+from typing import Callable, Generator, Optional
 from agents import FunctionTool, function_tool
 
-# The complete gift dictionary with emojis
-GIFTS = {
-    1: "🐦 A partridge in a pear tree",
-    2: "🕊️ Two turtle doves",
-    3: "🐔 Three French hens",
-    4: "🐦 Four calling birds",
-    5: "💍 FIVE GOLDEN RINGS",
-    6: "🪿 Six geese a-laying",
-    7: "🦢 Seven swans a-swimming",
-    8: "🥛 Eight maids a-milking",
-    9: "💃 Nine ladies dancing",
-    10: "🤴 Ten lords a-leaping",
-    11: "🎺 Eleven pipers piping",
-    12: "🥁 Twelve drummers drumming"
-}
-
-@function_tool
+# Add the repo root to path so the shared verse table is importable
+repo_root = str(Path(__file__).parent.parent)
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+from twelve_days.verses import gift_info, is_valid_day, log_verse, verse_result
+
+logger = logging.getLogger(__name__)
+
+# Called with the day after every verse sung in the current context - lets a
+# caller (like a UI job) follow the verses of its own run as they're sung
+verse_listener: contextvars.ContextVar[Optional[Callable[[int], None]]] = contextvars.ContextVar(
+    "verse_listener", default=None
+)
+
+# Seconds each verse or gift lookup pretends to take
+SIMULATED_LATENCY = float(os.environ.get("TOOL_LATENCY_SECONDS", 3))
+
 def sing_verse(day: int) -> str:
-    time.sleep(3)
     """Sings one verse of the 12 Days of Christmas song."""
-    if day < 1 or day > 12:
-        return f"Invalid day: {day}. Must be between 1 and 12."
+    time.sleep(SIMULATED_LATENCY)
+    return _sing_verse(day)
 
-    # Print the verse header
-    print(f"\n🎵 On the {'first' if day == 1 else 'second' if day == 2 else 'third' if day == 3 else str(day) + 'th'} day of Christmas,")
-    print(f"   my true love gave to me:")
+def sing_verses(start_day: int, end_day: int) -> str:
+    """Sings a range of verses (start_day through end_day) in a single tool call."""
+    verses = _sing_verses(start_day, end_day)
+    while True:
+        try:
+            delay = next(verses)
+        except StopIteration as finished:
+            return finished.value
+        time.sleep(delay)
 
-    # Print the current day's gift
-    print(f"   {GIFTS[day]}")
+def get_gift_info(day: int) -> str:
+    """Returns information about what gift comes on a specific day."""
+    time.sleep(SIMULATED_LATENCY)
+    return _get_gift_info(day)
 
-    # Print previous gifts in reverse order
-    for prev_day in range(day - 1, 0, -1):
-        gift = GIFTS[prev_day]
-        # Add "and" before the partridge on multi-verse days
-        if prev_day == 1 and day > 1:
-            gift = "   And " + gift.lstrip("🐦 A").lstrip()
-            print(f"   🐦 {gift}")
-        else:
-            print(f"   {gift}")
+async def sing_verse_async(day: int) -> str:
+    """Sings one verse of the 12 Days of Christmas song."""
+    await asyncio.sleep(SIMULATED_LATENCY)
+    return _sing_verse(day)
 
-    # Return statements reflect in the Temporal UI for tracking activity output
-    return f"✓ Completed verse {day}: {GIFTS[day]}"
+async def sing_verses_async(start_day: int, end_day: int) -> str:
+    """Sings a range of verses (start_day through end_day) in a single tool call."""
+    verses = _sing_verses(start_day, end_day)
+    while True:
+        try:
+            delay = next(verses)
+        except StopIteration as finished:
+            return finished.value
+        await asyncio.sleep(delay)
 
-@function_tool
-def get_gift_info(day: int) -> str:
-    time.sleep(3)
+async def get_gift_info_async(day: int) -> str:
     """Returns information about what gift comes on a specific day."""
-    if day < 1 or day > 12:
+    await asyncio.sleep(SIMULATED_LATENCY)
+    return _get_gift_info(day)
+
+def _sing_verses(start_day: int, end_day: int) -> Generator[float, None, str]:
+    """
+    Sings the range, yielding how long to wait before each verse, so the
+    blocking and async tools share one loop and only differ in how they wait.
+    Returns the tool result.
+    """
+    if start_day < 1 or end_day > 12 or start_day > end_day:
+        return f"Invalid range: {start_day}-{end_day}. Days must be between 1 and 12, in order."
+
+    # No checkpointing here - if this process dies mid-batch, the progress is gone
+    completed = []
+    for day in range(start_day, end_day + 1):
+        yield SIMULATED_LATENCY
+        completed.append(_sing_verse(day))
+
+    return "\n".join(completed)
+
+def _sing_verse(day: int) -> str:
+    if not is_valid_day(day):
+        return f"Invalid day: {day}. Must be between 1 and 12."
+
+    # The full cumulative verse is precomputed - logged as one record
+    log_verse(logger, day)
+    listener = verse_listener.get()
+    if listener is not None:
+        listener(day)
+
+    # Return statements reflect in the Temporal UI for tracking activity output
+    return verse_result(day)
+
+def _get_gift_info(day: int) -> str:
+    if not is_valid_day(day):
         return f"Invalid day: {day}. Must be between 1 and 12."
     
-    gift = GIFTS[day]
-    print(f"On day {day}, the gift is: {gift}")
+    info = gift_info(day)
+    logger.info(info, extra={"day": day})
     
     # Return statements reflect in the Temporal UI
-    return f"On day {day}, the gift is: {gift}"
+    return info
+
+_executor = None
+
+def _offload(fn: Callable[..., str]) -> Callable[..., str]:
+    """Wraps a synchronous tool so it runs on the shared thread pool."""
+    @functools.wraps(fn)
+    async def run_in_thread(*args, **kwargs) -> str:
+        global _executor
+        if _executor is None:
+            _executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=int(os.environ.get("TOOL_THREADS", 16)),
+                thread_name_prefix="twelve-days-tool",
+            )
+        loop = asyncio.get_running_loop()
+        # Carried over so the tool still sees the caller's verse_listener
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(_executor, functools.partial(context.run, fn, *args, **kwargs))
+    return run_in_thread
+
+def tool_functions(mode: str) -> dict[str, Callable]:
+    """The tool functions for a TOOL_MODE, keyed by tool name."""
+    if mode == "async":
+        functions = [sing_verse_async, sing_verses_async, get_gift_info_async]
+    elif mode == "thread":
+        functions = [_offload(sing_verse), _offload(sing_verses), _offload(get_gift_info)]
+    elif mode == "blocking":
+        functions = [sing_verse, sing_verses, get_gift_info]
+    else:
+        raise ValueError(f"Unknown TOOL_MODE: {mode}. Expected async, thread or blocking.")
+    return dict(zip(["sing_verse", "sing_verses", "get_gift_info"], functions))
+
+def build_tools(mode: str) -> list[FunctionTool]:
+    """The agent's tools for a TOOL_MODE."""
+    return [function_tool(fn, name_override=name) for name, fn in tool_functions(mode).items()]
+
+TOOL_MODE = os.environ.get("TOOL_MODE", "async")
 
+# The tools for the configured mode, as plain functions and as the agent sees them
+TOOL_FUNCTIONS = tool_functions(TOOL_MODE)
+TOOLS = build_tools(TOOL_MODE)
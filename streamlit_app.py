@@ -9,14 +9,8 @@ Includes two tabs to compare:
 - Pure OpenAI Agents SDK (non-durable, loses context on crash)
 """
 
-import asyncio
 import streamlit as st
-from temporalio.client import Client
-from temporalio.contrib.openai_agents import OpenAIAgentsPlugin
-from temporalio.common import WorkflowIDReusePolicy
-from durable_temporal.workflow import TwelveDaysWorkflow
 from dotenv import load_dotenv
-import os
 import sys
 from pathlib import Path
 
@@ -24,12 +18,48 @@ from pathlib import Path
 non_temporal_path = Path(__file__).parent / "non-temporal"
 sys.path.insert(0, str(non_temporal_path))
 
-from agents import Agent, Runner
-import tools as non_temporal_tools
+# The Temporal and Agents SDK stacks are imported where they're first used
+# (the cached resources and the Submit handlers), so rendering the page -
+# and every rerun that doesn't submit anything - doesn't load either one.
 
 # Load environment variables
 load_dotenv()
 
+@st.cache_resource
+def setup_logging():
+    """Routes the agents' log records (the verses, fast-path notes) through one queue, once per server process."""
+    from twelve_days.logs import configure_logging
+    configure_logging()
+
+@st.cache_resource
+def get_client_manager():
+    """
+    One background event loop, Temporal client and OpenAI client per server
+    process, shared by every session and rerun instead of reconnecting on
+    each click.
+    """
+    from durable_temporal.client import connect
+    from twelve_days.client_manager import ClientManager
+    setup_logging()
+    return ClientManager(connect)
+
+@st.cache_resource
+def get_job_executor():
+    """One bounded pool of background agent runs per server process (UI_MAX_RUNNING_JOBS, UI_MAX_JOBS)."""
+    from twelve_days.jobs import executor_from_env
+    return executor_from_env(get_client_manager().submit)
+
+@st.cache_resource
+def get_agent():
+    """
+    The non-temporal agent module (open_ai_agent.py), shared by every click.
+    Its response cache and model router are built there on first use, once
+    per server process.
+    """
+    import open_ai_agent
+    setup_logging()
+    return open_ai_agent
+
 # Page configuration
 st.set_page_config(
     page_title="12 Days of Christmas AI Agent",
@@ -102,6 +132,8 @@ with tab1:
         st.session_state.temporal_result = None
     if 'temporal_processing' not in st.session_state:
         st.session_state.temporal_processing = False
+    if 'temporal_workflow_id' not in st.session_state:
+        st.session_state.temporal_workflow_id = None
 
     # User input
     temporal_request = st.text_input(
@@ -109,35 +141,78 @@ with tab1:
         placeholder="e.g., Sing the entire song for me!",
         key="temporal_input"
     )
+    
+    # Identical requests (same prompt and options) that are still running are joined instead of restarted
+    temporal_dedup = st.checkbox(
+        "🔁 Join an identical request if it's already running",
+        value=False,
+        key="temporal_dedup",
+    )
+    
+    # Off by default: every reported verse adds a signal and a workflow task to the history
+    temporal_report_progress = st.checkbox(
+        "📡 Show each verse the moment it's sung (adds history events per verse)",
+        value=False,
+        key="temporal_report_progress",
+    )
+    
+    # A run's resume token is its workflow ID - paste one in to reattach after a crash
+    with st.expander("🔖 Resume an earlier run"):
+        resume_token = st.text_input(
+            "Resume token",
+            placeholder="e.g., twelve-days-1a2b3c4d5e6f",
+            key="temporal_resume_token",
+        )
+        resume_clicked = st.button("🔄 Resume", key="temporal_resume")
 
     # Process button
-    if st.button("🎵 Submit", type="primary", key="temporal_submit"):
-        if temporal_request:
+    if st.button("🎵 Submit", type="primary", key="temporal_submit") or resume_clicked:
+        if resume_clicked and not resume_token:
+            st.warning("⚠️ Please enter a resume token first!")
+        elif temporal_request or resume_clicked:
+            from durable_temporal.progress import watch_progress
+            from durable_temporal.workflow import AgentOptions
+            from durable_temporal.workflow_ids import resume_twelve_days, start_twelve_days
+            from twelve_days.verses import VERSES_MARKDOWN
+            client_manager = get_client_manager()
+            
             st.session_state.temporal_processing = True
             st.session_state.temporal_result = None
             
             # Show processing message
             with st.spinner("🎅 Processing your request with Temporal..."):
-                async def run_workflow():
-                    """Connect to Temporal and execute the workflow."""
-                    client = await Client.connect(
-                        "localhost:7233",
-                        plugins=[OpenAIAgentsPlugin()],
-                    )
+                async def start_workflow():
+                    """Start (or reattach to) the workflow on the shared Temporal client."""
+                    client = await client_manager.temporal_client()
                     
-                    result = await client.execute_workflow(
-                        TwelveDaysWorkflow.run,
-                        temporal_request,
-                        id="twelve-days-demo",
-                        task_queue="twelve-days-queue",
-                        id_reuse_policy=WorkflowIDReusePolicy.TERMINATE_IF_RUNNING,
+                    if resume_clicked:
+                        return resume_twelve_days(client, resume_token)
+                    return await start_twelve_days(
+                        client, temporal_request, dedup=temporal_dedup,
+                        options=AgentOptions(report_progress=temporal_report_progress),
                     )
-                    
-                    return result
                 
                 try:
-                    # Run the async workflow
-                    result = asyncio.run(run_workflow())
+                    # Run the async calls on the shared background loop
+                    handle = client_manager.submit(start_workflow()).result()
+                    st.session_state.temporal_workflow_id = handle.id
+                    
+                    # Show each verse as soon as the workflow reports it
+                    status_box = st.empty()
+                    verses_box = st.empty()
+                    updates = watch_progress(handle)
+                    
+                    async def next_progress():
+                        return await anext(updates, None)
+                    
+                    while (progress := client_manager.submit(next_progress()).result()) is not None:
+                        status_box.caption(progress.status())
+                        if progress.verses_completed:
+                            verses_box.markdown("\n\n".join(VERSES_MARKDOWN[day] for day in sorted(progress.verses_completed)))
+                        elif progress.partial_output:
+                            verses_box.markdown(f"💬 {progress.partial_output}")
+                    
+                    result = client_manager.submit(handle.result()).result()
                     st.session_state.temporal_result = result
                     st.session_state.temporal_processing = False
                 except Exception as e:
@@ -156,6 +231,9 @@ with tab1:
         </div>
         """, unsafe_allow_html=True)
         
+        if st.session_state.temporal_workflow_id:
+            st.caption(f"🔖 Resume token: `{st.session_state.temporal_workflow_id}`")
+        
         st.markdown("💡 **Tip**: Check your Worker terminal to see the full verses being printed. Try crashing the worker (Ctrl+C) and restarting it to see durability in action!")
 
 # TAB 2: Non-Temporal Version (Non-Durable)
@@ -173,11 +251,10 @@ with tab2:
         - Tell me about the gift on day 5
         """)
 
-    # Initialize session state
-    if 'non_temporal_result' not in st.session_state:
-        st.session_state.non_temporal_result = None
-    if 'non_temporal_processing' not in st.session_state:
-        st.session_state.non_temporal_processing = False
+    # Requests run as background jobs; the session only keeps their IDs,
+    # so reruns (and other sessions) aren't blocked while an agent runs
+    if 'non_temporal_job_ids' not in st.session_state:
+        st.session_state.non_temporal_job_ids = []
 
     # User input
     non_temporal_request = st.text_input(
@@ -189,64 +266,77 @@ with tab2:
     # Process button
     if st.button("🎵 Submit", type="primary", key="non_temporal_submit"):
         if non_temporal_request:
-            st.session_state.non_temporal_processing = True
-            st.session_state.non_temporal_result = None
+            import tools as non_temporal_tools
+            from twelve_days.jobs import JobLimitError
+            prompt = non_temporal_request
             
-            # Show processing message
-            with st.spinner("🎅 Processing your request with OpenAI Agents SDK..."):
-                async def run_agent():
-                    """Run the pure OpenAI agent."""
-                    agent = Agent(
-                        name="twelve-days-teacher",
-                        model="gpt-4o",
-                        instructions="""You are a cheerful AI teacher helping someone learn "The 12 Days of Christmas" song.
-
-When asked to sing the ENTIRE/FULL/WHOLE song (all 12 days):
-1. Call sing_verse for each day from 1 to 12 in order
-2. Make sure to complete all 12 days - don't skip any!
-3. After calling all the tools, provide a condensed summary listing each day with ONLY its main gift (not cumulative)
-4. Format like: "On the first day of Christmas, my true love gave to me... 🐦 A partridge in a pear tree"
-5. Then "On the second day of Christmas, my true love gave to me... 🕊️ Two turtle doves"
-6. Continue through all 12 days in this condensed format
-
-When asked to sing specific days or a range (like "day 7" or "days 1-5"):
-1. Call sing_verse for each requested day
-2. In your response, write out the FULL verses with all cumulative gifts as they appear in the song
-3. Include all the previous gifts that come before, just like in the traditional song
-4. Be enthusiastic and sing the complete verses!
-
-When asked about specific gifts:
-- Use get_gift_info to answer questions about what comes on which day
-- Be helpful and enthusiastic
-
-Always be enthusiastic and make learning fun! Use holiday emojis when appropriate.""",
-                        tools=[non_temporal_tools.sing_verse, non_temporal_tools.get_gift_info]
-                    )
-                    result = await Runner.run(agent, non_temporal_request)
-                    return result.final_output
-                    
-                try:
-                    # Run the async agent
-                    result = asyncio.run(run_agent())
-                    st.session_state.non_temporal_result = result
-                    st.session_state.non_temporal_processing = False
-                except Exception as e:
-                    st.session_state.non_temporal_result = f"❌ Error: {str(e)}"
-                    st.session_state.non_temporal_processing = False
+            async def run_agent(job):
+                """Run the pure OpenAI agent, reporting each verse to the job as it's sung."""
+                non_temporal_tools.verse_listener.set(job.report)
+                # The same fast path, agent, cache and router as the CLI
+                return (await get_agent().answer_prompt(prompt))["answer"]
+            
+            try:
+                # The job runs on the shared background loop, reusing its pooled OpenAI client
+                job = get_job_executor().start(run_agent, prompt)
+                st.session_state.non_temporal_job_ids.insert(0, job.id)
+            except JobLimitError as e:
+                st.warning(f"🚦 The server is busy: {e}")
         else:
             st.warning("⚠️ Please enter a request first!")
 
-    # Display result
-    if st.session_state.non_temporal_result:
-        st.markdown("---")
-        st.markdown("### 🎉 Response:")
-        st.markdown(f"""
-        <div class="success-box">
-        {st.session_state.non_temporal_result}
-        </div>
-        """, unsafe_allow_html=True)
+    # Display this session's jobs, newest first, updating until they're all done
+    if st.session_state.non_temporal_job_ids:
+        import time
+        from twelve_days.jobs import CANCELLED, DONE, FAILED, QUEUED
+        from twelve_days.verses import VERSES_MARKDOWN
+        executor = get_job_executor()
+        
+        # Jobs dropped by the executor (finished long ago) are forgotten here too
+        jobs = [job for job_id in st.session_state.non_temporal_job_ids if (job := executor.get(job_id))]
+        st.session_state.non_temporal_job_ids = [job.id for job in jobs]
+        
+        boxes = []
+        for job in jobs:
+            st.markdown("---")
+            st.markdown(f"**❓ {job.prompt}**")
+            if not job.done and st.button("🛑 Cancel", key=f"cancel_{job.id}"):
+                executor.cancel(job.id)
+            boxes.append((job, st.empty(), st.empty()))
+        
+        def render(job, status_box, result_box):
+            if job.status == QUEUED:
+                status_box.caption(f"⏳ Queued - {executor.queue_position(job)} ahead ({executor})")
+            elif not job.done:
+                status_box.caption(f"🎅 Running for {job.elapsed:.0f}s - {len(job.progress)} verses sung so far")
+            elif job.status == CANCELLED:
+                status_box.caption(f"🛑 Cancelled after {job.elapsed:.0f}s")
+            elif job.status == FAILED:
+                status_box.caption(f"❌ Failed after {job.elapsed:.1f}s")
+            else:
+                status_box.caption(f"✅ Finished in {job.elapsed:.1f}s")
+            
+            if job.status == DONE:
+                result_box.markdown(f"""
+                <div class="success-box">
+                {job.result}
+                </div>
+                """, unsafe_allow_html=True)
+            elif job.error:
+                result_box.markdown(f"❌ Error: {job.error}")
+            elif job.progress:
+                # Verses show up as they're sung, before the agent's answer
+                result_box.markdown("\n\n".join(VERSES_MARKDOWN[day] for day in sorted(set(job.progress))))
+        
+        # A click elsewhere stops this loop (Streamlit reruns the script) - the jobs keep going
+        while True:
+            for box in boxes:
+                render(*box)
+            if all(job.done for job, _, _ in boxes):
+                break
+            time.sleep(0.5)
         
-        st.markdown("⚠️ **Note**: This execution runs entirely in the Streamlit process. If you Ctrl+C this terminal, all progress is lost forever!")
+        st.markdown("⚠️ **Note**: These jobs run entirely in the Streamlit process. If you Ctrl+C this terminal, all progress is lost forever!")
 
 # Footer
 st.markdown("---")
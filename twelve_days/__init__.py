@@ -0,0 +1 @@
+"""Shared pieces used by both the durable and non-durable 12 Days of Christmas agents."""
@@ -0,0 +1,99 @@
+"""
+Process-wide clients for long-running UIs.
+
+Streamlit reruns the whole script on every click, and calling asyncio.run()
+each time means a fresh event loop, a new gRPC connection to Temporal and a
+new OpenAI HTTP client per request. ClientManager instead owns one
+background event loop thread for the life of the process, plus a cached
+Temporal client and a shared AsyncOpenAI client that live on that loop.
+Work is handed to the loop with submit(), which returns a future; the
+OpenAI client is created there, on the loop, the first time work arrives.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Coroutine, Optional, TypeVar
+
+from agents import set_default_openai_client
+from openai import AsyncOpenAI, OpenAIError
+from temporalio.client import Client
+
+T = TypeVar("T")
+
+
+class ClientManager:
+    """One event loop thread, one Temporal client and one OpenAI client per process."""
+
+    def __init__(
+        self,
+        connect: Callable[[], Awaitable[Client]],
+        health_check_interval: float = 30.0,
+    ) -> None:
+        self._connect = connect
+        self.health_check_interval = health_check_interval
+        self._client: Optional[Client] = None
+        self._checked_at = 0.0
+        self._client_lock: Optional[asyncio.Lock] = None
+        self._openai_client: Optional[AsyncOpenAI] = None
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever,
+            name="twelve-days-client-loop",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> "concurrent.futures.Future[T]":
+        """Runs a coroutine on the background loop and returns its future."""
+        return asyncio.run_coroutine_threadsafe(self._run(coro), self._loop)
+
+    async def _run(self, coro: Coroutine[Any, Any, T]) -> T:
+        self._install_openai_client()
+        return await coro
+
+    async def temporal_client(self) -> Client:
+        """
+        The shared Temporal client, connecting on first use.
+
+        At most every health_check_interval seconds the connection is
+        checked and replaced if the server stopped answering. Must be
+        awaited on the manager's loop (i.e. from a submitted coroutine).
+        """
+        if self._client_lock is None:
+            self._client_lock = asyncio.Lock()
+        async with self._client_lock:
+            now = time.monotonic()
+            if self._client is not None and now - self._checked_at < self.health_check_interval:
+                return self._client
+            if self._client is not None and not await self._is_healthy(self._client):
+                self._client = None
+            if self._client is None:
+                self._client = await self._connect()
+            self._checked_at = now
+            return self._client
+
+    def _install_openai_client(self) -> None:
+        """
+        Creates the shared AsyncOpenAI client (and its HTTP connection pool)
+        on the manager's loop and installs it as the Agents SDK default, so
+        every agent run submitted here reuses its connections.
+        """
+        if self._openai_client is not None:
+            return
+        try:
+            self._openai_client = AsyncOpenAI()
+        except OpenAIError:
+            # No API key (yet) - Temporal-only work doesn't need one, and agent runs report it themselves
+            return
+        set_default_openai_client(self._openai_client)
+
+    @staticmethod
+    async def _is_healthy(client: Client) -> bool:
+        try:
+            return await client.service_client.check_health(timeout=timedelta(seconds=5))
+        except Exception:
+            return False
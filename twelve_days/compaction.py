@@ -0,0 +1,182 @@
+"""
+Compaction of the agent's input between model turns.
+
+Every model call re-sends the instructions plus every earlier tool call and
+result, so a run that sings the song verse by verse sends roughly
+quadratically more input tokens as it goes. Compactor plugs into
+RunConfig.call_model_input_filter and, once the input passes a token
+budget, collapses finished tool calls into one short running summary
+("Verses 1-7 done.") and drops redundant items. The most recent batch of
+tool calls is always kept as-is, so the model sees the results it just
+asked for.
+
+Token counts come from tiktoken when it's installed (local_token_counter),
+otherwise from a ~4 characters per token estimate (estimate_tokens, which
+the scripted model reports too). Inside workflows the estimate is always
+used, so the decision to compact replays identically.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from agents.run import CallModelData, ModelInputData
+
+from twelve_days.verses import verses_in_result
+
+# Items that never need to be shown to the model again
+_REDUNDANT_TYPES = {"reasoning"}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def local_token_counter() -> Callable[[str], int]:
+    """A tiktoken-based counter if tiktoken is installed, else the rough estimate."""
+    try:
+        import tiktoken
+    except ImportError:
+        return estimate_tokens
+    encoding = tiktoken.get_encoding("o200k_base")
+    return lambda text: len(encoding.encode(text))
+
+
+def _get(item: Any, key: str) -> Any:
+    return item.get(key) if isinstance(item, dict) else getattr(item, key, None)
+
+
+def _day_ranges(days: list[int]) -> str:
+    """[1, 2, 3, 5] -> "1-3, 5"."""
+    ranges: list[list[int]] = []
+    for day in sorted(set(days)):
+        if ranges and day == ranges[-1][1] + 1:
+            ranges[-1][1] = day
+        else:
+            ranges.append([day, day])
+    return ", ".join(str(start) if start == end else f"{start}-{end}" for start, end in ranges)
+
+
+def _batches(items: list) -> list[list[int]]:
+    """Indexes of the tool-call batches, in order: each model turn's calls plus their outputs."""
+    batches: list[list[int]] = []
+    in_calls = False
+    for index, item in enumerate(items):
+        kind = _get(item, "type")
+        if kind == "function_call":
+            # A call right after something else starts a new model turn
+            if not in_calls:
+                batches.append([])
+                in_calls = True
+            batches[-1].append(index)
+        else:
+            in_calls = False
+            if kind == "function_call_output" and batches:
+                batches[-1].append(index)
+    return batches
+
+
+def summarize_results(outputs: list[str], max_chars: int = 200) -> str:
+    """A short summary of finished tool results: verse ranges plus any other (trimmed) results."""
+    days, other = [], []
+    for output in outputs:
+        verses = verses_in_result(output)
+        if verses:
+            days += verses
+        elif output and output not in other:
+            other.append(output if len(output) <= max_chars else output[:max_chars] + "...")
+    lines = [f"Verses {_day_ranges(days)} done."] if days else []
+    return "\n".join(lines + other)
+
+
+@dataclass
+class CompactionStats:
+    """Input token counts before and after compaction, over every model call seen."""
+
+    calls: int = 0
+    compacted: int = 0
+    tokens_before: int = 0
+    tokens_after: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    def __str__(self) -> str:
+        return (
+            f"{self.compacted}/{self.calls} model calls compacted, "
+            f"{self.tokens_before:,} -> {self.tokens_after:,} input tokens ({self.tokens_saved:,} saved)"
+        )
+
+
+class Compactor:
+    """
+    A call_model_input_filter that keeps the model's input under a token budget.
+
+    Usage: RunConfig(call_model_input_filter=Compactor(token_budget=600))
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 600,
+        keep_recent: int = 1,
+        count_tokens: Optional[Callable[[str], int]] = None,
+    ) -> None:
+        self.token_budget = token_budget
+        self.keep_recent = keep_recent
+        self.count_tokens = count_tokens or estimate_tokens
+        self.stats = CompactionStats()
+
+    def __call__(self, data: CallModelData) -> ModelInputData:
+        model_data = data.model_data
+        before = self.measure(model_data.input, model_data.instructions)
+        items = model_data.input
+        if before > self.token_budget:
+            items = self.compact(items)
+        after = self.measure(items, model_data.instructions) if items is not model_data.input else before
+
+        self.stats.calls += 1
+        self.stats.compacted += after < before
+        self.stats.tokens_before += before
+        self.stats.tokens_after += after
+        return ModelInputData(input=items, instructions=model_data.instructions)
+
+    def measure(self, items: list, instructions: Optional[str]) -> int:
+        return self.count_tokens((instructions or "") + json.dumps(items, default=str, ensure_ascii=False))
+
+    def compact(self, items: list) -> list:
+        """Collapses all but the most recent tool-call batches into one summary message."""
+        batches = _batches(items)
+        finished = batches[: max(0, len(batches) - self.keep_recent)]
+        folded = {index for batch in finished for index in batch}
+        outputs = [_get(items[index], "output") for index in sorted(folded)]
+        outputs = [output for output in outputs if isinstance(output, str)]
+
+        compacted, summary_at = [], None
+        for index, item in enumerate(items):
+            if index in folded:
+                # The summary goes where the first folded tool call was
+                if summary_at is None:
+                    summary_at = len(compacted)
+                continue
+            if _get(item, "type") in _REDUNDANT_TYPES:
+                continue
+            compacted.append(item)
+
+        summary = summarize_results(outputs)
+        if summary_at is not None and summary:
+            compacted.insert(summary_at, {
+                "role": "developer",
+                "content": f"Summary of earlier tool results:\n{summary}",
+            })
+        return compacted
+
+
+def compactor_from_env() -> Optional[Compactor]:
+    """A Compactor set up from COMPACTION_TOKEN_BUDGET (default 600, "off" to disable)."""
+    budget = os.environ.get("COMPACTION_TOKEN_BUDGET", "600").strip().lower()
+    if budget in ("", "off"):
+        return None
+    return Compactor(int(budget), count_tokens=local_token_counter())
@@ -0,0 +1,186 @@
+"""
+Deterministic fast path for the most common requests.
+
+"What gift comes on day 7?" and "Sing days 1 through 5" don't need a model to
+work out what to do. parse_intent() recognizes these with a cheap parser and
+answer() calls the tools directly, so the agent (and its model round trips)
+is skipped entirely. Anything the parser isn't sure about returns None and
+falls back to the agent.
+"""
+
+import inspect
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, Union
+
+from .verses import GIFTS, ORDINALS, VERSES_MARKDOWN
+
+_NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+}
+_ORDINAL_WORDS = {word: day for day, word in ORDINALS.items()}
+
+# A day can be written as "7", "7th", "seven" or "seventh"
+_DAY = r"(\d{1,2}(?:st|nd|rd|th)?|" + "|".join(list(_NUMBER_WORDS) + list(_ORDINAL_WORDS)) + ")"
+
+# Polite filler that doesn't change what's being asked
+_FILLER = re.compile(
+    r"\b((12|twelve) days of christmas|please|can you|could you|would you|will you|"
+    r"i want you to|i'd like you to|for me|for us|now|just|the|(of )?christmas)\b"
+)
+
+_SONG = re.compile(
+    r"(?:sing|perform)(?: me)? (?:entire|whole|full|all|complete)(?: days)? (?:days )?song"
+    r"|(?:sing|perform)(?: me)? (?:all|every)(?: (?:12|twelve))? (?:days?|verses?)"
+)
+_SING_RANGE = re.compile(rf"(?:sing|perform)(?: me)? days? {_DAY} ?(?:-|–|to|through|thru|until) ?{_DAY}")
+_SING_DAY = re.compile(rf"(?:sing|perform)(?: me)? (?:day {_DAY}|{_DAY} day)(?: verse)?")
+_GIFT = re.compile(
+    rf"(?:what|which) (?:gift|present)s? (?:comes?|is|are) (?:on|for) (?:day {_DAY}|{_DAY} day)"
+    rf"|(?:tell me|what is|what's) (?:about )?(?:gift|present) (?:on|for) (?:day {_DAY}|{_DAY} day)"
+)
+
+
+@dataclass(frozen=True)
+class Intent:
+    """A request the fast path can answer without the model."""
+
+    kind: str  # "gift", "sing" or "song"
+    days: tuple[int, ...]
+
+    def describe(self) -> str:
+        if self.kind == "gift":
+            return f"gift lookup for day {self.days[0]}"
+        if self.kind == "song":
+            return "the entire song"
+        if len(self.days) == 1:
+            return f"sing day {self.days[0]}"
+        return f"sing days {self.days[0]}-{self.days[-1]}"
+
+
+def _normalize(prompt: str) -> str:
+    text = prompt.lower().replace("’", "'")
+    text = re.sub(r"[^a-z0-9'\-– ]", " ", text)
+    text = _FILLER.sub(" ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _to_day(token: str) -> Optional[int]:
+    token = re.sub(r"(st|nd|rd|th)$", "", token) if token[0].isdigit() else token
+    day = int(token) if token.isdigit() else _NUMBER_WORDS.get(token, _ORDINAL_WORDS.get(token))
+    return day if day in GIFTS else None
+
+
+def _first_day(match: re.Match) -> Optional[int]:
+    # Only the day tokens are captured; alternations leave the unmatched ones as None
+    token = next(group for group in match.groups() if group)
+    return _to_day(token)
+
+
+def parse_intent(prompt: str) -> Optional[Intent]:
+    """
+    Recognizes the simple requests the fast path can answer.
+
+    The whole (normalized) prompt has to match, so anything with extra asks
+    ("sing day 3 and explain it") or out-of-range days returns None and goes
+    to the agent instead.
+    """
+    text = _normalize(prompt)
+
+    if _SONG.fullmatch(text):
+        return Intent("song", tuple(GIFTS))
+
+    match = _SING_RANGE.fullmatch(text)
+    if match:
+        start, end = _to_day(match.group(1)), _to_day(match.group(2))
+        if start is None or end is None or start > end:
+            return None
+        return Intent("sing", tuple(range(start, end + 1)))
+
+    match = _SING_DAY.fullmatch(text)
+    if match:
+        day = _first_day(match)
+        return Intent("sing", (day,)) if day else None
+
+    match = _GIFT.fullmatch(text)
+    if match:
+        day = _first_day(match)
+        return Intent("gift", (day,)) if day else None
+
+    return None
+
+
+ToolFn = Callable[..., Union[str, Awaitable[str]]]
+
+
+async def _call(fn: ToolFn, *args: Any) -> str:
+    # Works with both the async activities and the sync non-temporal tools
+    result = fn(*args)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def answer(
+    intent: Intent,
+    *,
+    sing_verse: ToolFn,
+    sing_verses: ToolFn,
+    get_gift_info: ToolFn,
+) -> str:
+    """
+    Answers an intent by calling the tools directly.
+
+    The tools are passed in so the workflow can hand over activity calls
+    (keeping each verse checkpointed) and the non-temporal agent can hand
+    over plain functions.
+    """
+    if intent.kind == "gift":
+        return f"🎁 {await _call(get_gift_info, intent.days[0])} 🎄"
+
+    if len(intent.days) == 1:
+        await _call(sing_verse, intent.days[0])
+    else:
+        await _call(sing_verses, intent.days[0], intent.days[-1])
+
+    if intent.kind == "song":
+        # Same condensed format the agent is asked to use for the whole song
+        lines = [
+            f"On the {ORDINALS[day]} day of Christmas, my true love gave to me... {GIFTS[day]}"
+            for day in intent.days
+        ]
+        # Trailing double spaces keep the line breaks when rendered as markdown
+        return "🎄 Here's the whole song! 🎶\n\n" + "  \n".join(lines)
+
+    verses = "\n\n".join(VERSES_MARKDOWN[day] for day in intent.days)
+    return f"🎶 Here you go!\n\n{verses}"
+
+
+class FastPathStats:
+    """Counts how many requests the fast path answered without the model."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __str__(self) -> str:
+        return f"fast path hit rate {self.hits}/{self.hits + self.misses} ({self.hit_rate:.0%})"
+
+
+# Process-wide counter shared by every agent in this process
+STATS = FastPathStats()
@@ -0,0 +1,165 @@
+"""
+Background jobs for long-running UIs.
+
+A Streamlit click that waits for a whole agent run ties up that session's
+script for as long as the run takes, and the next rerun throws the wait
+away. JobExecutor instead runs each request as a job on a background event
+loop (ClientManager's), keyed by an ID the UI keeps in its session state.
+The script only starts jobs and reads them back: status, the progress the
+job has reported so far, and the result once it's done - so a rerun just
+picks the job up again.
+
+At most max_running jobs run at once per process; the rest wait their turn,
+and once max_jobs are queued or running, new ones are turned away with
+JobLimitError. Finished jobs are kept for keep_finished seconds.
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Coroutine, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+class JobLimitError(RuntimeError):
+    """The process already has as many jobs as it takes."""
+
+
+@dataclass
+class Job:
+    """One request running (or waiting to run) in the background."""
+
+    id: str
+    prompt: str
+    status: str = QUEUED
+    result: Optional[str] = None
+    error: Optional[str] = None
+    progress: list[Any] = field(default_factory=list)
+    """Whatever the job reported so far (e.g. the days sung), in order."""
+
+    created: float = field(default_factory=time.monotonic)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    _future: Optional[concurrent.futures.Future] = field(default=None, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since it started running (or was submitted, while queued)."""
+        start = self.started if self.started is not None else self.created
+        return (self.finished or time.monotonic()) - start
+
+    def report(self, update: Any) -> None:
+        """Adds a progress update; called from the job itself."""
+        self.progress.append(update)
+
+
+# What a job runs: a coroutine that can report progress on its Job and returns the answer
+JobFunction = Callable[[Job], Awaitable[str]]
+
+
+class JobExecutor:
+    """Runs jobs on a background loop, a bounded number at a time."""
+
+    def __init__(
+        self,
+        submit: Callable[[Coroutine[Any, Any, Any]], concurrent.futures.Future],
+        max_running: int = 8,
+        max_jobs: int = 32,
+        keep_finished: float = 600.0,
+    ) -> None:
+        self._submit = submit
+        self.max_running = max_running
+        self.max_jobs = max_jobs
+        self.keep_finished = keep_finished
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+        # Created on the background loop by the first job
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def start(self, run: JobFunction, prompt: str) -> Job:
+        """Queues `run` as a new job; raises JobLimitError if the process is full."""
+        with self._lock:
+            self._prune()
+            if self.unfinished() >= self.max_jobs:
+                raise JobLimitError(f"{self.max_jobs} requests are already queued or running - try again shortly")
+            job = Job(id=f"job-{uuid.uuid4().hex[:12]}", prompt=prompt)
+            self._jobs[job.id] = job
+        job._future = self._submit(self._run(job, run))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """The job, or None if it never existed or was finished long enough ago to be dropped."""
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancels a queued or running job; False if it's unknown or already finished."""
+        job = self._jobs.get(job_id)
+        if job is None or job.done:
+            return False
+        if job.status == QUEUED:
+            # It may not have reached the loop yet, so it's marked here
+            self._finish(job, CANCELLED)
+        if job._future is not None:
+            job._future.cancel()
+        return True
+
+    def unfinished(self) -> int:
+        return sum(not job.done for job in self._jobs.values())
+
+    def queue_position(self, job: Job) -> int:
+        """How many queued jobs were submitted before this one."""
+        return sum(other.status == QUEUED and other.created < job.created for other in list(self._jobs.values()))
+
+    async def _run(self, job: Job, run: JobFunction) -> None:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_running)
+        async with self._slots:
+            if job.done:
+                return
+            job.status, job.started = RUNNING, time.monotonic()
+            try:
+                job.result = await run(job)
+                self._finish(job, DONE)
+            except asyncio.CancelledError:
+                self._finish(job, CANCELLED)
+            except Exception as error:
+                job.error = f"{type(error).__name__}: {error}"
+                self._finish(job, FAILED)
+
+    @staticmethod
+    def _finish(job: Job, status: str) -> None:
+        job.status, job.finished = status, time.monotonic()
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        for job_id, job in list(self._jobs.items()):
+            if job.done and now - job.finished > self.keep_finished:
+                del self._jobs[job_id]
+
+    def __str__(self) -> str:
+        running = sum(job.status == RUNNING for job in list(self._jobs.values()))
+        return f"{running}/{self.max_running} running, {self.unfinished() - running} queued"
+
+
+def executor_from_env(submit: Callable[[Coroutine[Any, Any, Any]], concurrent.futures.Future]) -> JobExecutor:
+    """A JobExecutor sized by UI_MAX_RUNNING_JOBS (default 8) and UI_MAX_JOBS (default 32)."""
+    return JobExecutor(
+        submit,
+        max_running=int(os.environ.get("UI_MAX_RUNNING_JOBS", 8)),
+        max_jobs=int(os.environ.get("UI_MAX_JOBS", 32)),
+    )
@@ -0,0 +1,204 @@
+"""
+Batch and load runs, shared by the durable and non-temporal batch modes.
+
+run_load sends prompts through a `run_one` coroutine - start a workflow and
+wait for it, or call Runner.run directly - with bounded concurrency, an
+optional request rate, total count and deadline. Every request is written
+out as one JSON line as soon as it finishes, and the run ends with a
+LatencySummary, so both paths produce the same records and summary and can
+be compared under the same load.
+
+Prompts come from a JSONL file (or stdin with "-"): each line is either a
+JSON string or an object with a "prompt" key.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, TextIO
+
+from twelve_days.stats import LatencySummary
+
+# What run_one returns: extra fields for the request's record (answer, tokens, ...)
+RunOne = Callable[[str], Awaitable[dict[str, Any]]]
+
+
+@dataclass
+class LoadSettings:
+    """How hard, how many and how long to push."""
+
+    concurrency: int = 10
+    """Requests in flight at once."""
+
+    rate: Optional[float] = None
+    """Requests started per second (None: as fast as concurrency allows)."""
+
+    count: Optional[int] = None
+    """Total requests, cycling through the prompts (None: each prompt once)."""
+
+    deadline: Optional[float] = None
+    """Seconds until no new requests start and unfinished ones are given up on."""
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> "LoadSettings":
+        return cls(concurrency=args.concurrency, rate=args.rate, count=args.count, deadline=args.deadline)
+
+
+def add_load_arguments(parser: argparse.ArgumentParser) -> None:
+    """The batch flags both batch runners take."""
+    group = parser.add_argument_group("batch mode")
+    group.add_argument("--output", default="-", help="Where to write one JSON line per finished request (default: stdout)")
+    group.add_argument("--concurrency", type=int, default=10, help="Requests in flight at once (default: 10)")
+    group.add_argument("--rate", type=float, help="Requests started per second (default: no limit)")
+    group.add_argument("--count", type=int, help="Total requests, cycling through the prompts (default: each once)")
+    group.add_argument("--deadline", type=float, help="Stop after this many seconds, giving up on unfinished requests")
+
+
+def read_prompts(path: str) -> list[str]:
+    """Prompts from a JSONL file, or stdin for "-"."""
+    source = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        prompts = []
+        for line in source:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            prompts.append(item["prompt"] if isinstance(item, dict) else str(item))
+        return prompts
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+
+async def _acquire(semaphore: asyncio.Semaphore, deadline: Optional[float]) -> bool:
+    """Waits for a free slot; False if the deadline passes first."""
+    if deadline is None:
+        await semaphore.acquire()
+        return True
+    try:
+        await asyncio.wait_for(semaphore.acquire(), timeout=max(0.0, deadline - time.perf_counter()))
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+
+async def run_load(
+    prompts: list[str],
+    run_one: RunOne,
+    settings: LoadSettings,
+    output: Optional[TextIO] = None,
+) -> LatencySummary:
+    """
+    Runs the prompts through run_one as settings say, writing a JSON line per
+    finished request to output, and summarizes the successful ones.
+    """
+    if not prompts:
+        raise ValueError("No prompts to run")
+    total = settings.count if settings.count is not None else len(prompts)
+    semaphore = asyncio.Semaphore(settings.concurrency)
+    latencies: list[float] = []
+    errors = 0
+    start = time.perf_counter()
+    deadline = start + settings.deadline if settings.deadline is not None else None
+
+    def write(record: dict[str, Any]) -> None:
+        nonlocal errors
+        finished.add(record["index"])
+        if record["ok"]:
+            latencies.append(record["latency"])
+        else:
+            errors += 1
+        if output is not None:
+            output.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            output.flush()
+
+    async def one(index: int, prompt: str) -> None:
+        record: dict[str, Any] = {"index": index, "prompt": prompt}
+        acquired = False
+        began = time.perf_counter()
+        try:
+            # The slot is taken here, so whatever happens to the task it's given back
+            acquired = await _acquire(semaphore, deadline)
+            if not acquired:
+                record.update(ok=False, error="Deadline exceeded before it started")
+            else:
+                began = time.perf_counter()
+                record["started"] = round(began - start, 3)
+                record.update(await run_one(prompt))
+                record["ok"] = True
+        except asyncio.CancelledError:
+            # Given up on at the deadline - it still gets a record
+            record.update(ok=False, error="Deadline exceeded" if acquired else "Cancelled before it started")
+        except Exception as error:
+            record.update(ok=False, error=f"{type(error).__name__}: {error}")
+        finally:
+            if acquired:
+                semaphore.release()
+
+        record["latency"] = round(time.perf_counter() - began, 3) if acquired else 0.0
+        write(record)
+
+    tasks: dict[int, asyncio.Task] = {}
+    finished: set[int] = set()
+    for index in range(total):
+        if settings.rate:
+            # Paced from the start, so a slow slot doesn't push every later request back
+            await asyncio.sleep(max(0.0, start + index / settings.rate - time.perf_counter()))
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        # Don't run ahead of the slots: wait for a request to finish before queueing another
+        in_flight = [task for task in tasks.values() if not task.done()]
+        if len(in_flight) >= settings.concurrency:
+            timeout = max(0.0, deadline - time.perf_counter()) if deadline is not None else None
+            await asyncio.wait(in_flight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        tasks[index] = asyncio.create_task(one(index, prompts[index % len(prompts)]))
+
+    if tasks:
+        timeout = max(0.0, deadline - time.perf_counter()) if deadline is not None else None
+        _, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    # A task cancelled before it ever ran never got to write its own record
+    for index in tasks.keys() - finished:
+        write({"index": index, "prompt": prompts[index % len(prompts)], "ok": False,
+               "error": "Cancelled before it started", "latency": 0.0})
+
+    return LatencySummary.from_latencies(latencies, time.perf_counter() - start, errors=errors)
+
+
+async def run_batch(prompts_path: str, run_one: RunOne, settings: LoadSettings, output_path: str, label: str) -> LatencySummary:
+    """
+    run_load from a prompts file to a results file ("-" for stdin/stdout),
+    with the banner and summary both batch runners print.
+    """
+    prompts = read_prompts(prompts_path)
+    to_stdout = output_path == "-"
+    output = sys.stdout if to_stdout else open(output_path, "w", encoding="utf-8")
+    log = sys.stderr if to_stdout else sys.stdout
+    try:
+        print(f"\n{'='*60}", file=log)
+        print(f"🚚 {label} batch: {settings.count or len(prompts)} requests from {len(prompts)} prompts, "
+              f"concurrency {settings.concurrency}"
+              + (f", {settings.rate:g} req/s" if settings.rate else "")
+              + (f", deadline {settings.deadline:g}s" if settings.deadline is not None else ""), file=log)
+        print(f"{'='*60}", file=log)
+        # Keep stdout clean for the JSON lines when that's where they go -
+        # anything the requests print (verses, fast-path notes) goes to stderr
+        with contextlib.redirect_stdout(log):
+            summary = await run_load(prompts, run_one, settings, output)
+    finally:
+        if not to_stdout:
+            output.close()
+
+    print(f"\n{'='*60}", file=log)
+    print(f"📊 {label}: {summary}", file=log)
+    print(f"{'='*60}\n", file=log)
+    return summary
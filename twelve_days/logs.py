@@ -0,0 +1,95 @@
+"""
+Logging for the worker, the tools and the UIs.
+
+The workflows log through workflow.logger, which stays quiet while a
+workflow replays, and the activities through activity.logger, which tags
+each record with the activity's context. Everything else uses plain module
+loggers. configure_logging routes all of it through a queue to a single
+writer thread: callers only put the record on the queue, so concurrent
+activities never wait on the terminal or on each other.
+
+Records are written as text (the message, as the demo has always shown it)
+or as JSON with the level, logger, workflow/activity context and any extra
+fields - e.g. the day of a verse. Set with LOG_FORMAT and LOG_LEVEL.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+from typing import Optional, TextIO
+
+from temporalio import activity, workflow
+
+# Attributes every LogRecord has - anything else on a record is an extra field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_registered = False
+
+
+def stop_logging() -> None:
+    """Writes out whatever is still queued and stops the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, extra fields included."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def configure_logging(
+    level: Optional[str] = None,
+    format: Optional[str] = None,
+    stream: Optional[TextIO] = None,
+) -> logging.handlers.QueueListener:
+    """
+    Sends every log record through a queue to one writer thread.
+
+    level and format default to LOG_LEVEL ("INFO") and LOG_FORMAT ("text" or
+    "json"); records go to stderr unless another stream is given. Calling it
+    again replaces the previous setup.
+    """
+    global _listener, _registered
+    level = (level or os.environ.get("LOG_LEVEL", "INFO")).upper()
+    format = (format or os.environ.get("LOG_FORMAT", "text")).lower()
+    if format not in ("text", "json"):
+        raise ValueError(f"Unknown LOG_FORMAT: {format}. Expected text or json.")
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonFormatter() if format == "json" else logging.Formatter("%(message)s"))
+
+    stop_logging()
+    if not _registered:
+        # Flushes whatever is still queued on the way out
+        atexit.register(stop_logging)
+        _registered = True
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(records)]
+    root.setLevel(level)
+    _listener = logging.handlers.QueueListener(records, handler)
+    _listener.start()
+
+    # The context goes on the record (and into the JSON), not onto the message
+    workflow.logger.workflow_info_on_message = False
+    activity.logger.activity_info_on_message = False
+    return _listener
@@ -0,0 +1,293 @@
+"""
+Content-addressed cache for model responses.
+
+CachingModelProvider wraps another ModelProvider (OpenAI by default) and
+keys every get_response() call on a hash of the model name, instructions,
+tool schemas, settings and conversation items. Identical requests - like
+the demo's "Please sing the entire 12 Days of Christmas song for me!" -
+are then answered from the cache instead of calling OpenAI again.
+
+In the Temporal path the provider runs inside the plugin's model activity,
+so a cached response is still recorded as that activity's result and
+replay stays deterministic.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional, Protocol
+
+from agents import Model, ModelProvider, ModelResponse, ModelSettings
+from agents.models.openai_provider import OpenAIProvider
+from pydantic import BaseModel, TypeAdapter
+
+_RESPONSE_ADAPTER = TypeAdapter(ModelResponse)
+
+logger = logging.getLogger(__name__)
+
+# How long a cached response stays valid, unless MODEL_CACHE_TTL says otherwise
+DEFAULT_TTL_SECONDS = 3600
+
+
+class CacheBackend(Protocol):
+    """
+    Where cached responses live. Values are serialized ModelResponses.
+
+    Backends whose get/set block on I/O set `blocking = True`, and are then
+    called from a thread instead of on the event loop.
+    """
+
+    blocking: bool
+
+    def get(self, key: str) -> Optional[bytes]: ...
+
+    def set(self, key: str, value: bytes) -> None: ...
+
+
+class MemoryCache:
+    """In-process LRU cache with a time-to-live."""
+
+    blocking = False
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = DEFAULT_TTL_SECONDS) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SqliteCache:
+    """On-disk cache, shared by every process pointing at the same file."""
+
+    # Disk I/O - kept off the event loop
+    blocking = True
+
+    def __init__(self, path: str = ".model_cache.sqlite3", ttl_seconds: float = DEFAULT_TTL_SECONDS) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, stored_at REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, stored_at = row
+            if time.time() - stored_at > self.ttl_seconds:
+                with self._conn:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for a CachingModelProvider."""
+
+    hits: int = 0
+    misses: int = 0
+    tokens_saved: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"model cache hit rate {self.hits}/{self.hits + self.misses} "
+            f"({self.hit_rate:.0%}), {self.tokens_saved} tokens saved"
+        )
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", exclude_unset=True)
+    return repr(value)
+
+
+def _tool_schema(tool: Any) -> dict:
+    schema = {"name": getattr(tool, "name", type(tool).__name__)}
+    for attr in ("description", "params_json_schema", "strict_json_schema"):
+        if hasattr(tool, attr):
+            schema[attr] = getattr(tool, attr)
+    return schema
+
+
+def cache_key(
+    model_name: str,
+    system_instructions: Optional[str],
+    input: Any,
+    model_settings: ModelSettings,
+    tools: list,
+    output_schema: Any,
+    handoffs: list,
+    previous_response_id: Optional[str] = None,
+    conversation_id: Optional[str] = None,
+    prompt: Any = None,
+) -> str:
+    """The content address of a model request."""
+    payload = {
+        "model": model_name,
+        "instructions": system_instructions,
+        "input": input,
+        "settings": model_settings.to_json_dict(),
+        "tools": [_tool_schema(tool) for tool in tools],
+        "output_schema": output_schema.json_schema() if output_schema and not output_schema.is_plain_text() else None,
+        "handoffs": [handoff.tool_name for handoff in handoffs],
+        "previous_response_id": previous_response_id,
+        "conversation_id": conversation_id,
+        "prompt": prompt,
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=_jsonable)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class CachingModel(Model):
+    """Serves get_response() from the cache, falling back to the wrapped model."""
+
+    def __init__(self, model_name: str, model: Model, backend: CacheBackend, stats: CacheStats) -> None:
+        self.model_name = model_name
+        self.model = model
+        self.backend = backend
+        self.stats = stats
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        *,
+        previous_response_id=None,
+        conversation_id=None,
+        prompt=None,
+    ) -> ModelResponse:
+        key = cache_key(
+            self.model_name,
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            previous_response_id,
+            conversation_id,
+            prompt,
+        )
+        cached = await self._backend_call(self.backend.get, key)
+        if cached is not None:
+            response = _RESPONSE_ADAPTER.validate_json(cached)
+            self.stats.hits += 1
+            self.stats.tokens_saved += response.usage.total_tokens
+            logger.info(f"💾 Served from cache ({self.stats})")
+            return response
+
+        self.stats.misses += 1
+        response = await self.model.get_response(
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            tracing,
+            previous_response_id=previous_response_id,
+            conversation_id=conversation_id,
+            prompt=prompt,
+        )
+        await self._backend_call(self.backend.set, key, _RESPONSE_ADAPTER.dump_json(response))
+        return response
+
+    async def _backend_call(self, fn, *args):
+        if getattr(self.backend, "blocking", False):
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    def stream_response(self, *args, **kwargs):
+        # Streams aren't cached - there's no single response to store
+        return self.model.stream_response(*args, **kwargs)
+
+
+class CachingModelProvider(ModelProvider):
+    """Wraps a ModelProvider so every model it hands out is cached."""
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        provider: Optional[ModelProvider] = None,
+        default_model: str = "gpt-4o",
+    ) -> None:
+        self.backend = backend or MemoryCache()
+        self.provider = provider or OpenAIProvider()
+        self.default_model = default_model
+        self.stats = CacheStats()
+
+    def get_model(self, model_name: Optional[str]) -> Model:
+        name = model_name or self.default_model
+        return CachingModel(name, self.provider.get_model(model_name), self.backend, self.stats)
+
+
+def provider_from_env(provider: Optional[ModelProvider] = None) -> Optional[CachingModelProvider]:
+    """
+    Builds a caching provider from the MODEL_CACHE* environment variables.
+
+    MODEL_CACHE is "off" (default), "memory" or "sqlite". MODEL_CACHE_TTL sets
+    the time-to-live in seconds, MODEL_CACHE_SIZE the in-memory entry limit
+    and MODEL_CACHE_PATH the SQLite file. Returns None when caching is off.
+    """
+    kind = os.environ.get("MODEL_CACHE", "off").lower()
+    ttl = float(os.environ.get("MODEL_CACHE_TTL", DEFAULT_TTL_SECONDS))
+    if kind == "off":
+        return None
+    if kind == "memory":
+        backend = MemoryCache(int(os.environ.get("MODEL_CACHE_SIZE", 256)), ttl)
+    elif kind == "sqlite":
+        backend = SqliteCache(os.environ.get("MODEL_CACHE_PATH", ".model_cache.sqlite3"), ttl)
+    else:
+        raise ValueError(f"Unknown MODEL_CACHE backend: {kind}. Expected off, memory or sqlite.")
+    return CachingModelProvider(backend, provider)
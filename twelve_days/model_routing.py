@@ -0,0 +1,275 @@
+"""
+Routing each model turn to the cheapest model that can handle it.
+
+Most of the agent's model turns are easy: picking which tools to call, or
+answering from a short tool result ("On day 7, the gift is..."). Answers
+that quote sung verses or a long list of results need the large model.
+RoutingModelProvider wraps another ModelProvider and, for every
+get_response() call, looks at the conversation so far to pick a route:
+
+- "dispatch": no tool results yet - the model is choosing tools
+- "answer": answering from (or continuing after) short tool results
+- "long_answer": verses were sung, or the tool results are long (e.g. all 12
+  gifts), so the answer is long too
+- "escalation": the response from a smaller model failed validation (an
+  unknown tool, arguments that aren't JSON, an empty answer) and the turn
+  is re-run
+
+Each route maps to a model name in the routing table (MODEL_ROUTES), and
+the latency and tokens of every route are counted - in RoutingStats, and,
+inside a Temporal model activity, as twelve_days_route_* metrics with route
+and model attributes.
+
+Like the model cache, in the Temporal path the router runs inside the
+plugin's model activity, so the chosen model's response is what gets
+recorded and replay stays deterministic.
+"""
+
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Optional
+
+from agents import Model, ModelProvider, ModelResponse
+from agents.models.openai_provider import OpenAIProvider
+from temporalio import activity
+
+from twelve_days.verses import verses_in_result
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROUTES = {
+    "dispatch": "gpt-4o-mini",
+    "answer": "gpt-4o-mini",
+    "long_answer": "gpt-4o",
+    "escalation": "gpt-4o",
+}
+
+# The running summary the compactor leaves in place of older tool results
+_VERSE_SUMMARY = re.compile(r"Verses ([\d, -]+) done")
+
+
+def _get(item: Any, key: str) -> Any:
+    return item.get(key) if isinstance(item, dict) else getattr(item, key, None)
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    return "".join(_get(part, "text") or "" for part in content or [])
+
+
+def verses_sung(input: Any) -> set[int]:
+    """The days whose verses the tools have sung since the user's latest message."""
+    if isinstance(input, str):
+        return set()
+    days: set[int] = set()
+    for item in input:
+        if _get(item, "role") == "user":
+            days.clear()
+        text = _get(item, "output") if _get(item, "type") == "function_call_output" else _text(_get(item, "content"))
+        if not isinstance(text, str):
+            continue
+        days.update(verses_in_result(text))
+        for ranges in _VERSE_SUMMARY.findall(text):
+            for part in ranges.split(","):
+                start, _, end = part.strip().partition("-")
+                if start.isdigit():
+                    days.update(range(int(start), int(end or start) + 1))
+    return days
+
+
+def tool_results_length(input: Any) -> int:
+    """How many characters of tool output have come back since the user's latest message."""
+    if isinstance(input, str):
+        return 0
+    length = 0
+    for item in input:
+        if _get(item, "role") == "user":
+            length = 0
+        elif _get(item, "type") == "function_call_output":
+            output = _get(item, "output")
+            length += len(output) if isinstance(output, str) else 0
+    return length
+
+
+def has_tool_results(input: Any) -> bool:
+    """Whether any tool has answered since the user's latest message."""
+    if isinstance(input, str):
+        return False
+    found = False
+    for item in input:
+        if _get(item, "role") == "user":
+            found = False
+        elif _get(item, "type") == "function_call_output" or _VERSE_SUMMARY.search(_text(_get(item, "content"))):
+            found = True
+    return found
+
+
+def validation_error(response: ModelResponse, tools: list) -> Optional[str]:
+    """Why the response can't be used as-is, or None if it looks fine."""
+    tool_names = {getattr(tool, "name", None) for tool in tools}
+    calls = [item for item in response.output if _get(item, "type") == "function_call"]
+    for call in calls:
+        if _get(call, "name") not in tool_names:
+            return f"unknown tool {_get(call, 'name')!r}"
+        try:
+            if not isinstance(json.loads(_get(call, "arguments") or "{}"), dict):
+                return f"arguments for {_get(call, 'name')} aren't an object"
+        except json.JSONDecodeError:
+            return f"arguments for {_get(call, 'name')} aren't JSON"
+    if not calls and not any(_text(_get(item, "content")).strip() for item in response.output):
+        return "empty answer"
+    return None
+
+
+@dataclass
+class RouteStats:
+    """Calls, latency and tokens of one route."""
+
+    calls: int = 0
+    seconds: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    @property
+    def mean_latency(self) -> float:
+        return self.seconds / self.calls if self.calls else 0.0
+
+
+@dataclass
+class RoutingStats:
+    """Per-route counters for a RoutingModelProvider."""
+
+    routes: dict[str, RouteStats] = field(default_factory=dict)
+    escalations: int = 0
+
+    def record(self, route: str, seconds: float, response: ModelResponse) -> None:
+        stats = self.routes.setdefault(route, RouteStats())
+        stats.calls += 1
+        stats.seconds += seconds
+        stats.input_tokens += response.usage.input_tokens
+        stats.output_tokens += response.usage.output_tokens
+
+    def __str__(self) -> str:
+        parts = [
+            f"{route} {stats.calls}x {stats.mean_latency:.2f}s avg "
+            f"{stats.input_tokens + stats.output_tokens:,} tokens"
+            for route, stats in self.routes.items()
+        ]
+        return f"routes: {', '.join(parts) or 'none'} | {self.escalations} escalated"
+
+
+def _record_metrics(route: str, model_name: str, seconds: float, response: ModelResponse) -> None:
+    # Only inside a Temporal activity - elsewhere RoutingStats is all there is
+    if not activity.in_activity():
+        return
+    meter = activity.metric_meter().with_additional_attributes({"route": route, "model": model_name})
+    meter.create_histogram_timedelta(
+        "twelve_days_route_latency", "Time spent in a model call, per route"
+    ).record(timedelta(seconds=seconds))
+    meter.create_histogram(
+        "twelve_days_route_tokens", "Input plus output tokens of a model call, per route", "tokens"
+    ).record(response.usage.input_tokens + response.usage.output_tokens)
+
+
+class RoutingModel(Model):
+    """Sends each turn to the model its route calls for, escalating invalid responses."""
+
+    def __init__(self, requested: str, provider: "RoutingModelProvider") -> None:
+        self.requested = requested
+        self.provider = provider
+
+    def route(self, input: Any) -> str:
+        if not has_tool_results(input):
+            return "dispatch"
+        # The answer quotes whatever verses were sung, so even "days 1-11" is a long one
+        if verses_sung(input) or tool_results_length(input) >= self.provider.long_result_chars:
+            return "long_answer"
+        return "answer"
+
+    async def _call(self, route: str, args: tuple, kwargs: dict) -> tuple[str, ModelResponse]:
+        model_name = self.provider.routes.get(route) or self.requested
+        start = time.perf_counter()
+        response = await self.provider.provider.get_model(model_name).get_response(*args, **kwargs)
+        seconds = time.perf_counter() - start
+        self.provider.stats.record(route, seconds, response)
+        _record_metrics(route, model_name, seconds, response)
+        return model_name, response
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ) -> ModelResponse:
+        args = (system_instructions, input, model_settings, tools, output_schema, handoffs, tracing)
+        route = self.route(input)
+        model_name, response = await self._call(route, args, kwargs)
+
+        escalation_model = self.provider.routes.get("escalation")
+        problem = validation_error(response, tools)
+        if problem and escalation_model and escalation_model != model_name:
+            logger.warning(f"🔀 {model_name} gave an invalid {route} response ({problem}) - escalating to {escalation_model}")
+            self.provider.stats.escalations += 1
+            _, response = await self._call("escalation", args, kwargs)
+        return response
+
+    def stream_response(self, system_instructions, input, *args, **kwargs):
+        # Streams can't be validated up front, so they're only routed
+        model_name = self.provider.routes.get(self.route(input)) or self.requested
+        return self.provider.provider.get_model(model_name).stream_response(system_instructions, input, *args, **kwargs)
+
+
+class RoutingModelProvider(ModelProvider):
+    """Wraps a ModelProvider so every turn goes to the model its route calls for."""
+
+    def __init__(
+        self,
+        routes: Optional[dict[str, str]] = None,
+        provider: Optional[ModelProvider] = None,
+        long_result_chars: int = 300,
+        default_model: str = "gpt-4o",
+    ) -> None:
+        self.routes = {**DEFAULT_ROUTES, **(routes or {})}
+        self.provider = provider or OpenAIProvider()
+        self.long_result_chars = long_result_chars
+        self.default_model = default_model
+        self.stats = RoutingStats()
+
+    def get_model(self, model_name: Optional[str]) -> Model:
+        return RoutingModel(model_name or self.default_model, self)
+
+
+def parse_routes(text: str) -> dict[str, str]:
+    """"dispatch=gpt-4o-mini,long_answer=gpt-4o" -> {"dispatch": "gpt-4o-mini", "long_answer": "gpt-4o"}."""
+    routes = {}
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        route, _, model_name = part.partition("=")
+        if route.strip() not in DEFAULT_ROUTES or not model_name.strip():
+            raise ValueError(f"Bad MODEL_ROUTES entry {part!r}. Expected route=model with a route from {list(DEFAULT_ROUTES)}")
+        routes[route.strip()] = model_name.strip()
+    return routes
+
+
+def provider_from_env(provider: Optional[ModelProvider] = None) -> Optional[ModelProvider]:
+    """
+    Wraps `provider` in a RoutingModelProvider set up from MODEL_ROUTING
+    ("off" sends every turn to the agent's own model) and
+    MODEL_ROUTES (route=model pairs overriding DEFAULT_ROUTES). Routing is off
+    by default ("on" to turn it on); with it off, `provider` is returned as it is.
+    """
+    if os.environ.get("MODEL_ROUTING", "off").strip().lower() != "on":
+        return provider
+    return RoutingModelProvider(parse_routes(os.environ.get("MODEL_ROUTES", "")), provider)
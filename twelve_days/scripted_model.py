@@ -0,0 +1,225 @@
+"""
+A scripted stand-in for the OpenAI model.
+
+ScriptedModel replays a fixed sequence of turns - each turn is either a batch
+of tool calls or the final text answer - so the agent loop can be exercised
+and timed without live OpenAI calls. It works as the model provider for the
+Temporal plugin as well as in a plain Runner.run RunConfig.
+
+The model is stateless: which turn comes next is worked out from the call
+IDs of the tool calls already in the conversation, so one provider can serve
+any number of concurrent runs.
+
+SCENARIOS holds a script per kind of request:
+
+- song: the full song in one sing_verses call
+- song_by_verse: the full song, one sing_verse call per turn
+- range: a range of days
+- gift: a single gift lookup
+- gifts: all 12 gifts looked up in one turn
+
+scenario_script picks the right one from the prompt, so a single provider
+can answer all of them.
+"""
+
+import asyncio
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, Union
+
+from agents import Model, ModelProvider, ModelResponse, Usage
+from openai.types.responses import ResponseFunctionToolCall, ResponseOutputMessage, ResponseOutputText
+
+from twelve_days.compaction import estimate_tokens
+from twelve_days.verses import GIFTS, VERSES_MARKDOWN
+
+
+@dataclass
+class ToolCall:
+    """One tool call the scripted model should make."""
+
+    name: str
+    arguments: dict = field(default_factory=dict)
+
+
+# A turn is either the final answer or a batch of (parallel) tool calls
+Turn = Union[str, list[ToolCall]]
+Script = Union[list[Turn], Callable[[str], list[Turn]]]
+
+_CALL_ID = re.compile(r"call_(\d+)_\d+")
+
+
+def _get(item: Any, key: str) -> Any:
+    return item.get(key) if isinstance(item, dict) else getattr(item, key, None)
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    return "".join(_get(part, "text") or "" for part in content or [])
+
+
+def first_user_message(input: Union[str, list]) -> str:
+    """The user's original prompt, from either a plain string or input items."""
+    if isinstance(input, str):
+        return input
+    for item in input:
+        if _get(item, "role") == "user":
+            return _text(_get(item, "content"))
+    return ""
+
+
+def turn_index(input: Union[str, list]) -> int:
+    """How many scripted turns have already happened in this conversation."""
+    if isinstance(input, str):
+        return 0
+    turns = [
+        int(match.group(1))
+        for item in input
+        if _get(item, "type") == "function_call"
+        and (match := _CALL_ID.fullmatch(_get(item, "call_id") or ""))
+    ]
+    return max(turns) + 1 if turns else 0
+
+
+@dataclass
+class Scenario:
+    """A scripted request: the prompt a user sends and the turns the model plays back."""
+
+    prompt: str
+    turns: list[Turn]
+
+
+SCENARIOS = {
+    "song": Scenario(
+        "Please sing the entire 12 Days of Christmas song for me!",
+        [
+            [ToolCall("sing_verses", {"start_day": 1, "end_day": 12})],
+            "\n".join(f"Day {day}: {GIFTS[day]}" for day in range(1, 13)),
+        ],
+    ),
+    "song_by_verse": Scenario(
+        "Sing the whole song one verse at a time",
+        [[ToolCall("sing_verse", {"day": day})] for day in range(1, 13)]
+        + ["\n".join(f"Day {day}: {GIFTS[day]}" for day in range(1, 13))],
+    ),
+    "range": Scenario(
+        "Sing days 1 through 5",
+        [
+            [ToolCall("sing_verses", {"start_day": 1, "end_day": 5})],
+            "\n\n".join(VERSES_MARKDOWN[day] for day in range(1, 6)),
+        ],
+    ),
+    "gift": Scenario(
+        "What gift comes on day 7?",
+        [
+            [ToolCall("get_gift_info", {"day": 7})],
+            f"🎁 On day 7, the gift is: {GIFTS[7]}",
+        ],
+    ),
+    "gifts": Scenario(
+        "What are the gifts on every day?",
+        [
+            [ToolCall("get_gift_info", {"day": day}) for day in range(1, 13)],
+            "\n".join(f"🎁 Day {day}: {GIFTS[day]}" for day in range(1, 13)),
+        ],
+    ),
+}
+
+
+def scenario_script(prompt: str) -> list[Turn]:
+    """The scripted turns for whichever scenario the prompt belongs to."""
+    for scenario in SCENARIOS.values():
+        if scenario.prompt == prompt:
+            return scenario.turns
+    return [f"🤷 There's no scripted answer for: {prompt}"]
+
+
+class ScriptedModel(Model):
+    """Replays scripted turns, optionally after a simulated think time."""
+
+    def __init__(self, script: Script, think_time: float = 0.0, name: Optional[str] = None) -> None:
+        self.script = script
+        self.think_time = think_time
+        self.name = name
+
+    def turns_for(self, prompt: str) -> list[Turn]:
+        return self.script(prompt) if callable(self.script) else self.script
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ) -> ModelResponse:
+        if self.think_time:
+            await asyncio.sleep(self.think_time)
+
+        turns = self.turns_for(first_user_message(input))
+        index = turn_index(input)
+        turn = turns[min(index, len(turns) - 1)]
+
+        if isinstance(turn, str):
+            output = [
+                ResponseOutputMessage(
+                    id=f"msg_{index}",
+                    content=[ResponseOutputText(text=turn, annotations=[], type="output_text")],
+                    role="assistant",
+                    status="completed",
+                    type="message",
+                )
+            ]
+        else:
+            output = [
+                ResponseFunctionToolCall(
+                    arguments=json.dumps(call.arguments),
+                    call_id=f"call_{index}_{i}",
+                    name=call.name,
+                    type="function_call",
+                    id=f"fc_{index}_{i}",
+                    status="completed",
+                )
+                for i, call in enumerate(turn)
+            ]
+
+        input_tokens = estimate_tokens((system_instructions or "") + json.dumps(input, default=str))
+        output_tokens = estimate_tokens(json.dumps([item.model_dump() for item in output]))
+        return ModelResponse(
+            output=output,
+            usage=Usage(
+                requests=1,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                total_tokens=input_tokens + output_tokens,
+            ),
+            response_id=None,
+        )
+
+    def stream_response(self, *args, **kwargs):
+        raise NotImplementedError("ScriptedModel doesn't support streaming")
+
+
+class ScriptedModelProvider(ModelProvider):
+    """
+    Hands out the same ScriptedModel for every model name - or, with
+    think_times, one per model name with its own simulated latency.
+    """
+
+    def __init__(self, script: Script, think_time: float = 0.0, think_times: Optional[dict[str, float]] = None) -> None:
+        self.script = script
+        self.model = ScriptedModel(script, think_time)
+        self.think_times = think_times or {}
+        self._models: dict[str, ScriptedModel] = {}
+
+    def get_model(self, model_name: Optional[str]) -> Model:
+        if model_name not in self.think_times:
+            return self.model
+        if model_name not in self._models:
+            self._models[model_name] = ScriptedModel(self.script, self.think_times[model_name], model_name)
+        return self._models[model_name]
@@ -0,0 +1,52 @@
+"""Latency and throughput summaries shared by the benchmarks and batch runners."""
+
+import math
+from dataclasses import dataclass
+from typing import Sequence
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """The pct-th percentile (0-100) using linear interpolation; 0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+@dataclass
+class LatencySummary:
+    """Throughput and latency percentiles for a batch of requests."""
+
+    count: int
+    errors: int
+    elapsed: float
+    p50: float
+    p95: float
+    p99: float
+    mean: float
+
+    @classmethod
+    def from_latencies(cls, latencies: Sequence[float], elapsed: float, errors: int = 0) -> "LatencySummary":
+        return cls(
+            count=len(latencies),
+            errors=errors,
+            elapsed=elapsed,
+            p50=percentile(latencies, 50),
+            p95=percentile(latencies, 95),
+            p99=percentile(latencies, 99),
+            mean=sum(latencies) / len(latencies) if latencies else 0.0,
+        )
+
+    @property
+    def throughput(self) -> float:
+        """Completed requests per second."""
+        return self.count / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.count} ok, {self.errors} failed in {self.elapsed:.1f}s "
+            f"({self.throughput:.2f} req/s) | p50 {self.p50:.2f}s p95 {self.p95:.2f}s "
+            f"p99 {self.p99:.2f}s mean {self.mean:.2f}s"
+        )
@@ -0,0 +1,133 @@
+"""
+The lyrics of the 12 Days of Christmas, rendered once at import time.
+
+Both the Temporal activities and the non-temporal tools look verses up here,
+so singing a verse is a dictionary lookup and a single write instead of
+rebuilding the cumulative verse line by line on every call.
+"""
+
+import html
+import logging
+import re
+import sys
+from typing import Optional, TextIO, Union
+
+# The complete gift dictionary with emojis
+GIFTS = {
+    1: "🐦 A partridge in a pear tree",
+    2: "🕊️ Two turtle doves",
+    3: "🐔 Three French hens",
+    4: "🐦 Four calling birds",
+    5: "💍 FIVE GOLDEN RINGS",
+    6: "🪿 Six geese a-laying",
+    7: "🦢 Seven swans a-swimming",
+    8: "🥛 Eight maids a-milking",
+    9: "💃 Nine ladies dancing",
+    10: "🤴 Ten lords a-leaping",
+    11: "🎺 Eleven pipers piping",
+    12: "🥁 Twelve drummers drumming"
+}
+
+ORDINALS = {
+    1: "first",
+    2: "second",
+    3: "third",
+    4: "fourth",
+    5: "fifth",
+    6: "sixth",
+    7: "seventh",
+    8: "eighth",
+    9: "ninth",
+    10: "tenth",
+    11: "eleventh",
+    12: "twelfth"
+}
+
+# From the second day on, the partridge is sung with an "And" in front
+PARTRIDGE_AND = "🐦 And a partridge in a pear tree"
+
+
+def is_valid_day(day: int) -> bool:
+    """True if the day is one of the 12 days of Christmas."""
+    return day in GIFTS
+
+
+def gift_lines(day: int) -> list[str]:
+    """The gifts sung on a day, newest first, ending with the partridge."""
+    lines = [GIFTS[d] for d in range(day, 1, -1)]
+    lines.append(GIFTS[1] if day == 1 else PARTRIDGE_AND)
+    return lines
+
+
+def _render_text(day: int) -> str:
+    lines = [
+        f"🎵 On the {ORDINALS[day]} day of Christmas,",
+        "   my true love gave to me:",
+    ]
+    lines.extend(f"   {gift}" for gift in gift_lines(day))
+    return "\n".join(lines)
+
+
+def _render_markdown(day: int) -> str:
+    lines = [
+        f"🎵 **On the {ORDINALS[day]} day of Christmas,**",
+        "my true love gave to me:",
+    ]
+    lines.extend(gift_lines(day))
+    # Two trailing spaces force a line break in markdown
+    return "  \n".join(lines)
+
+
+def _render_html(day: int) -> str:
+    header = html.escape(f"On the {ORDINALS[day]} day of Christmas,")
+    gifts = "<br>".join(html.escape(gift) for gift in gift_lines(day))
+    return f"<p>🎵 <strong>{header}</strong><br>my true love gave to me:<br>{gifts}</p>"
+
+
+# Every verse in every format, built once
+VERSES = {day: _render_text(day) for day in GIFTS}
+VERSES_MARKDOWN = {day: _render_markdown(day) for day in GIFTS}
+VERSES_HTML = {day: _render_html(day) for day in GIFTS}
+
+_FORMATS = {
+    "text": VERSES,
+    "markdown": VERSES_MARKDOWN,
+    "html": VERSES_HTML,
+}
+
+
+def render_verse(day: int, fmt: str = "text") -> str:
+    """Looks up the full cumulative verse for a day in the given format."""
+    try:
+        table = _FORMATS[fmt]
+    except KeyError:
+        raise ValueError(f"Unknown verse format: {fmt}. Expected one of {sorted(_FORMATS)}") from None
+    return table[day]
+
+
+def print_verse(day: int, file: Optional[TextIO] = None) -> None:
+    """Writes the full verse for a day with a single write call."""
+    (file or sys.stdout).write(f"\n{VERSES[day]}\n")
+
+
+def log_verse(logger: Union[logging.Logger, logging.LoggerAdapter], day: int) -> None:
+    """Logs the full verse for a day as a single record."""
+    logger.info(f"\n{VERSES[day]}", extra={"day": day, "gift": GIFTS[day]})
+
+
+def verse_result(day: int) -> str:
+    """The tool result for a finished verse (what the agent and Temporal UI see)."""
+    return f"✓ Completed verse {day}: {GIFTS[day]}"
+
+
+_VERSE_RESULT = re.compile(r"✓ Completed verse (\d+)")
+
+
+def verses_in_result(text: str) -> list[int]:
+    """The days of the finished verses in a tool result - the inverse of verse_result."""
+    return [int(day) for day in _VERSE_RESULT.findall(text)]
+
+
+def gift_info(day: int) -> str:
+    """The answer to "what gift comes on this day?"."""
+    return f"On day {day}, the gift is: {GIFTS[day]}"